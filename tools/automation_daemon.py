@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Automation Daemon
+Keeps one logged-in Firefox/WhatsApp Web session open and runs jobs from a
+local HTTP queue, so a job starts on a warm browser instead of paying for
+geckodriver, Firefox startup and the WhatsApp Web load every time.
+
+Jobs run one at a time on the shared browser:
+    send     - send the message to entries (phone_number.txt rows or a list)
+    resolve  - find and open each chat without sending
+    extract  - extract all group names
+
+Usage:
+    python3 tools/automation_daemon.py serve
+    python3 tools/automation_daemon.py submit send --start-row 10 --max-rows 50
+    python3 tools/automation_daemon.py submit resolve --entries-file "TXT File/not_in_group.txt"
+    python3 tools/automation_daemon.py submit send --finish-by 17:30
+    python3 tools/automation_daemon.py status [job_id]
+
+HTTP API (127.0.0.1:WA_DAEMON_PORT, default 8765):
+    GET  /health          -> {"status": "ok", "busy": ..., "queued": ..., "whatsapp": "ready"}
+    POST /jobs            -> {"id": ...}   body: a tools/run_job.py job spec, e.g.
+                             {"action": "send", "start_row": 10, "message_file": ...}
+    GET  /jobs            -> list of jobs
+    GET  /jobs/<id>       -> one job
+"""
+
+import argparse
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from tools.log_setup import get_logger, setup_logging, shutdown_logging
+
+log = get_logger("daemon")
+
+DEFAULT_PORT = 8765
+ACTIONS = ("send", "resolve", "extract")
+
+# Seconds to wait for the chat list on startup (scan the QR code in this time)
+LOGIN_TIMEOUT = 300
+
+# Job spec keys applied to the shared session for one job: spec key -> Session attribute
+JOB_SESSION_FIELDS = {'list_file': 'phone_number_file', 'message_file': 'message_file', 'image': 'image_file'}
+
+
+def daemon_port():
+    return int(os.environ.get("WA_DAEMON_PORT", DEFAULT_PORT))
+
+
+class AutomationDaemon:
+    """One warm browser session plus a serial job queue"""
+
+    def __init__(self, port=None):
+        self.port = port or daemon_port()
+        self.session = None
+        self.jobs = {}
+        self.current = None
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = None
+
+    # ============= Browser =============
+
+    def start_browser(self):
+        """Start Firefox once and wait until WhatsApp Web shows the chat list"""
+        from tools.metrics_server import start_metrics_from_env
+        from wa_engine import Session
+
+        self.session = Session()
+        start_metrics_from_env(self.session.metrics)
+        self.session.start()
+        log.info("⏳ Waiting for WhatsApp Web chat list (scan the QR code if asked)...")
+        self.session.open_whatsapp(login_timeout=LOGIN_TIMEOUT)
+        log.info("✅ WhatsApp Web ready - browser stays open between jobs")
+
+    # ============= Jobs =============
+
+    def submit(self, spec):
+        """Validate and queue a job spec; returns the job record
+
+        Raises:
+            JobSpecError (a ValueError): invalid spec, or one the shared browser cannot run
+        """
+        from tools.run_job import JobSpecError, validate_spec
+
+        spec = validate_spec(spec)
+        if spec.get("concurrency", 1) > 1:
+            raise JobSpecError("the daemon runs jobs on its one browser; concurrency must be 1")
+        backend = self.session.backend.name if self.session is not None else None
+        if spec.get("backend") and backend and spec["backend"] != backend:
+            raise JobSpecError(f"the daemon's browser is {backend}, not {spec['backend']}")
+        action = spec["action"]
+        job = {
+            'id': next(self._ids),
+            'action': action,
+            'spec': spec,
+            'status': 'queued',
+            'submitted_at': datetime.now().isoformat(timespec='seconds'),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+        }
+        with self._lock:
+            self.jobs[job['id']] = job
+        self._queue.put(job['id'])
+        log.info(f"📥 Job {job['id']} queued: {action}")
+        return job
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self.jobs[job_id]
+                job['status'] = 'running'
+                job['started_at'] = datetime.now().isoformat(timespec='seconds')
+                self.current = job_id
+            log.info(f"▶️ Job {job_id} started: {job['action']}")
+            try:
+                job['result'] = self._run(job['action'], job['spec'])
+                job['status'] = 'done'
+            except Exception as e:
+                job['error'] = repr(e)
+                job['status'] = 'failed'
+                log.warning(f"❌ Job {job_id} failed: {e!r}")
+            finally:
+                with self._lock:
+                    job['finished_at'] = datetime.now().isoformat(timespec='seconds')
+                    self.current = None
+                self.session.output_journal.flush()
+            log.info(f"⏹️ Job {job_id} {job['status']}")
+
+    def _run(self, action, spec):
+        from tools.time_box import parse_deadline
+        from wa_engine import extract_groups, run_entries
+
+        session = self.session
+        # The session outlives its jobs; stage and command reports cover this job only
+        session.stage_timer.reset()
+        session.command_counter.reset()
+        if action == "extract":
+            return {'groups': len(extract_groups(session))}
+
+        deadline = parse_deadline(spec.get("finish_by"), spec.get("run_minutes"))
+        rate = spec.get("rate_per_minute")
+        before = session.metrics.snapshot()['outcomes']
+        # Files for this job only; the next job starts from the daemon's own settings
+        saved = {attr: getattr(session, attr) for attr in JOB_SESSION_FIELDS.values()}
+        for key, attr in JOB_SESSION_FIELDS.items():
+            if key in spec:
+                setattr(session, attr, spec[key])
+        try:
+            ok = run_entries(
+                session, spec.get("start_row"), spec.get("max_rows"), None,
+                entries=spec.get("entries"), deadline=deadline, send=(action == "send"),
+                min_interval=60.0 / rate if rate else None, entry_mode=spec.get("entry_mode"),
+            )
+        finally:
+            for attr, value in saved.items():
+                setattr(session, attr, value)
+        # Metrics are per process - report only what this job added
+        after = session.metrics.snapshot()['outcomes']
+        outcomes = {name: count - before.get(name, 0) for name, count in after.items()
+                    if count != before.get(name, 0)}
+        return {'completed': bool(ok), 'outcomes': outcomes}
+
+    def job_list(self):
+        with self._lock:
+            return [dict(job, spec={k: v for k, v in job['spec'].items() if k != 'entries'})
+                    for job in self.jobs.values()]
+
+    # ============= HTTP =============
+
+    def serve(self):
+        """Start the browser, the worker and the HTTP API; blocks until Ctrl+C"""
+        try:
+            self.start_browser()
+            threading.Thread(target=self._worker, name="daemon-worker", daemon=True).start()
+            handler = type("DaemonHandler", (_DaemonHandler,), {'daemon': self})
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.port), handler)
+            self._server.daemon_threads = True
+            log.info(f"📡 Automation daemon listening on http://127.0.0.1:{self.port}")
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Daemon stopped by user")
+        finally:
+            if self._server is not None:
+                self._server.server_close()
+            if self.session is not None:
+                self.session.close()
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    daemon = None
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if path == "/health":
+            session = self.daemon.session
+            self._reply(200, {'status': 'ok', 'busy': self.daemon.current is not None,
+                              'queued': self.daemon._queue.qsize(),
+                              'whatsapp': session.state if session is not None else None})
+        elif path == "/jobs":
+            self._reply(200, self.daemon.job_list())
+        elif path.startswith("/jobs/"):
+            job_id = path.rsplit('/', 1)[1]
+            jobs = {str(job['id']): job for job in self.daemon.job_list()}
+            if job_id in jobs:
+                self._reply(200, jobs[job_id])
+            else:
+                self._reply(404, {'error': 'no such job'})
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path.split('?')[0].rstrip('/') != "/jobs":
+            self._reply(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            job = self.daemon.submit(spec)
+        except ValueError as e:
+            self._reply(400, {'error': str(e)})
+            return
+        self._reply(202, {'id': job['id'], 'status': job['status']})
+
+    def log_message(self, format, *args):
+        pass  # requests are logged as jobs
+
+
+# ============= Client =============
+
+def request(method, path, payload=None, port=None, timeout=5):
+    """Call the daemon API; raises OSError (URLError) if it is not running"""
+    url = f"http://127.0.0.1:{port or daemon_port()}{path}"
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    req = urllib.request.Request(url, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read() or b"{}")
+
+
+def submit_job(spec, port=None, timeout=2):
+    """Queue a job on a running daemon; returns {'id': ...} or raises OSError"""
+    return request("POST", "/jobs", spec, port, timeout)
+
+
+def daemon_running(port=None):
+    try:
+        return request("GET", "/health", port=port, timeout=1).get('status') == 'ok'
+    except (OSError, ValueError):
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhatsApp automation daemon")
+    sub = parser.add_subparsers(dest="command")
+    serve = sub.add_parser("serve", help="start the browser and the job API")
+    serve.add_argument("--port", type=int)
+    submit = sub.add_parser("submit", help="queue a job on the running daemon")
+    submit.add_argument("action", choices=ACTIONS)
+    submit.add_argument("--start-row", type=int)
+    submit.add_argument("--max-rows", type=int)
+    submit.add_argument("--entries-file", help="process the entries in this file instead of phone_number.txt rows")
+    submit.add_argument("--list-file", help="rows file (default TXT File/phone_number.txt)")
+    submit.add_argument("--message-file")
+    submit.add_argument("--image")
+    submit.add_argument("--rate-per-minute", type=float)
+    submit.add_argument("--entry-mode", choices=("steps", "macro"))
+    submit.add_argument("--finish-by", help="HH:MM")
+    submit.add_argument("--run-minutes", type=float)
+    submit.add_argument("--port", type=int)
+    status = sub.add_parser("status", help="show queued/finished jobs")
+    status.add_argument("job_id", nargs="?")
+    status.add_argument("--port", type=int)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        setup_logging("daemon")
+        try:
+            AutomationDaemon(args.port).serve()
+        finally:
+            shutdown_logging()
+    elif args.command == "submit":
+        spec = {'action': args.action}
+        for key in ("start_row", "max_rows", "list_file", "message_file", "image", "rate_per_minute",
+                    "entry_mode", "finish_by", "run_minutes"):
+            if getattr(args, key) is not None:
+                spec[key] = getattr(args, key)
+        if args.entries_file:
+            with open(args.entries_file, "r", encoding="utf-8") as f:
+                spec['entries'] = [line for line in f if line.strip() and not line.startswith("===")]
+        try:
+            print(json.dumps(submit_job(spec, args.port)))
+        except OSError as e:
+            print(f"❌ Daemon not reachable: {e}")
+            sys.exit(2)
+    elif args.command == "status":
+        try:
+            path = f"/jobs/{args.job_id}" if args.job_id else "/jobs"
+            print(json.dumps(request("GET", path, port=args.port), indent=2, ensure_ascii=False))
+        except OSError as e:
+            print(f"❌ Daemon not reachable: {e}")
+            sys.exit(2)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    # Change to parent directory to access TXT File folder
+    os.chdir(REPO_DIR)
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Backend Benchmark
+Runs the same work on each browser backend (Firefox WebDriver, Chromium CDP)
+on this host: startup to a ready chat list, the round trip of one page
+evaluation, one text insertion into the search box, and resolving a few
+entries without sending. Prints the per-backend medians so the faster
+engine can be chosen with WA_BACKEND; results also go to
+Logs/bench_backends_<timestamp>.json.
+
+Usage:
+    python3 tools/bench_backends.py [--backends firefox,chromium] [--entries 10] [--samples 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.stage_timer import percentile
+
+BENCH_FOLDER = "Data/bench"
+
+
+def _timed(samples, action):
+    """Seconds per call of action(), one entry per sample"""
+    times = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def bench_backend(name, entries, samples, login_timeout):
+    """Run the benchmark on one backend; returns its result dict"""
+    from wa_engine import Session, run_entries
+
+    os.makedirs(BENCH_FOLDER, exist_ok=True)
+    session = Session(backend=name, not_in_group_file=os.path.join(BENCH_FOLDER, f"not_in_group_{name}.txt"))
+    backend, result = session.backend, {'backend': name}
+    try:
+        started = time.perf_counter()
+        session.start()
+        session.open_whatsapp(login_timeout=login_timeout)
+        result['startup_seconds'] = time.perf_counter() - started
+
+        driver = session.driver
+        evaluate = _timed(samples, lambda: backend.evaluate(driver, "document.querySelectorAll('#pane-side [role=\"row\"]').length"))
+        result['evaluate_ms_p50'] = percentile(evaluate, 50) * 1000
+        result['evaluate_ms_p95'] = percentile(evaluate, 95) * 1000
+
+        search_box = session.page.search_box()
+        insert = _timed(samples, lambda: backend.insert_text(driver, search_box, "benchmark", replace=True))
+        backend.insert_text(driver, search_box, "", replace=True)
+        result['insert_ms_p50'] = percentile(insert, 50) * 1000
+        result['insert_ms_p95'] = percentile(insert, 95) * 1000
+
+        if entries:
+            started = time.perf_counter()
+            run_entries(session, entries=entries, send=False)
+            result['entry_seconds'] = (time.perf_counter() - started) / len(entries)
+    finally:
+        session.quit_browser(force=True)
+        session.output_journal.close()
+    return result
+
+
+def print_report(results):
+    names = list(results)
+    rows = [
+        ("startup (s)", 'startup_seconds', 1),
+        ("evaluate p50 (ms)", 'evaluate_ms_p50', 1),
+        ("evaluate p95 (ms)", 'evaluate_ms_p95', 1),
+        ("insert text p50 (ms)", 'insert_ms_p50', 1),
+        ("insert text p95 (ms)", 'insert_ms_p95', 1),
+        ("per entry (s)", 'entry_seconds', 1),
+    ]
+    print(f"\n{'metric':<24}" + "".join(f"{name:>12}" for name in names) + f"{'fastest':>12}")
+    print("-" * (24 + 12 * (len(names) + 1)))
+    for label, key, scale in rows:
+        values = {name: results[name].get(key) for name in names}
+        measured = {name: value for name, value in values.items() if value is not None}
+        fastest = min(measured, key=measured.get) if measured else "-"
+        cells = "".join(f"{value * scale:>12.1f}" if value is not None else f"{'-':>12}" for value in values.values())
+        print(f"{label:<24}{cells}{fastest:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the browser backends on this host")
+    parser.add_argument("--backends", default="firefox,chromium")
+    parser.add_argument("--entries-file", default="TXT File/phone_number.txt")
+    parser.add_argument("--entries", type=int, default=10, help="entries resolved per backend (0 = skip)")
+    parser.add_argument("--samples", type=int, default=50, help="calls per primitive timing")
+    parser.add_argument("--login-timeout", type=int, default=120)
+    args = parser.parse_args()
+
+    entries = []
+    if args.entries and os.path.exists(args.entries_file):
+        with open(args.entries_file, "r", encoding="utf-8") as f:
+            entries = [line for line in f if line.strip()][:args.entries]
+
+    results = {}
+    for name in [part.strip() for part in args.backends.split(",") if part.strip()]:
+        print(f"\n🔄 Benchmarking {name} backend...")
+        try:
+            results[name] = bench_backend(name, entries, args.samples, args.login_timeout)
+        except Exception as e:
+            print(f"❌ {name} run failed: {e}")
+            results[name] = {'backend': name, 'error': repr(e)}
+
+    print_report(results)
+    os.makedirs("Logs", exist_ok=True)
+    path = os.path.join("Logs", f"bench_backends_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📊 Results written to {path}")
+
+
+if __name__ == "__main__":
+    # Change to parent directory to access TXT File folder
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(os.path.dirname(script_dir))
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Lean Mode Benchmark
+Starts the browser once per mode (standard, then lean), resolves the same
+entries without sending and scrolls the chat list, then prints per-mode
+startup, per-entry and per-scroll times and the lean savings. Results are
+also written to Logs/bench_lean_<timestamp>.json.
+
+Usage:
+    python3 tools/bench_lean.py [--entries 10] [--scrolls 30] [--entries-file "TXT File/phone_number.txt"]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.stage_timer import percentile
+
+BENCH_FOLDER = "Data/bench"
+
+# Scroll the chat list, then wait for the frame after next so the re-render is included
+SCROLL_SCRIPT = """
+const pane = arguments[0], done = arguments[arguments.length - 1];
+const start = performance.now();
+pane.scrollTop += arguments[1];
+requestAnimationFrame(() => requestAnimationFrame(() => done(performance.now() - start)));
+"""
+
+
+def bench_scrolls(driver, scrolls, step=500):
+    """Per-scroll render times in ms (page clock) and wall times in seconds"""
+    from selenium.webdriver.common.by import By
+
+    pane = driver.find_element(By.CSS_SELECTOR, "#pane-side")
+    driver.execute_script("arguments[0].scrollTop = 0", pane)
+    render_ms, wall = [], []
+    for _ in range(scrolls):
+        started = time.perf_counter()
+        render_ms.append(driver.execute_async_script(SCROLL_SCRIPT, pane, step))
+        wall.append(time.perf_counter() - started)
+        if driver.execute_script("return arguments[0].scrollTop + arguments[0].clientHeight >= arguments[0].scrollHeight - 10", pane):
+            driver.execute_script("arguments[0].scrollTop = 0", pane)
+    return render_ms, wall
+
+
+def bench_mode(mode, entries, scrolls, login_timeout):
+    """Run the benchmark in one browser mode; returns its result dict"""
+    from wa_engine import Session, run_entries
+
+    os.makedirs(BENCH_FOLDER, exist_ok=True)
+    session = Session(not_in_group_file=os.path.join(BENCH_FOLDER, f"not_in_group_{mode}.txt"))
+    result = {'mode': mode}
+    try:
+        started = time.perf_counter()
+        session.start(browser_mode=mode)
+        session.open_whatsapp(login_timeout=login_timeout)
+        result['startup_seconds'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        run_entries(session, entries=entries, send=False)
+        result['entry_seconds'] = (time.perf_counter() - started) / max(len(entries), 1)
+        result['stages'] = {name: sum(values) / len(values)
+                            for name, values in session.stage_timer.durations_by_stage().items() if values}
+
+        render_ms, wall = bench_scrolls(session.driver, scrolls)
+        result['scroll_render_ms_p50'] = percentile(render_ms, 50)
+        result['scroll_render_ms_p95'] = percentile(render_ms, 95)
+        result['scroll_seconds'] = sum(wall) / max(len(wall), 1)
+    finally:
+        session.close()
+    return result
+
+
+def _saving(standard, lean):
+    if not standard:
+        return "-"
+    return f"{(standard - lean) / standard * 100:+.0f}%"
+
+
+def print_report(results):
+    standard, lean = results.get('standard', {}), results.get('lean', {})
+    rows = [
+        ("startup (s)", 'startup_seconds', 1),
+        ("per entry (s)", 'entry_seconds', 1),
+        ("per scroll, wall (ms)", 'scroll_seconds', 1000),
+        ("per scroll, render p50 (ms)", 'scroll_render_ms_p50', 1),
+        ("per scroll, render p95 (ms)", 'scroll_render_ms_p95', 1),
+    ]
+    print(f"\n{'metric':<30}{'standard':>10}{'lean':>10}{'saving':>10}")
+    print("-" * 60)
+    for label, key, scale in rows:
+        a, b = standard.get(key, 0) * scale, lean.get(key, 0) * scale
+        print(f"{label:<30}{a:>10.1f}{b:>10.1f}{_saving(a, b):>10}")
+    for stage in sorted(set(standard.get('stages', {})) | set(lean.get('stages', {}))):
+        a = standard.get('stages', {}).get(stage, 0) * 1000
+        b = lean.get('stages', {}).get(stage, 0) * 1000
+        print(f"{'  ' + stage + ' (ms)':<30}{a:>10.1f}{b:>10.1f}{_saving(a, b):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare standard and lean browser modes")
+    parser.add_argument("--entries-file", default="TXT File/phone_number.txt")
+    parser.add_argument("--entries", type=int, default=10, help="entries resolved per mode")
+    parser.add_argument("--scrolls", type=int, default=30, help="chat list scrolls per mode")
+    parser.add_argument("--login-timeout", type=int, default=120)
+    args = parser.parse_args()
+
+    with open(args.entries_file, "r", encoding="utf-8") as f:
+        entries = [line for line in f if line.strip()][:args.entries]
+    if not entries:
+        print(f"❌ No entries in {args.entries_file}")
+        sys.exit(2)
+
+    results = {}
+    for mode in ("standard", "lean"):
+        print(f"\n🔄 Benchmarking {mode} mode...")
+        try:
+            results[mode] = bench_mode(mode, entries, args.scrolls, args.login_timeout)
+        except Exception as e:
+            print(f"❌ {mode} run failed: {e}")
+            sys.exit(1)
+
+    print_report(results)
+    os.makedirs("Logs", exist_ok=True)
+    path = os.path.join("Logs", f"bench_lean_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📊 Results written to {path}")
+
+
+if __name__ == "__main__":
+    # Change to parent directory to access TXT File folder
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(os.path.dirname(script_dir))
+    main()
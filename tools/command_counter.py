@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+WebDriver Command Counter
+Counts every round trip to the browser driver by command type and call site,
+reports commands per processed entry and can enforce a per-entry budget
+"""
+
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+
+# Frames from these files are skipped when looking for the caller of a command
+_SKIP_PATHS = (os.sep + "selenium" + os.sep, os.sep + "command_counter.py")
+
+
+class CommandBudgetExceeded(AssertionError):
+    """Raised when a run used more driver commands per entry than its budget allows"""
+
+
+def load_budget(value):
+    """
+    Parse a budget setting
+
+    Args:
+        value: a number (max commands per entry) or a path to a previous
+               commands_*.json report whose commands_per_entry is the budget
+
+    Returns:
+        float budget or None if value is empty
+    """
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        with open(value, 'r', encoding='utf-8') as f:
+            return float(json.load(f)['commands_per_entry'])
+
+
+class CommandCounter:
+    """
+    Transparent counter installed on a WebDriver instance
+
+    Every find_element, execute_script, .text, get_attribute, click etc. goes
+    through WebDriver.execute (elements call their parent driver), so wrapping
+    that one method sees all HTTP round trips to geckodriver.
+    """
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.by_command = Counter()
+        self.by_site = Counter()
+        self.entry_counts = []
+        self.total = 0
+        self._entry_start = None
+        self._lock = threading.Lock()
+
+    def install(self, driver):
+        """Wrap driver.execute; returns the driver for chaining"""
+        original_execute = driver.execute
+        counter = self
+
+        def counted_execute(driver_command, params=None):
+            counter.record(driver_command, params)
+            return original_execute(driver_command, params)
+
+        driver.execute = counted_execute
+        return driver
+
+    def record(self, driver_command, params=None):
+        """Count one command; get_attribute is reported separately from other scripts"""
+        name = driver_command if isinstance(driver_command, str) else "bidi"
+        if name in ("executeScript", "executeAsyncScript") and params:
+            script = params.get('script', '')
+            if script.startswith("/* getAttribute */"):
+                name = "getAttribute"
+            elif script.startswith("/* isDisplayed */"):
+                name = "isDisplayed"
+        site = self._call_site()
+        with self._lock:
+            self.total += 1
+            self.by_command[name] += 1
+            self.by_site[(site, name)] += 1
+
+    @staticmethod
+    def _call_site():
+        """Return 'file:line function' of the first frame outside selenium"""
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if not any(skip in filename for skip in _SKIP_PATHS):
+                return f"{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+            frame = frame.f_back
+        return "unknown"
+
+    def reset(self):
+        """Forget all counts (e.g. between jobs on a long-lived session); stays installed"""
+        with self._lock:
+            self.by_command = Counter()
+            self.by_site = Counter()
+            self.entry_counts = []
+            self.total = 0
+        self._entry_start = None
+
+    def begin_entry(self):
+        """Mark the start of an entry"""
+        self._entry_start = self.total
+
+    def end_entry(self, keep=True):
+        """Close the current entry; returns the number of commands it used
+
+        keep=False leaves skipped iterations out of the per-entry average
+        (their commands still count towards the total)
+        """
+        if self._entry_start is None:
+            return 0
+        used = self.total - self._entry_start
+        if keep:
+            self.entry_counts.append(used)
+        self._entry_start = None
+        return used
+
+    @property
+    def commands_per_entry(self):
+        if not self.entry_counts:
+            return 0.0
+        return sum(self.entry_counts) / len(self.entry_counts)
+
+    def report(self, top=15):
+        """Return a JSON-serialisable summary of the run"""
+        with self._lock:
+            sites = self.by_site.most_common(top)
+            commands = dict(self.by_command.most_common())
+        return {
+            'total_commands': self.total,
+            'entries': len(self.entry_counts),
+            'commands_per_entry': round(self.commands_per_entry, 2),
+            'max_commands_entry': max(self.entry_counts, default=0),
+            'budget': self.budget,
+            'by_command': commands,
+            'top_call_sites': [
+                {'site': site, 'command': command, 'count': count}
+                for (site, command), count in sites
+            ],
+        }
+
+    def print_report(self, top=10):
+        """Print commands per entry and the busiest call sites"""
+        report = self.report(top)
+        print("\n🔌 WEBDRIVER ROUND TRIPS")
+        print(f"Total commands: {report['total_commands']} | Entries: {report['entries']} | "
+              f"Per entry: {report['commands_per_entry']} (max {report['max_commands_entry']})")
+        for command, count in report['by_command'].items():
+            print(f"  {command:<28}{count:>7}")
+        print("Busiest call sites:")
+        for site in report['top_call_sites']:
+            print(f"  {site['count']:>7}  {site['command']:<22}{site['site']}")
+
+    def export(self, folder="Logs", prefix="commands"):
+        """Write the report as JSON; the file can be used as a later run's budget"""
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(top=50), f, ensure_ascii=False, indent=2)
+        return path
+
+    def check_budget(self):
+        """Raise CommandBudgetExceeded if the per-entry average is over budget"""
+        if self.budget is None or not self.entry_counts:
+            return True
+        if self.commands_per_entry > self.budget:
+            raise CommandBudgetExceeded(
+                f"{self.commands_per_entry:.2f} commands per entry exceeds budget of {self.budget:.2f}"
+            )
+        return True
@@ -11,8 +11,18 @@ from selenium.webdriver.common.by import By
 import time
 import os
 import re
+import sys
 from datetime import datetime
 
+# Allow "from tools.x import y" when run as a standalone script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools.profiling import profiled, entry_done
+from tools.log_setup import get_logger, setup_logging
+from tools.progress import RunProgress
+from wa_engine.page import PageHelpers
+
+log = get_logger("extractor")
+
 def extract_all_group_names(driver, save_to_file=True):
     """
     Main function to extract all WhatsApp group names using existing WebDriver session
@@ -122,6 +132,7 @@ def click_groups_filter(driver):
         print("⚠️ Continuing without groups filter...")
         return False
 
+@profiled("get_all_group_names")
 def get_all_group_names(driver):
     """Extract all group names from the chat list"""
     group_names = []
@@ -129,192 +140,98 @@ def get_all_group_names(driver):
     scroll_attempts = 0
     max_scroll_attempts = 50
     
-    print("📝 Extracting group names...")
+    log.info("📝 Extracting group names...")
+    # Total is unknown until the list is scrolled to the end - shows count and rate only
+    progress = RunProgress(desc="📋 Chats checked", ok_label="groups", fail_label="other")
     
     try:
-        # Find the chat list container
-        chat_list_selectors = [
-            "div[data-testid='chat-list']",
-            "#pane-side",
-            "div[role='grid']",
-            "div._ak72"
-        ]
-        
-        chat_container = None
-        for selector in chat_list_selectors:
-            try:
-                container = driver.find_element(By.CSS_SELECTOR, selector)
-                if container:
-                    chat_container = container
-                    print(f"✅ Found chat container with selector: {selector}")
-                    break
-            except:
-                continue
-        
-        if not chat_container:
-            print("❌ Could not find chat list container")
-            return []
+        # Chat rows come from the in-page helper library: one call per pass instead
+        # of a find per row and per indicator (see wa_engine.page)
+        page = PageHelpers(driver)
         
         while scroll_attempts < max_scroll_attempts:
-            # Get all chat elements
-            chat_selectors = [
-                "div._ak72",
-                "div[role='listitem']",
-                "div[data-testid*='chat']",
-                "div[tabindex='0'] div._ak72"
-            ]
-            
-            chat_elements = []
-            for selector in chat_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        chat_elements = elements
-                        break
-                except:
-                    continue
+            chat_rows = page.chat_list()
+            if chat_rows is None:
+                log.warning("❌ Could not find chat list container")
+                return []
             
-            if not chat_elements:
-                print("❌ No chat elements found")
+            if not chat_rows:
+                log.warning("❌ No chat elements found")
                 break
             
             new_names_found = 0
             
-            for chat_element in chat_elements:
-                try:
-                    # Extract chat name
-                    name = extract_chat_name(chat_element)
-                    
-                    if name and name not in processed_names:
-                        # Filter for group names (groups usually have multiple participants)
-                        if is_likely_group(driver, chat_element, name):
-                            group_names.append(name)
-                            processed_names.add(name)
-                            new_names_found += 1
-                            print(f"  📋 {len(group_names):3d}. {name}")
-                        else:
-                            processed_names.add(name)  # Add to processed to avoid re-checking
-                            
-                except Exception as e:
+            for row in chat_rows:
+                name = row['name']
+                if name in processed_names:
                     continue
+                # Filter for group names (groups usually have multiple participants)
+                if row['groupHint'] or name_looks_like_group(name):
+                    group_names.append(name)
+                    processed_names.add(name)
+                    new_names_found += 1
+                    log.info(f"  📋 {len(group_names):3d}. {name}")
+                    progress.update(ok=True)
+                else:
+                    processed_names.add(name)  # Add to processed to avoid re-checking
+                    progress.update(ok=False)
+                entry_done()
             
             if new_names_found == 0:
                 # No new names found, try scrolling
                 try:
                     # Scroll down in the chat list
-                    driver.execute_script("arguments[0].scrollTop += 500", chat_container)
+                    at_end = page.scroll_chat_list(500)
                     time.sleep(1)
                     scroll_attempts += 1
                     
                     # Check if we've reached the bottom
-                    current_scroll = driver.execute_script("return arguments[0].scrollTop", chat_container)
-                    max_scroll = driver.execute_script("return arguments[0].scrollHeight - arguments[0].clientHeight", chat_container)
-                    
-                    if current_scroll >= max_scroll - 10:  # Near bottom
-                        print("📄 Reached end of chat list")
+                    if at_end:
+                        log.info("📄 Reached end of chat list")
                         break
                         
                 except Exception as e:
-                    print(f"⚠️ Error scrolling: {e}")
+                    log.warning(f"⚠️ Error scrolling: {e}")
                     break
             else:
                 scroll_attempts = 0  # Reset counter when finding new names
         
-        print(f"\n✅ Extraction complete! Found {len(group_names)} group chats")
+        progress.close()
+        page.flush_stats()
+        log.info(f"\n✅ Extraction complete! Found {len(group_names)} group chats")
         return group_names
         
     except Exception as e:
-        print(f"❌ Error extracting group names: {e}")
+        progress.close()
+        log.warning(f"❌ Error extracting group names: {e}")
         return group_names
 
-def extract_chat_name(chat_element):
-    """Extract name from a single chat element"""
-    try:
-        # Common selectors for chat names
-        name_selectors = [
-            "span[title]",
-            "span._ak8o",
-            "span[dir='auto']",
-            "div[title]",
-            ".copyable-text span",
-            "[data-testid*='name']"
-        ]
-        
-        for selector in name_selectors:
-            try:
-                name_element = chat_element.find_element(By.CSS_SELECTOR, selector)
-                name = name_element.get_attribute('title') or name_element.text.strip()
-                
-                if name and len(name.strip()) > 0 and len(name) < 200:
-                    return name.strip()
-            except:
-                continue
-        
-        return None
-        
-    except Exception as e:
-        return None
-
-def is_likely_group(driver, chat_element, chat_name):
-    """Determine if a chat is likely a group based on various indicators"""
-    try:
-        # Check for group indicators
-        group_indicators = [
-            # Group icon indicators
-            "svg[data-testid*='group']",
-            "span[data-testid*='group']",
-            # Multiple participant indicators
-            "span:contains('~')",
-            # Group admin indicators
-            "[title*='admin']",
-            "[title*='participant']"
-        ]
-        
-        # Check for visual group indicators
-        for indicator in group_indicators:
-            try:
-                if ":contains" in indicator:
-                    # Use XPath for text matching
-                    xpath = f".//*[contains(text(), '~')]"
-                    if chat_element.find_elements(By.XPATH, xpath):
-                        return True
-                else:
-                    if chat_element.find_elements(By.CSS_SELECTOR, indicator):
-                        return True
-            except:
-                continue
-        
-        # Check chat name patterns that suggest groups
-        group_patterns = [
-            # Common group name patterns
-            r'.*group.*',
-            r'.*team.*',
-            r'.*family.*',
-            r'.*friends.*',
-            r'.*office.*',
-            r'.*work.*',
-            r'.*project.*',
-            r'.*community.*',
-            r'.*club.*',
-            # Names with multiple words (often groups)
-            r'.+ .+ .+',  # 3+ words
-            # Names with special characters often used in groups
-            r'.*[📱💼🏠🎮🎯⚽].*',
-        ]
-        
-        for pattern in group_patterns:
-            if re.match(pattern, chat_name.lower()):
-                return True
-        
-        # If no clear indicators, assume it might be a group if name is longer than typical contact names
-        if len(chat_name) > 15:
+def name_looks_like_group(chat_name):
+    """Whether a chat name alone suggests a group"""
+    # Check chat name patterns that suggest groups
+    group_patterns = [
+        # Common group name patterns
+        r'.*group.*',
+        r'.*team.*',
+        r'.*family.*',
+        r'.*friends.*',
+        r'.*office.*',
+        r'.*work.*',
+        r'.*project.*',
+        r'.*community.*',
+        r'.*club.*',
+        # Names with multiple words (often groups)
+        r'.+ .+ .+',  # 3+ words
+        # Names with special characters often used in groups
+        r'.*[📱💼🏠🎮🎯⚽].*',
+    ]
+    
+    for pattern in group_patterns:
+        if re.match(pattern, chat_name.lower()):
             return True
-            
-        return False
-        
-    except Exception as e:
-        # When in doubt, include it
-        return True
+    
+    # If no clear indicators, assume it might be a group if name is longer than typical contact names
+    return len(chat_name) > 15
 
 def save_group_names(group_names, filename="group_names.txt"):
     """Save extracted group names to a file"""
@@ -349,11 +266,15 @@ def save_group_names(group_names, filename="group_names.txt"):
 
 def main():
     """Main function when running as standalone script (creates new WebDriver)"""
+    setup_logging("extract_groups")
     try:
         from selenium import webdriver
         from selenium.webdriver.firefox.service import Service
         from selenium.webdriver.firefox.options import Options
-        from webdriver_manager.firefox import GeckoDriverManager
+        from wa_engine.geckodriver import resolve_geckodriver
+        from wa_engine.prefs import apply_prefs
+        from wa_engine.profile import apply_profile
+        from wa_engine.session import DEFAULT_PROFILE_PATH
         
         print("📱 WhatsApp Group Name Extractor (Standalone Mode)")
         print("=" * 50)
@@ -363,25 +284,18 @@ def main():
         
         firefox_options = Options()
         firefox_options.add_argument("--disable-blink-features=AutomationControlled")
-        firefox_options.set_preference("dom.webdriver.enabled", False)
-        firefox_options.set_preference('useAutomationExtension', False)
+        apply_prefs(firefox_options)
         firefox_options.add_argument("--disable-extensions")
         
         # Use the same profile as main script
-        profile_path = "/Users/admin/Library/Application Support/Firefox/Profiles/focg601r.NepalWin"
         try:
-            if os.path.exists(profile_path):
-                firefox_options.profile = webdriver.FirefoxProfile(profile_path)
-                print(f"✅ Using Firefox profile: {profile_path}")
-            else:
-                print(f"⚠️ Profile not found: {profile_path}")
-                print("Using default Firefox profile...")
+            apply_profile(firefox_options, DEFAULT_PROFILE_PATH)
         except Exception as e:
             print(f"⚠️ Error loading profile: {e}")
             print("Using default Firefox profile...")
         
         # Create service
-        service = Service(GeckoDriverManager().install())
+        service = Service(resolve_geckodriver()['path'])
         
         # Create driver
         driver = webdriver.Firefox(service=service, options=firefox_options)
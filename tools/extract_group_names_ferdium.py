@@ -13,8 +13,17 @@ from selenium.webdriver.common.by import By
 import time
 import os
 import re
-from datetime import datetime
+import sys
 import subprocess
+from datetime import datetime
+
+# Allow "from tools.x import y" when run as a standalone script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools.profiling import profiled, entry_done
+from tools.log_setup import get_logger, setup_logging
+from tools.progress import RunProgress
+
+log = get_logger("extractor")
 
 def find_ferdium_debug_port():
     """Find Ferdium process and get its debug port"""
@@ -146,6 +155,7 @@ def click_groups_filter(driver):
         print("⚠️ Continuing without groups filter...")
         return False
 
+@profiled("get_all_group_names")
 def get_all_group_names(driver):
     """Extract all group names from the chat list"""
     group_names = []
@@ -153,7 +163,9 @@ def get_all_group_names(driver):
     scroll_attempts = 0
     max_scroll_attempts = 50
     
-    print("📝 Extracting group names...")
+    log.info("📝 Extracting group names...")
+    # Total is unknown until the list is scrolled to the end - shows count and rate only
+    progress = RunProgress(desc="📋 Chats checked", ok_label="groups", fail_label="other")
     
     try:
         # Find the chat list container
@@ -170,13 +182,13 @@ def get_all_group_names(driver):
                 container = driver.find_element(By.CSS_SELECTOR, selector)
                 if container:
                     chat_container = container
-                    print(f"✅ Found chat container with selector: {selector}")
+                    log.info(f"✅ Found chat container with selector: {selector}")
                     break
             except:
                 continue
         
         if not chat_container:
-            print("❌ Could not find chat list container")
+            log.warning("❌ Could not find chat list container")
             return []
         
         while scroll_attempts < max_scroll_attempts:
@@ -199,7 +211,7 @@ def get_all_group_names(driver):
                     continue
             
             if not chat_elements:
-                print("❌ No chat elements found")
+                log.warning("❌ No chat elements found")
                 break
             
             new_names_found = 0
@@ -215,9 +227,12 @@ def get_all_group_names(driver):
                             group_names.append(name)
                             processed_names.add(name)
                             new_names_found += 1
-                            print(f"  📋 {len(group_names):3d}. {name}")
+                            log.info(f"  📋 {len(group_names):3d}. {name}")
+                            progress.update(ok=True)
                         else:
                             processed_names.add(name)  # Add to processed to avoid re-checking
+                            progress.update(ok=False)
+                        entry_done()
                             
                 except Exception as e:
                     continue
@@ -235,20 +250,22 @@ def get_all_group_names(driver):
                     max_scroll = driver.execute_script("return arguments[0].scrollHeight - arguments[0].clientHeight", chat_container)
                     
                     if current_scroll >= max_scroll - 10:  # Near bottom
-                        print("📄 Reached end of chat list")
+                        log.info("📄 Reached end of chat list")
                         break
                         
                 except Exception as e:
-                    print(f"⚠️ Error scrolling: {e}")
+                    log.warning(f"⚠️ Error scrolling: {e}")
                     break
             else:
                 scroll_attempts = 0  # Reset counter when finding new names
         
-        print(f"\n✅ Extraction complete! Found {len(group_names)} group chats")
+        progress.close()
+        log.info(f"\n✅ Extraction complete! Found {len(group_names)} group chats")
         return group_names
         
     except Exception as e:
-        print(f"❌ Error extracting group names: {e}")
+        progress.close()
+        log.warning(f"❌ Error extracting group names: {e}")
         return group_names
 
 def extract_chat_name(chat_element):
@@ -373,6 +390,7 @@ def save_group_names(group_names, filename="group_names_ferdium.txt"):
 
 def main():
     """Main function to extract WhatsApp group names from Ferdium"""
+    setup_logging("extract_groups")
     print("📱 WhatsApp Group Name Extractor for Ferdium")
     print("=" * 50)
     
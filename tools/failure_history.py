@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Failure History
+Parses TXT File/not_in_group.txt into its timestamped run sections and keeps an
+incremental index (Data/not_in_group.index.json), so only bytes appended since
+the last call are read. Answers questions such as "failures from the last run"
+or "entries that failed in every one of the last N runs" and returns entry
+lists that loop_through_numbers can process directly.
+
+Usage:
+    python3 tools/failure_history.py                # list runs
+    python3 tools/failure_history.py last           # failures from the last run
+    python3 tools/failure_history.py repeated 3     # failed in each of the last 3 runs
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+
+DEFAULT_HISTORY_FILE = "TXT File/not_in_group.txt"
+DEFAULT_INDEX_FILE = "Data/not_in_group.index.json"
+
+START_RE = re.compile(r"^=== Processing started: (.+?) ===$")
+END_RE = re.compile(r"^=== Processing completed: (.+?) ===$")
+
+# Bytes hashed to detect that the history file was rewritten rather than appended to
+_HEAD_BYTES = 4096
+
+
+def _head_hash(path, length):
+    """Hash of the first bytes already indexed (at most _HEAD_BYTES)"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read(min(length, _HEAD_BYTES))).hexdigest()
+
+
+class FailureHistory:
+    """Run sections of not_in_group.txt, indexed incrementally"""
+
+    def __init__(self, history_file=DEFAULT_HISTORY_FILE, index_file=DEFAULT_INDEX_FILE):
+        self.history_file = history_file
+        self.index_file = index_file
+        self.runs = []
+        self._offset = 0
+        self._head = None
+
+    def load(self):
+        """Bring the index up to date with the history file; returns self"""
+        if not os.path.exists(self.history_file):
+            self.runs, self._offset, self._head = [], 0, None
+            return self
+        self._read_index()
+        size = os.path.getsize(self.history_file)
+        if size < self._offset or self._head != _head_hash(self.history_file, self._offset):
+            # File was truncated or rewritten - start over
+            self.runs, self._offset = [], 0
+        if size > self._offset:
+            self._parse_from(self._offset)
+            self._head = _head_hash(self.history_file, self._offset)
+            self._write_index()
+        return self
+
+    def _parse_from(self, offset):
+        with open(self.history_file, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # Only consume complete lines; a half-written last line is read next time
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return
+        for raw in data[:end].decode('utf-8', errors='replace').splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            started = START_RE.match(line)
+            if started:
+                self.runs.append({'started': started.group(1), 'completed': None, 'entries': []})
+                continue
+            completed = END_RE.match(line)
+            if completed:
+                if self.runs:
+                    self.runs[-1]['completed'] = completed.group(1)
+                continue
+            if not self.runs:
+                # Entries recorded before timestamps were added
+                self.runs.append({'started': None, 'completed': None, 'entries': []})
+            self.runs[-1]['entries'].append(line)
+        self._offset = offset + end
+
+    def _read_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('history_file') == os.path.abspath(self.history_file):
+                self.runs = index['runs']
+                self._offset = index['offset']
+                self._head = index['head']
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+        self.runs, self._offset, self._head = [], 0, None
+
+    def _write_index(self):
+        try:
+            folder = os.path.dirname(self.index_file)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'history_file': os.path.abspath(self.history_file),
+                    'offset': self._offset,
+                    'head': self._head,
+                    'runs': self.runs,
+                }, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️ Could not save failure index: {e}")
+
+    # ============= Queries =============
+
+    def last_run_failures(self):
+        """Entries recorded by the most recent run"""
+        if not self.runs:
+            return []
+        return _unique(self.runs[-1]['entries'])
+
+    def failed_in_last_runs(self, n):
+        """Entries that failed in every one of the last n runs, in the latest run's order"""
+        if n < 1 or len(self.runs) < n:
+            return []
+        recent = self.runs[-n:]
+        common = set(recent[0]['entries'])
+        for run in recent[1:]:
+            common &= set(run['entries'])
+        return [entry for entry in _unique(recent[-1]['entries']) if entry in common]
+
+
+def _unique(entries):
+    """Drop duplicates, keeping first occurrence order"""
+    seen = set()
+    return [entry for entry in entries if not (entry in seen or seen.add(entry))]
+
+
+def main():
+    history = FailureHistory().load()
+    command = sys.argv[1] if len(sys.argv) > 1 else "runs"
+    if command == "last":
+        entries = history.last_run_failures()
+    elif command == "repeated":
+        runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+        entries = history.failed_in_last_runs(runs)
+    else:
+        for number, run in enumerate(history.runs, 1):
+            print(f"{number:>4}. {run['started'] or '(untimestamped)'}  ->  "
+                  f"{run['completed'] or 'not completed'}  failures={len(run['entries'])}")
+        return
+    print(f"📋 {len(entries)} entries")
+    for entry in entries:
+        print(entry)
+
+
+if __name__ == "__main__":
+    # Change to parent directory to access TXT File folder
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(os.path.dirname(script_dir))
+    main()
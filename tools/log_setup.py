@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Logging Setup
+Leveled, non-blocking logging for the automation scripts:
+- the hot loop only puts records on a queue (QueueHandler)
+- a listener thread writes a compact console line and a JSON line to
+  Logs/<name>.jsonl, rotated and gzip-compressed in the background
+
+Level comes from WA_LOG_LEVEL (DEBUG, INFO, WARNING, ...; default INFO).
+Debug lines below the active level are skipped before any formatting.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import sys
+from datetime import datetime
+
+ROOT_LOGGER = "wa"
+
+_ANSI_RE = re.compile(r"\033\[[0-9;]*m")
+_listener = None
+
+
+def get_logger(name):
+    """Return the logger for one script/module, e.g. get_logger("sender")"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class CompactFormatter(logging.Formatter):
+    """'12:04:05 message' for INFO, with the level name added for anything else"""
+
+    def format(self, record):
+        stamp = datetime.fromtimestamp(record.created).strftime('%H:%M:%S')
+        message = record.getMessage()
+        if record.levelno != logging.INFO:
+            message = f"{record.levelname[0]} {message}"
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return f"{stamp} {message}"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; colour codes are stripped from the message"""
+
+    def format(self, record):
+        data = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': _ANSI_RE.sub('', record.getMessage()),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """Console handler that writes above an active tqdm progress bar instead of through it"""
+
+    def emit(self, record):
+        try:
+            message = self.format(record)
+            try:
+                from tqdm import tqdm
+                tqdm.write(message, file=self.stream)
+            except ImportError:
+                self.stream.write(message + self.terminator)
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+def _gzip_rotator(source, dest):
+    """Compress the rotated log file (runs on the listener thread)"""
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def setup_logging(name, level=None, folder="Logs", max_bytes=5 * 1024 * 1024, backup_count=10):
+    """
+    Configure the 'wa' logger tree once per process
+
+    Args:
+        name: log file base name (Logs/<name>.jsonl)
+        level: logging level name/number; defaults to WA_LOG_LEVEL or INFO
+        folder: directory for JSON log files
+        max_bytes: rotate the JSON log after this size
+        backup_count: number of compressed rotations to keep
+
+    Returns:
+        The root 'wa' logger
+    """
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER)
+    if _listener is not None:
+        return root
+
+    level = level or os.environ.get("WA_LOG_LEVEL", "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+
+    console = ConsoleHandler(sys.stdout)
+    console.setFormatter(CompactFormatter())
+    handlers = [console]
+
+    try:
+        os.makedirs(folder, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(folder, f"{name}.jsonl"),
+            maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True
+        )
+        file_handler.rotator = _gzip_rotator
+        file_handler.namer = lambda path: path + ".gz"
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    except OSError as e:
+        print(f"⚠️ File logging disabled: {e}")
+
+    log_queue = queue.SimpleQueue()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return root
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
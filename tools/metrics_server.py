@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Live Metrics Endpoint
+Optional localhost HTTP endpoint exposing send-loop metrics in Prometheus
+text format, e.g.:
+
+    WA_METRICS_PORT=9464 python3 whatsapp-phone-number.py
+    curl http://127.0.0.1:9464/metrics
+
+The main loop only bumps in-memory counters under a short lock; formatting
+and serving happen on the server thread.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 60)
+
+# Sends/min is computed over this many trailing seconds
+RATE_WINDOW = 300
+# Outcomes that count as success: resolve jobs end in "resolved", not "sent"
+SUCCESS_OUTCOMES = ("sent", "resolved")
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels}le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels}le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels.rstrip(",")}}} {self.sum:.6f}'
+        yield f'{name}_count{{{labels.rstrip(",")}}} {self.count}'
+
+
+class SendMetrics:
+    """Counters, gauges and histograms for one sender process"""
+
+    def __init__(self):
+        self.outcomes = defaultdict(int)
+        self.stage_seconds = defaultdict(Histogram)
+        self.queue_depth = 0
+        self.run_total = 0
+        self.run_started = time.time()
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def start_run(self, total):
+        """Reset per-run gauges at the start of loop_through_numbers"""
+        with self._lock:
+            self.run_total = total
+            self.queue_depth = total
+            self.run_started = time.time()
+            self._recent.clear()
+
+    def observe_stage(self, stage, seconds):
+        """StageTimer listener: one histogram sample per finished span"""
+        with self._lock:
+            self.stage_seconds[stage].observe(seconds)
+
+    def entry_finished(self, outcome):
+        """Count one processed entry"""
+        now = time.time()
+        with self._lock:
+            self.outcomes[outcome] += 1
+            self.queue_depth = max(0, self.queue_depth - 1)
+            self._recent.append((now, outcome))
+
+    def snapshot(self):
+        """Derived values: sends/min, entries/min, failure ratio and ETA"""
+        now = time.time()
+        with self._lock:
+            while self._recent and self._recent[0][0] < now - RATE_WINDOW:
+                self._recent.popleft()
+            recent = list(self._recent)
+            outcomes = dict(self.outcomes)
+            queue_depth = self.queue_depth
+            started = self.run_started
+        window = min(RATE_WINDOW, max(now - started, 1.0))
+        entries_per_min = len(recent) * 60.0 / window
+        sends_per_min = sum(1 for _, outcome in recent if outcome in SUCCESS_OUTCOMES) * 60.0 / window
+        processed = sum(outcomes.values())
+        failed = processed - sum(outcomes.get(outcome, 0) for outcome in SUCCESS_OUTCOMES)
+        return {
+            'outcomes': outcomes,
+            'queue_depth': queue_depth,
+            'entries_per_min': entries_per_min,
+            'sends_per_min': sends_per_min,
+            'failure_ratio': failed / processed if processed else 0.0,
+            'eta_seconds': queue_depth * 60.0 / entries_per_min if entries_per_min else -1,
+        }
+
+    def render(self):
+        """Prometheus text exposition format"""
+        snap = self.snapshot()
+        lines = [
+            "# HELP wa_entries_total Entries processed, by outcome",
+            "# TYPE wa_entries_total counter",
+        ]
+        for outcome, count in sorted(snap['outcomes'].items()):
+            lines.append(f'wa_entries_total{{outcome="{outcome}"}} {count}')
+        lines += [
+            "# HELP wa_queue_depth Entries left in the current run",
+            "# TYPE wa_queue_depth gauge",
+            f"wa_queue_depth {snap['queue_depth']}",
+            "# HELP wa_sends_per_minute Successful entries (sent or resolved) per minute (trailing window)",
+            "# TYPE wa_sends_per_minute gauge",
+            f"wa_sends_per_minute {snap['sends_per_min']:.3f}",
+            "# HELP wa_failure_ratio Failed entries / processed entries in this process",
+            "# TYPE wa_failure_ratio gauge",
+            f"wa_failure_ratio {snap['failure_ratio']:.4f}",
+            "# HELP wa_eta_seconds Estimated seconds until the run finishes (-1 = unknown)",
+            "# TYPE wa_eta_seconds gauge",
+            f"wa_eta_seconds {snap['eta_seconds']:.0f}",
+            "# HELP wa_stage_seconds Duration of each send-loop stage",
+            "# TYPE wa_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.stage_seconds.items()):
+                lines.extend(histogram.lines("wa_stage_seconds", f'stage="{stage}",'))
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics = None
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep scrapes out of the console
+
+
+def start_metrics_server(metrics, port, host="127.0.0.1"):
+    """Serve metrics on host:port from a daemon thread; returns the server"""
+    handler = type("MetricsHandler", (_MetricsHandler,), {'metrics': metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    return server
+
+
+def start_metrics_from_env(metrics):
+    """Start the endpoint if WA_METRICS_PORT is set; returns the server or None"""
+    port = os.environ.get("WA_METRICS_PORT", "").strip()
+    if not port:
+        return None
+    try:
+        server = start_metrics_server(metrics, int(port))
+        print(f"📡 Metrics available at http://127.0.0.1:{port}/metrics")
+        return server
+    except (ValueError, OSError) as e:
+        print(f"⚠️ Could not start metrics endpoint on port {port}: {e}")
+        return None
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Output Journal
+A single background writer that owns the result files (not_in_group.txt etc.).
+Callers only queue lines; the writer appends them in batches every
+flush_interval seconds and on flush()/close(). Per-file line counters are kept
+in memory so summaries never re-read the files.
+
+Safe to share between threads: every write goes through one queue and only
+the writer thread touches the files.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+_FLUSH = object()
+_STOP = object()
+
+
+class OutputJournal:
+    """
+    Write-behind appender for result files
+
+    Usage:
+        journal = OutputJournal()
+        journal.write("TXT File/not_in_group.txt", "9779800000000\\n")
+        journal.count("TXT File/not_in_group.txt")   # entries written this run
+        journal.flush()
+    """
+
+    def __init__(self, flush_interval=1.0):
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._counts = defaultdict(int)
+        self._counts_lock = threading.Lock()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._writer, name="output-journal", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def write(self, path, text, counted=True):
+        """
+        Queue text to be appended to path
+
+        Args:
+            counted: count the non-empty lines of text towards count(path);
+                     pass False for banners and separators
+        """
+        self._ensure_started()
+        if counted:
+            lines = sum(1 for line in text.splitlines() if line.strip())
+            with self._counts_lock:
+                self._counts[path] += lines
+        self._queue.put((path, text))
+
+    def count(self, path):
+        """Number of counted lines written to path through this journal"""
+        with self._counts_lock:
+            return self._counts[path]
+
+    def reset_count(self, path):
+        with self._counts_lock:
+            self._counts[path] = 0
+
+    def flush(self, timeout=10):
+        """Block until everything queued so far is on disk"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait(timeout)
+
+    def close(self, timeout=10):
+        """Flush and stop the writer thread"""
+        if self._thread is None:
+            return
+        thread, self._thread = self._thread, None
+        self._queue.put((_STOP, None))
+        thread.join(timeout)
+
+    def _writer(self):
+        pending = defaultdict(list)
+        last_write = time.monotonic()
+        while True:
+            try:
+                path, text = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                path = text = None
+            if path is _FLUSH:
+                self._write_pending(pending)
+                last_write = time.monotonic()
+                text.set()
+            elif path is _STOP:
+                self._write_pending(pending)
+                return
+            elif path is not None:
+                pending[path].append(text)
+            # Also under steady traffic, where the queue is never empty for a whole interval
+            if time.monotonic() - last_write >= self.flush_interval:
+                self._write_pending(pending)
+                last_write = time.monotonic()
+
+    @staticmethod
+    def _write_pending(pending):
+        for path, chunks in pending.items():
+            try:
+                folder = os.path.dirname(path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("".join(chunks))
+            except OSError as e:
+                print(f"⚠️ Could not write {path}: {e}")
+        pending.clear()
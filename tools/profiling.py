@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+On-demand Profiling Hooks
+Profile a production run without editing code:
+
+    WA_PROFILE=cprofile python3 whatsapp-phone-number.py
+    WA_PROFILE=sample WA_PROFILE_EVERY=50 python3 tools/extract_group_names.py
+
+Modes:
+    cprofile - deterministic cProfile, writes .prof files (open with pstats or snakeviz)
+    sample   - low-overhead stack sampler, writes .folded files (flamegraph.pl / speedscope)
+
+Files go to Logs/profiles/: one for the whole run and, when WA_PROFILE_EVERY=N
+is set, one per N entries.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_MODES = ("cprofile", "sample")
+
+# The profiler of the outermost profiled() section, if any
+_active = None
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval from a background thread"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def take(self):
+        """Return the stacks collected so far and start a new chunk"""
+        stacks, self.stacks = self.stacks, Counter()
+        return stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+
+class RunProfiler:
+    """Profiles one run, writing a file per run and optionally per N entries"""
+
+    def __init__(self, mode, name, every=0, folder="Logs/profiles", interval=0.005):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {PROFILE_MODES}")
+        self.mode = mode
+        self.name = name
+        self.every = every
+        self.folder = folder
+        self.interval = interval
+        self.entries = 0
+        self.chunk = 0
+        self.base = os.path.join(folder, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self._profile = None
+        self._run_stats = None
+        self._sampler = None
+        self._run_stacks = Counter()
+
+    def start(self):
+        os.makedirs(self.folder, exist_ok=True)
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+        print(f"🔬 Profiling {self.name} ({self.mode}) -> {self.base}*")
+
+    def tick(self):
+        """Call once per processed entry; writes a chunk file every N entries"""
+        self.entries += 1
+        if self.every and self.entries % self.every == 0:
+            self._write_chunk()
+
+    def stop(self):
+        """Stop profiling and write the whole-run file; returns its path"""
+        if self.mode == "cprofile":
+            self._profile.disable()
+            self._merge_cprofile(self._profile)
+            path = f"{self.base}.prof"
+            self._run_stats.dump_stats(path)
+        else:
+            self._sampler.stop()
+            self._run_stacks.update(self._sampler.take())
+            path = f"{self.base}.folded"
+            self._write_folded(path, self._run_stacks)
+        print(f"🔬 Profile saved to: {path} ({self.entries} entries)")
+        return path
+
+    def _write_chunk(self):
+        self.chunk += 1
+        start = self.entries - self.every + 1
+        chunk_base = f"{self.base}_entries{start}-{self.entries}"
+        if self.mode == "cprofile":
+            self._profile.disable()
+            chunk_profile = self._profile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            chunk_profile.dump_stats(f"{chunk_base}.prof")
+            self._merge_cprofile(chunk_profile)
+        else:
+            stacks = self._sampler.take()
+            self._run_stacks.update(stacks)
+            self._write_folded(f"{chunk_base}.folded", stacks)
+
+    def _merge_cprofile(self, profile):
+        if self._run_stats is None:
+            self._run_stats = pstats.Stats(profile)
+        else:
+            self._run_stats.add(profile)
+
+    @staticmethod
+    def _write_folded(path, stacks):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def profiler_from_env(name):
+    """Create a RunProfiler from WA_PROFILE / WA_PROFILE_EVERY / WA_PROFILE_INTERVAL, or None"""
+    mode = os.environ.get("WA_PROFILE", "").strip().lower()
+    if not mode or mode in ("0", "off", "false"):
+        return None
+    if mode in ("1", "on", "true"):
+        mode = "cprofile"
+    try:
+        every = int(os.environ.get("WA_PROFILE_EVERY", "0") or 0)
+        interval = float(os.environ.get("WA_PROFILE_INTERVAL", "0.005") or 0.005)
+        return RunProfiler(mode, name, every=every, interval=interval)
+    except ValueError as e:
+        print(f"⚠️ Profiling disabled: {e}")
+        return None
+
+
+@contextmanager
+def profiled(name):
+    """
+    Profile the wrapped block (or decorated function) when WA_PROFILE is set
+
+    Nested sections are folded into the outermost one, so decorating both a
+    caller and a callee never starts two profilers.
+    """
+    global _active
+    if _active is not None:
+        yield _active
+        return
+    profiler = profiler_from_env(name)
+    if profiler is None:
+        yield None
+        return
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        # stop_active() may already have written it
+        if _active is profiler:
+            stop_active()
+
+
+def entry_done():
+    """Mark one processed entry for the active profiler (no-op when profiling is off)"""
+    if _active is not None:
+        _active.tick()
+
+
+def stop_active():
+    """Write the active profile now, e.g. from a signal handler that is about to exit"""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        try:
+            profiler.stop()
+        except Exception as e:
+            print(f"⚠️ Could not write profile: {e}")
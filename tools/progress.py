@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Run Progress
+Progress display for the send loop and the group extractor: an EWMA of the
+time per entry drives the rate and ETA, so both follow the current stage
+latencies instead of the whole-run average. Success/failure counters are shown
+alongside.
+
+On a terminal this is a tqdm bar; when output is not a TTY (piped, launched
+from the GUI, cron) it logs a one-line summary every log_every seconds instead.
+"""
+
+import sys
+import time
+
+from tools.log_setup import get_logger
+
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
+log = get_logger("progress")
+
+_BAR_FORMAT = "{desc} {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}{postfix}]"
+_COUNTER_FORMAT = "{desc} {n_fmt} [{elapsed}{postfix}]"
+
+
+def format_duration(seconds):
+    """Seconds as H:MM:SS (or M:SS under an hour)"""
+    if seconds is None:
+        return "?"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class RunProgress:
+    """
+    Progress for one run
+
+    Usage:
+        progress = RunProgress(len(entries), "📤 Sending")
+        for entry in entries:
+            ...
+            progress.update(ok=outcome == "sent")
+        progress.close()
+    """
+
+    def __init__(self, total=None, desc="", alpha=0.2, log_every=30.0,
+                 ok_label="ok", fail_label="failed", stream=None):
+        self.total = total
+        self.desc = desc
+        self.alpha = alpha
+        self.log_every = log_every
+        self.ok_label = ok_label
+        self.fail_label = fail_label
+        self.done = 0
+        self.ok = 0
+        self.failed = 0
+        self.seconds_per_entry = None
+        self.started = time.monotonic()
+        self._last = self.started
+        self._last_log = self.started
+        self._logged_done = 0
+        stream = stream or sys.stderr
+        self._bar = None
+        if TQDM_AVAILABLE and hasattr(stream, "isatty") and stream.isatty():
+            self._bar = tqdm(total=total, desc=desc, unit="entry", file=stream, dynamic_ncols=True,
+                             bar_format=_BAR_FORMAT if total else _COUNTER_FORMAT)
+
+    @property
+    def entries_per_minute(self):
+        if not self.seconds_per_entry:
+            return 0.0
+        return 60.0 / self.seconds_per_entry
+
+    @property
+    def eta_seconds(self):
+        """Estimated seconds left, or None while unknown"""
+        if not self.total or self.seconds_per_entry is None:
+            return None
+        return max(0, self.total - self.done) * self.seconds_per_entry
+
+    def update(self, ok=True):
+        """Count one finished entry"""
+        now = time.monotonic()
+        elapsed, self._last = now - self._last, now
+        if self.seconds_per_entry is None:
+            self.seconds_per_entry = elapsed
+        else:
+            self.seconds_per_entry += self.alpha * (elapsed - self.seconds_per_entry)
+        self.done += 1
+        if ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+
+        if self._bar is not None:
+            self._bar.set_postfix_str(self._postfix(), refresh=False)
+            self._bar.update(1)
+        elif now - self._last_log >= self.log_every:
+            self._last_log = now
+            self._logged_done = self.done
+            log.info(self.summary_line())
+
+    def _postfix(self):
+        parts = [f"{self.ok_label}={self.ok}", f"{self.fail_label}={self.failed}",
+                 f"{self.entries_per_minute:.1f}/min"]
+        if self.total:
+            parts.append(f"ETA {format_duration(self.eta_seconds)}")
+        return " ".join(parts)
+
+    def summary_line(self):
+        """One-line status for logs"""
+        count = f"{self.done}/{self.total}" if self.total else f"{self.done}"
+        return (f"⏳ {self.desc} {count} | {self.ok_label} {self.ok}, {self.fail_label} {self.failed} | "
+                f"{self.entries_per_minute:.1f}/min | elapsed {format_duration(time.monotonic() - self.started)}"
+                + (f" | ETA {format_duration(self.eta_seconds)}" if self.total else ""))
+
+    def close(self):
+        if self._bar is not None:
+            self._bar.close()
+            self._bar = None
+        elif self.done != self._logged_done:
+            log.info(self.summary_line())
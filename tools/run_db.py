@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Run Database
+Records every run, entry attempt, stage timing and outcome in a local SQLite
+database (WAL mode) so results can be queried instead of grepped.
+
+Writes are queued and committed in batches by a background thread, so the
+send loop never waits on disk.
+
+Usage (reports):
+    python3 tools/run_db.py runs
+    python3 tools/run_db.py repeat-failures 3
+    python3 tools/run_db.py median-send 7
+"""
+
+import os
+import queue
+import socket
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+
+DEFAULT_DB_PATH = "Data/runs.db"
+SUCCESS_OUTCOMES = ("sent", "resolved")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    action TEXT NOT NULL,
+    source_file TEXT,
+    host TEXT,
+    total_entries INTEGER,
+    successful INTEGER,
+    failed INTEGER
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    row_number INTEGER,
+    entry TEXT NOT NULL,
+    entry_type TEXT,
+    outcome TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    duration_s REAL,
+    chat_title TEXT
+);
+CREATE TABLE IF NOT EXISTS stage_timings (
+    attempt_id INTEGER NOT NULL REFERENCES attempts(id),
+    stage TEXT NOT NULL,
+    duration_s REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_run ON attempts(run_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_entry ON attempts(entry, run_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_outcome_time ON attempts(outcome, started_at);
+CREATE INDEX IF NOT EXISTS idx_stage_attempt ON stage_timings(attempt_id);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+"""
+
+_STOP = object()
+
+# Recorder of the run in progress, so a signal handler can flush it before exiting
+_active = None
+
+
+def connect(path=DEFAULT_DB_PATH):
+    """Open the database (creating it and the schema if needed) in WAL mode"""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class RunRecorder:
+    """
+    Write-behind recorder for one run
+
+    Usage:
+        recorder = RunRecorder()
+        recorder.start_run("send_messages", "TXT File/phone_number.txt", total)
+        recorder.record_attempt(row, entry, "phone", "sent", started_at, 8.2, stages)
+        recorder.finish_run(successful, failed)
+        recorder.close()
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=50, flush_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.run_id = None
+        self.successful = 0
+        self.failed = 0
+        self.finished = False
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name="run-db-writer", daemon=True)
+        self._thread.start()
+        global _active
+        _active = self
+
+    def start_run(self, action, source_file=None, total_entries=None):
+        """Queue the run row; attempts recorded afterwards are attached to it"""
+        self._queue.put(('run', (datetime.now().isoformat(timespec='seconds'), action,
+                                 source_file, socket.gethostname(), total_entries)))
+
+    def record_attempt(self, row_number, entry, entry_type, outcome, started_at,
+                       duration_s, stages=None, chat_title=None):
+        """
+        Queue one entry attempt
+
+        Args:
+            stages: list of (stage_name, duration_seconds) for this attempt
+        """
+        if outcome in SUCCESS_OUTCOMES:
+            self.successful += 1
+        else:
+            self.failed += 1
+        self._queue.put(('attempt', (row_number, entry, entry_type, outcome,
+                                     started_at, duration_s, chat_title), stages or []))
+
+    def finish_run(self, successful, failed):
+        self.finished = True
+        self._queue.put(('finish', (datetime.now().isoformat(timespec='seconds'), successful, failed)))
+
+    def close(self, timeout=10):
+        """Flush everything queued and stop the writer thread"""
+        global _active
+        if _active is self:
+            _active = None
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _writer(self):
+        try:
+            conn = connect(self.path)
+        except sqlite3.Error as e:
+            print(f"⚠️ Run database disabled: {e}")
+            while self._queue.get() is not _STOP:
+                pass
+            return
+        pending = 0
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is None:
+                if pending:
+                    conn.commit()
+                    pending = 0
+                continue
+            try:
+                pending += self._apply(conn, item)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not record to run database: {e}")
+            if pending >= self.batch_size or item[0] != 'attempt':
+                conn.commit()
+                pending = 0
+        conn.commit()
+        conn.close()
+
+    def _apply(self, conn, item):
+        kind = item[0]
+        if kind == 'run':
+            cursor = conn.execute(
+                "INSERT INTO runs (started_at, action, source_file, host, total_entries) VALUES (?, ?, ?, ?, ?)",
+                item[1])
+            self.run_id = cursor.lastrowid
+        elif kind == 'attempt':
+            cursor = conn.execute(
+                "INSERT INTO attempts (run_id, row_number, entry, entry_type, outcome, started_at, duration_s, chat_title) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (self.run_id,) + item[1])
+            if item[2]:
+                conn.executemany(
+                    "INSERT INTO stage_timings (attempt_id, stage, duration_s) VALUES (?, ?, ?)",
+                    [(cursor.lastrowid, stage, duration) for stage, duration in item[2]])
+        elif kind == 'finish':
+            finished_at, successful, failed = item[1]
+            conn.execute("UPDATE runs SET finished_at = ?, successful = ?, failed = ? WHERE id = ?",
+                         (finished_at, successful, failed, self.run_id))
+        return 1
+
+
+def close_active():
+    """Finish and flush the run in progress now, e.g. from a signal handler that is about to exit
+
+    A run that never reached finish_run is closed with the counts of the
+    attempts recorded so far.
+    """
+    recorder = _active
+    if recorder is None:
+        return
+    try:
+        if not recorder.finished:
+            recorder.finish_run(recorder.successful, recorder.failed)
+        recorder.close()
+    except Exception as e:
+        print(f"⚠️ Could not close run database: {e}")
+
+
+# ============= Reports =============
+
+def recent_runs(conn, limit=10):
+    """Last runs with their counts"""
+    return conn.execute(
+        "SELECT id, started_at, finished_at, action, total_entries, successful, failed "
+        "FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+
+def repeat_failures(conn, last_n_runs=3, action="send_messages"):
+    """Entries that failed in every one of the last N runs that attempted them"""
+    return [row[0] for row in conn.execute(
+        """
+        WITH recent AS (
+            SELECT id FROM runs WHERE action = ? ORDER BY id DESC LIMIT ?
+        )
+        SELECT entry FROM attempts
+        WHERE run_id IN (SELECT id FROM recent)
+        GROUP BY entry
+        HAVING COUNT(DISTINCT run_id) = ? AND SUM(outcome = 'sent') = 0
+        ORDER BY entry
+        """, (action, last_n_runs, last_n_runs))]
+
+
+def _median(durations):
+    if not durations:
+        return None
+    middle = len(durations) // 2
+    if len(durations) % 2:
+        return durations[middle]
+    return (durations[middle - 1] + durations[middle]) / 2
+
+
+def median_send_seconds(conn, days=7):
+    """Median duration of successful sends over the last `days` days"""
+    since = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+    return _median([row[0] for row in conn.execute(
+        "SELECT duration_s FROM attempts WHERE outcome = 'sent' AND started_at >= ? "
+        "AND duration_s IS NOT NULL ORDER BY duration_s", (since,))])
+
+
+def median_entry_seconds(conn, days=7):
+    """Median duration of any attempt (sent or failed) over the last `days` days"""
+    since = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+    return _median([row[0] for row in conn.execute(
+        "SELECT duration_s FROM attempts WHERE started_at >= ? "
+        "AND duration_s IS NOT NULL ORDER BY duration_s", (since,))])
+
+
+def main():
+    """Small command-line report over the run database"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("runs", "repeat-failures", "median-send"):
+        print(__doc__)
+        return
+    conn = connect(os.environ.get("WA_RUN_DB", DEFAULT_DB_PATH))
+    command = sys.argv[1]
+    argument = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    if command == "runs":
+        for run in recent_runs(conn, argument or 10):
+            print("{:>5}  {}  ->  {}  {:<14} total={} ok={} failed={}".format(*run))
+    elif command == "repeat-failures":
+        entries = repeat_failures(conn, argument or 3)
+        print(f"📋 {len(entries)} entries failed in each of the last {argument or 3} runs")
+        for entry in entries:
+            print(entry)
+    elif command == "median-send":
+        median = median_send_seconds(conn, argument or 7)
+        if median is None:
+            print("No successful sends recorded in that period")
+        else:
+            print(f"⏱️  Median time per send over the last {argument or 7} days: {median:.2f}s")
+    conn.close()
+
+
+if __name__ == "__main__":
+    # Change to parent directory to access the Data folder
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(os.path.dirname(script_dir))
+    main()
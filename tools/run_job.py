@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Batch Job Runner
+Runs one job spec end to end without any input() prompts, for cron and
+back-to-back campaigns. Prints a JSON summary as the last line of output and
+exits with a machine-readable code.
+
+Usage:
+    python3 tools/run_job.py job.json [--summary Logs/job_summary.json]
+
+Job spec (JSON, only "action" is required):
+    {
+        "action": "send",                       # send | resolve | extract
+        "list_file": "TXT File/phone_number.txt",
+        "start_row": 1,
+        "max_rows": 200,
+        "entries": ["9779800000000"],           # process these instead of list_file rows
+        "message_file": "TXT File/description.txt",
+        "image": "IMAGE-TO-SEND/promo.jpg",
+        "rate_per_minute": 4,                   # at most this many entries per minute, shared by all shards
+        "finish_by": "17:30",                   # or "run_minutes": 90
+        "headless": true,                       # default: headless when there is no display
+        "login_timeout": 60,
+        "profile_mode": "inplace",              # inplace | slim | copy (default WA_PROFILE_MODE)
+        "browser_mode": "lean",                 # standard | lean (default WA_BROWSER_MODE)
+        "backend": "firefox",                   # firefox | chromium (default WA_BACKEND)
+        "entry_mode": "macro",                  # steps | macro (default WA_ENTRY_MODE)
+        "concurrency": 2,                       # rows split across subprocess shards,
+        "profiles": ["/path/profile-a", "/path/profile-b"]   # one logged-in profile each
+    }
+
+Exit codes:
+    0  all entries succeeded
+    1  finished, some entries failed
+    2  invalid job spec
+    3  command budget exceeded (WA_COMMAND_BUDGET)
+    4  browser could not start or WhatsApp Web is not logged in
+    5  stopped by the time box before the end of the list
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from tools.failure_history import START_RE, END_RE
+from wa_engine.backends import BACKENDS
+from wa_engine.macro import ENTRY_MODES
+from wa_engine.prefs import BROWSER_MODES
+from wa_engine.profile import PROFILE_MODES
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_BAD_SPEC = 2
+EXIT_BUDGET = 3
+EXIT_BROWSER = 4
+EXIT_TIME_BOX = 5
+
+# When shards disagree, the job reports the most serious code
+_SEVERITY = (EXIT_BAD_SPEC, EXIT_BROWSER, EXIT_BUDGET, EXIT_FAILURES, EXIT_TIME_BOX, EXIT_OK)
+
+ACTIONS = ("send", "resolve", "extract")
+DEFAULT_LIST_FILE = "TXT File/phone_number.txt"
+NOT_IN_GROUP_FILE = "TXT File/not_in_group.txt"
+JOB_FOLDER = "Data/jobs"
+
+
+class JobSpecError(ValueError):
+    pass
+
+
+def load_spec(path):
+    """Read and validate a job spec; raises JobSpecError"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+    except (OSError, ValueError) as e:
+        raise JobSpecError(f"cannot read job spec {path}: {e}")
+    return validate_spec(spec)
+
+
+def validate_spec(spec):
+    if not isinstance(spec, dict):
+        raise JobSpecError("job spec must be a JSON object")
+    if spec.get("action") not in ACTIONS:
+        raise JobSpecError(f"action must be one of {', '.join(ACTIONS)}")
+    spec.setdefault("list_file", DEFAULT_LIST_FILE)
+    entries = spec.get("entries")
+    if entries is not None and (not isinstance(entries, list)
+                                or not all(isinstance(entry, str) and entry.strip() for entry in entries)):
+        raise JobSpecError("entries must be a list of non-empty strings")
+    if spec["action"] != "extract" and entries is None and not os.path.exists(spec["list_file"]):
+        raise JobSpecError(f"list file not found: {spec['list_file']}")
+    if spec["action"] == "send" and spec.get("message_file") and not os.path.exists(spec["message_file"]):
+        raise JobSpecError(f"message file not found: {spec['message_file']}")
+    if spec.get("image") and not os.path.exists(spec["image"]):
+        raise JobSpecError(f"image not found: {spec['image']}")
+    for key in ("start_row", "max_rows", "concurrency", "login_timeout"):
+        if key in spec and (not isinstance(spec[key], int) or isinstance(spec[key], bool) or spec[key] < 1):
+            raise JobSpecError(f"{key} must be a positive integer")
+    for key in ("rate_per_minute", "run_minutes"):
+        if key in spec and (not isinstance(spec[key], (int, float)) or isinstance(spec[key], bool)
+                            or spec[key] <= 0):
+            raise JobSpecError(f"{key} must be a positive number")
+    if spec.get("profile_mode") and spec["profile_mode"] not in PROFILE_MODES:
+        raise JobSpecError(f"profile_mode must be one of {', '.join(PROFILE_MODES)}")
+    if spec.get("browser_mode") and spec["browser_mode"] not in BROWSER_MODES:
+        raise JobSpecError(f"browser_mode must be one of {', '.join(BROWSER_MODES)}")
+    if spec.get("backend") and spec["backend"] not in BACKENDS:
+        raise JobSpecError(f"backend must be one of {', '.join(BACKENDS)}")
+    if spec.get("entry_mode") and spec["entry_mode"] not in ENTRY_MODES:
+        raise JobSpecError(f"entry_mode must be one of {', '.join(ENTRY_MODES)}")
+    if spec.get("finish_by") and not re.match(r"^\d{1,2}:\d{2}$", str(spec["finish_by"])):
+        raise JobSpecError("finish_by must be HH:MM")
+    # Same parser the run uses, so "25:00" or an endless run_minutes fails here (exit 2) rather than mid-job
+    from tools.time_box import parse_deadline
+    for key, args in (("finish_by", (spec.get("finish_by"), None)), ("run_minutes", (None, spec.get("run_minutes")))):
+        try:
+            parse_deadline(*args)
+        except (ValueError, OverflowError) as e:
+            raise JobSpecError(f"{key} is not valid: {e}")
+    concurrency = spec.get("concurrency", 1)
+    if concurrency > 1:
+        if spec["action"] == "extract":
+            raise JobSpecError("extract jobs cannot be sharded")
+        if entries is not None:
+            raise JobSpecError("jobs with entries cannot be sharded")
+        if len(spec.get("profiles", [])) < concurrency:
+            raise JobSpecError("concurrency > 1 needs one logged-in Firefox profile per shard in 'profiles'")
+    return spec
+
+
+def _gmt7_timestamp():
+    # Same GMT+7 format the sender writes into not_in_group.txt
+    return (datetime.utcnow() + timedelta(hours=7)).strftime("%Y-%m-%d %H:%M:%S GMT+7")
+
+
+# ============= Single process =============
+
+def run_single(spec, shard=None):
+    """Run the job in this process on its own browser; returns the summary dict"""
+    from tools.command_counter import CommandBudgetExceeded
+    from tools.log_setup import setup_logging, shutdown_logging
+    from tools.time_box import parse_deadline
+
+    started = time.time()
+    summary = {'action': spec['action'], 'shard': shard,
+               'started_at': datetime.now().isoformat(timespec='seconds')}
+
+    try:
+        from wa_engine import Session, extract_groups, run_entries
+        session = Session(
+            phone_number_file=spec["list_file"],
+            message_file=spec.get("message_file", "TXT File/description.txt"),
+            image_file=spec.get("image"),
+            not_in_group_file=spec["failures_file"] if shard is not None else NOT_IN_GROUP_FILE,
+            backend=spec.get("backend"),
+        )
+    except Exception as e:
+        summary.update(exit_code=EXIT_BROWSER, error=f"could not load the engine: {e!r}")
+        return summary
+
+    setup_logging("job" if shard is None else f"job_shard{shard}")
+    try:
+        try:
+            if spec.get("profile"):
+                session.start(spec["profile"], headless=spec.get("headless"),
+                              profile_mode=spec.get("profile_mode"), browser_mode=spec.get("browser_mode"))
+            else:
+                session.start(headless=spec.get("headless"), profile_mode=spec.get("profile_mode"),
+                              browser_mode=spec.get("browser_mode"))
+            session.open_whatsapp(login_timeout=spec.get("login_timeout", 60))
+        except Exception as e:
+            summary.update(exit_code=EXIT_BROWSER, error=f"browser not ready or not logged in: {e!r}")
+            return summary
+
+        if spec["action"] == "extract":
+            names = extract_groups(session)
+            summary.update(groups=len(names), exit_code=EXIT_OK if names else EXIT_FAILURES)
+        else:
+            deadline = parse_deadline(spec.get("finish_by"), spec.get("run_minutes"))
+            rate = spec.get("rate_per_minute")
+            run_entries(
+                session, spec.get("start_row"), spec.get("max_rows"), None, entries=spec.get("entries"),
+                deadline=deadline, send=(spec["action"] == "send"), min_interval=60.0 / rate if rate else None,
+                entry_mode=spec.get("entry_mode"),
+            )
+            run = dict(session.last_run)
+            summary.update(run, outcomes=session.metrics.snapshot()['outcomes'])
+            if not run:
+                summary['exit_code'] = EXIT_FAILURES
+                summary['error'] = "no entries processed"
+            elif run.get('stopped_at_row') is not None:
+                summary['exit_code'] = EXIT_TIME_BOX
+            else:
+                summary['exit_code'] = EXIT_FAILURES if run['failed'] else EXIT_OK
+
+        try:
+            session.command_counter.check_budget()
+        except CommandBudgetExceeded as e:
+            summary.update(exit_code=EXIT_BUDGET, error=f"command budget exceeded: {e}")
+        return summary
+    finally:
+        session.close()
+        summary['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        summary['duration_s'] = round(time.time() - started, 1)
+        shutdown_logging()
+
+
+# ============= Shards =============
+
+def _count_rows(list_file):
+    with open(list_file, "r", encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def shard_specs(spec):
+    """Split the job's row range into contiguous slices, one per profile"""
+    concurrency = spec["concurrency"]
+    first = spec.get("start_row", 1)
+    last = _count_rows(spec["list_file"])
+    if spec.get("max_rows"):
+        last = min(last, first + spec["max_rows"] - 1)
+    rows = max(0, last - first + 1)
+    size, extra = divmod(rows, concurrency)
+    shards, start = [], first
+    for index in range(concurrency):
+        count = size + (1 if index < extra else 0)
+        if count == 0:
+            continue
+        shard = dict(spec, start_row=start, max_rows=count, profile=spec["profiles"][index], concurrency=1,
+                     failures_file=os.path.join(JOB_FOLDER, f"not_in_group.shard{index}.txt"))
+        shards.append((index, shard))
+        start += count
+    # The job's rate is shared by its shards, not granted to each one
+    if spec.get("rate_per_minute") and shards:
+        for _, shard in shards:
+            shard["rate_per_minute"] = spec["rate_per_minute"] / len(shards)
+    return shards
+
+
+def run_sharded(spec):
+    """Run each shard in its own subprocess/browser and merge the results"""
+    os.makedirs(JOB_FOLDER, exist_ok=True)
+    started = time.time()
+    children = []
+    for index, shard in shard_specs(spec):
+        spec_path = os.path.join(JOB_FOLDER, f"shard{index}.json")
+        summary_path = os.path.join(JOB_FOLDER, f"shard{index}.summary.json")
+        for path in (summary_path, shard["failures_file"]):
+            if os.path.exists(path):
+                os.remove(path)
+        with open(spec_path, "w", encoding="utf-8") as f:
+            json.dump(shard, f, ensure_ascii=False)
+        print(f"🚀 Shard {index}: rows {shard['start_row']}-{shard['start_row'] + shard['max_rows'] - 1}")
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), spec_path,
+                                    "--shard", str(index), "--summary", summary_path])
+        children.append((index, process, summary_path, shard["failures_file"]))
+
+    summaries = []
+    for index, process, summary_path, _ in children:
+        code = process.wait()
+        try:
+            with open(summary_path, "r", encoding="utf-8") as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            summaries.append({'shard': index, 'exit_code': code, 'error': "shard exited without a summary"})
+
+    merge_failures([failures for _, _, _, failures in children], NOT_IN_GROUP_FILE)
+
+    codes = {s.get('exit_code', EXIT_FAILURES) for s in summaries}
+    outcomes = {}
+    for s in summaries:
+        for name, count in s.get('outcomes', {}).items():
+            outcomes[name] = outcomes.get(name, 0) + count
+    return {
+        'action': spec['action'],
+        'concurrency': len(children),
+        'successful': sum(s.get('successful', 0) for s in summaries),
+        'failed': sum(s.get('failed', 0) for s in summaries),
+        'total': sum(s.get('total', 0) for s in summaries),
+        'outcomes': outcomes,
+        'shards': summaries,
+        'duration_s': round(time.time() - started, 1),
+        'exit_code': next(code for code in _SEVERITY if code in codes) if codes else EXIT_FAILURES,
+    }
+
+
+def merge_failures(shard_files, target):
+    """Append all shard failures to not_in_group.txt as one run section"""
+    entries = []
+    for path in shard_files:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            entries += [line.strip() for line in f
+                        if line.strip() and not START_RE.match(line.strip()) and not END_RE.match(line.strip())]
+        os.remove(path)
+    with open(target, "a", encoding="utf-8") as f:
+        f.write(f"\n=== Processing started: {_gmt7_timestamp()} ===\n")
+        f.writelines(entry + "\n" for entry in entries)
+        f.write(f"=== Processing completed: {_gmt7_timestamp()} ===\n\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a WhatsApp automation job spec without prompts")
+    parser.add_argument("spec", help="path to a JSON job spec")
+    parser.add_argument("--summary", help="also write the JSON summary to this file")
+    parser.add_argument("--shard", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        spec = load_spec(args.spec)
+    except JobSpecError as e:
+        summary = {'exit_code': EXIT_BAD_SPEC, 'error': str(e)}
+    else:
+        if spec.get("concurrency", 1) > 1:
+            summary = run_sharded(spec)
+        else:
+            summary = run_single(spec, args.shard)
+
+    if args.summary:
+        folder = os.path.dirname(args.summary)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(json.dumps(summary, ensure_ascii=False))
+    sys.exit(summary['exit_code'])
+
+
+if __name__ == "__main__":
+    # Change to parent directory so relative paths in specs match the other scripts
+    os.chdir(REPO_DIR)
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Stage Timer
+Named timing spans for the automation loops, with JSONL / Chrome trace export
+and an end-of-run percentile table per stage
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile (0-100) of values using linear interpolation"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * (pct / 100.0)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class StageTimer:
+    """
+    Collects timing spans for each stage of a run
+
+    Usage:
+        timer = StageTimer()
+        timer.begin_entry(row, "9779800000000")
+        with timer.span("search_box"):
+            ...
+        timer.sleep(0.5)
+        timer.end_entry("sent")
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.entry = None
+        self.listeners = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Register callback(name, duration_seconds) called for every finished span"""
+        self.listeners.append(callback)
+
+    def reset(self):
+        """Drop all recorded spans (e.g. between jobs on a long-lived session); listeners stay"""
+        with self._lock:
+            self.spans = []
+        self.entry = None
+
+    def begin_entry(self, row, label):
+        """Mark the start of a new entry; following spans are tagged with it"""
+        with self._lock:
+            first_span = len(self.spans)
+        self.entry = {'row': row, 'label': label, 'start': time.perf_counter(), 'first_span': first_span}
+
+    def end_entry(self, outcome):
+        """
+        Close the current entry with its outcome and record it as an 'entry' span
+
+        Returns:
+            The spans recorded for this entry, ending with the 'entry' span
+        """
+        if self.entry is None:
+            return []
+        entry = self.entry
+        self._record("entry", entry['start'], time.perf_counter(), {'outcome': outcome})
+        self.entry = None
+        with self._lock:
+            return self.spans[entry['first_span']:]
+
+    @contextmanager
+    def span(self, name, **fields):
+        """Time the wrapped block as stage `name`"""
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            fields['error'] = type(e).__name__
+            raise
+        finally:
+            self._local.depth = depth
+            self._record(name, start, time.perf_counter(), fields, depth)
+
+    def sleep(self, seconds, name="sleep"):
+        """time.sleep that shows up as its own stage"""
+        with self.span(name):
+            time.sleep(seconds)
+
+    def record(self, name, start, duration, depth=1, **fields):
+        """Add a span timed elsewhere (e.g. inside the page); start is a time.perf_counter() value"""
+        self._record(name, start, start + duration, fields, depth)
+
+    def _record(self, name, start, end, fields=None, depth=0):
+        span = {
+            'name': name,
+            'start': start - self._origin,
+            'duration': end - start,
+            'depth': depth,
+            'thread': threading.get_ident(),
+        }
+        if self.entry is not None:
+            span['row'] = self.entry['row']
+            span['entry'] = self.entry['label']
+        if fields:
+            span['fields'] = fields
+        with self._lock:
+            self.spans.append(span)
+        for callback in self.listeners:
+            try:
+                callback(name, span['duration'])
+            except Exception:
+                pass
+
+    def entry_spans(self, row):
+        """Return all spans recorded for the given row"""
+        with self._lock:
+            return [span for span in self.spans if span.get('row') == row]
+
+    def durations_by_stage(self):
+        """Group span durations (seconds) by stage name"""
+        stages = defaultdict(list)
+        with self._lock:
+            for span in self.spans:
+                stages[span['name']].append(span['duration'])
+        return stages
+
+    def summary(self):
+        """Return one row per stage: count, total, mean, p50, p90, p99 (seconds)"""
+        rows = []
+        for name, durations in self.durations_by_stage().items():
+            total = sum(durations)
+            rows.append({
+                'stage': name,
+                'count': len(durations),
+                'total': total,
+                'mean': total / len(durations),
+                'p50': percentile(durations, 50),
+                'p90': percentile(durations, 90),
+                'p99': percentile(durations, 99),
+            })
+        rows.sort(key=lambda row: row['total'], reverse=True)
+        return rows
+
+    def print_summary(self):
+        """Print the per-stage percentile table"""
+        rows = self.summary()
+        if not rows:
+            return
+        print("\n⏱️  STAGE LATENCY SUMMARY (seconds)")
+        print(f"{'stage':<22}{'count':>7}{'total':>10}{'mean':>8}{'p50':>8}{'p90':>8}{'p99':>8}")
+        for row in rows:
+            print(f"{row['stage']:<22}{row['count']:>7}{row['total']:>10.2f}{row['mean']:>8.2f}"
+                  f"{row['p50']:>8.2f}{row['p90']:>8.2f}{row['p99']:>8.2f}")
+
+    def export_jsonl(self, path):
+        """Write one JSON object per span"""
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, 'w', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False) + "\n")
+        return path
+
+    def export_chrome_trace(self, path):
+        """Write spans in Chrome trace-event format (load in chrome://tracing or Perfetto)"""
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for span in spans:
+            args = dict(span.get('fields', {}))
+            if 'entry' in span:
+                args['row'] = span['row']
+                args['entry'] = span['entry']
+            events.append({
+                'name': span['name'],
+                'cat': 'entry' if span['name'] == 'entry' else 'stage',
+                'ph': 'X',
+                'ts': round(span['start'] * 1_000_000),
+                'dur': round(span['duration'] * 1_000_000),
+                'pid': os.getpid(),
+                'tid': span['thread'],
+                'args': args,
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return path
+
+    def export(self, folder="Logs", prefix="stages"):
+        """Export both formats into folder with a timestamped name, returns the paths"""
+        if not self.spans:
+            return []
+        os.makedirs(folder, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        base = os.path.join(folder, f"{prefix}_{stamp}")
+        return [
+            self.export_jsonl(f"{base}.jsonl"),
+            self.export_chrome_trace(f"{base}.trace.json"),
+        ]
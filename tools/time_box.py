@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Time Box
+Fits a send run into a time window ("finish by 17:30" or "run for 90 minutes").
+The number of rows that fit is estimated from the median attempt time in the
+run database; during the run the estimate is replaced by the live per-entry
+rate and re-checked before every entry, so the run stops at a row boundary
+before the deadline.
+
+Set from the environment with WA_FINISH_BY=HH:MM or WA_RUN_MINUTES=N, or from
+the row selection menu.
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from tools.run_db import DEFAULT_DB_PATH, connect, median_entry_seconds
+
+# Used when the run database has no recent attempts yet
+FALLBACK_SECONDS_PER_ENTRY = 15.0
+
+
+def parse_deadline(finish_by=None, run_minutes=None, now=None):
+    """
+    Turn 'HH:MM' or a number of minutes into a deadline
+
+    A finish time that has already passed today is taken as tomorrow.
+    Raises ValueError for malformed values.
+    """
+    now = now or datetime.now()
+    if run_minutes not in (None, ""):
+        minutes = float(run_minutes)
+        if minutes <= 0:
+            raise ValueError("run minutes must be positive")
+        return now + timedelta(minutes=minutes)
+    if finish_by not in (None, ""):
+        hour, minute = (int(part) for part in str(finish_by).strip().split(":"))
+        deadline = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if deadline <= now:
+            deadline += timedelta(days=1)
+        return deadline
+    return None
+
+
+def deadline_from_env():
+    """Deadline from WA_RUN_MINUTES / WA_FINISH_BY, or None"""
+    try:
+        return parse_deadline(os.environ.get("WA_FINISH_BY"), os.environ.get("WA_RUN_MINUTES"))
+    except ValueError as e:
+        print(f"⚠️ Ignoring time box settings: {e}")
+        return None
+
+
+def historical_seconds_per_entry(db_path=None, days=7):
+    """Median attempt time from the run database, or the fallback"""
+    path = db_path or os.environ.get("WA_RUN_DB", DEFAULT_DB_PATH)
+    if os.path.exists(path):
+        try:
+            conn = connect(path)
+            try:
+                median = median_entry_seconds(conn, days)
+            finally:
+                conn.close()
+            if median:
+                return median
+        except sqlite3.Error:
+            pass
+    return FALLBACK_SECONDS_PER_ENTRY
+
+
+class TimeBox:
+    """
+    Deadline for one run
+
+    Usage:
+        box = TimeBox(deadline)
+        box.rows_that_fit()                     # estimate shown before the run
+        if not box.has_time_for_next(progress.seconds_per_entry):
+            break
+    """
+
+    def __init__(self, deadline, seconds_per_entry=None):
+        self.deadline = deadline
+        self.seconds_per_entry = seconds_per_entry or historical_seconds_per_entry()
+
+    def seconds_left(self, now=None):
+        return max(0.0, (self.deadline - (now or datetime.now())).total_seconds())
+
+    def rows_that_fit(self, seconds_per_entry=None, now=None):
+        return int(self.seconds_left(now) // (seconds_per_entry or self.seconds_per_entry))
+
+    def has_time_for_next(self, seconds_per_entry=None, now=None):
+        """True if one more entry (at the live rate when known) ends before the deadline"""
+        return self.seconds_left(now) >= (seconds_per_entry or self.seconds_per_entry)
+
+    def describe(self):
+        return (f"finish by {self.deadline.strftime('%H:%M')} - about {self.rows_that_fit()} rows "
+                f"at {self.seconds_per_entry:.1f}s per entry")
@@ -1,11 +1,11 @@
 from selenium import webdriver
 from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.firefox.options import Options
-from webdriver_manager.firefox import GeckoDriverManager
 import time
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 import os
@@ -14,22 +14,40 @@ from selenium.webdriver.support.ui import Select
 from datetime import datetime
 from collections import defaultdict
 from tqdm import tqdm
-import pyperclip
 import re
 import signal
 import sys
 import threading
+import logging
+
+# Allow "from tools.x import y" when run as tools/whatsapp.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools.command_counter import CommandCounter
+from tools.log_setup import get_logger, setup_logging
+from tools.profiling import profiled, entry_done
+from wa_engine.geckodriver import resolve_geckodriver
+from wa_engine.platform_input import (attach_image, headless_requested, input_mode, modifier_key, put_text,
+                                      size_window, viewport_size)
+from wa_engine.prefs import apply_prefs
+from wa_engine.state import LOGIN, wait_for_state
+from wa_engine.profile import apply_profile
 
 # Global control variables
 script_paused = False
 script_stopped = False
 pause_lock = threading.Lock()
 
+log = get_logger("chats")
+
+# WebDriver round trips per processed chat
+command_counter = CommandCounter()
+
 def signal_handler(signum, frame):
     """Handle SIGINT (Ctrl+C) for graceful shutdown"""
     global script_stopped
     print("\n🛑 Script interrupted by user - Exiting gracefully...")
     script_stopped = True
+    command_counter.print_report()
     try:
         driver.quit()
     except:
@@ -92,12 +110,13 @@ def click_group_filter():
             EC.element_to_be_clickable((By.ID, "group-filter"))
         )
         group_button.click()
-        print("Groups filter button clicked successfully")
+        log.info("Groups filter button clicked successfully")
         return True
     except Exception as e:
-        print(f"Failed to click Groups filter button: {e}")
+        log.info(f"Failed to click Groups filter button: {e}")
         return False
 
+@profiled("loop_through_chats")
 def loop_through_chats():
     """Loop through all chats sequentially infinitely (no batch)"""
     try:
@@ -125,16 +144,16 @@ def loop_through_chats():
             for selector in selectors:
                 chat_items = driver.find_elements(By.CSS_SELECTOR, selector)
                 if len(chat_items) > 0:
-                    print(f"✅ Using selector '{selector}', found {len(chat_items)} chats")
+                    log.info(f"✅ Using selector '{selector}', found {len(chat_items)} chats")
                     break
 
             if len(chat_items) == 0:
-                print("❌ No chat items found - retrying in 3 seconds...")
+                log.warning("❌ No chat items found - retrying in 3 seconds...")
                 time.sleep(3)
                 continue
 
             # Wait for chat list to fully load
-            print("⏳ Waiting for chat list to fully load...")
+            log.info("⏳ Waiting for chat list to fully load...")
             time.sleep(1)
             
             # Verify chats are loaded by checking if we can get names
@@ -148,7 +167,7 @@ def loop_through_chats():
                     continue
             
             if loaded_chats == 0:
-                print("⚠️ Chat elements not fully loaded, waiting...")
+                log.warning("⚠️ Chat elements not fully loaded, waiting...")
                 time.sleep(2)
                 continue
 
@@ -158,13 +177,15 @@ def loop_through_chats():
                 try:
                     # Pause/stop controls
                     check_script_control()
+                    command_counter.begin_entry()
+                    chat_clicked = False
 
                     # Get chat name with stale element handling
                     current_chat_name = get_chat_name(chat)
                     
                     # Handle stale element - need to re-fetch chat list
                     if current_chat_name and "StaleElement_RefetchNeeded" in current_chat_name:
-                        print("🔄 Stale element detected - breaking inner loop to re-fetch chat list")
+                        log.info("🔄 Stale element detected - breaking inner loop to re-fetch chat list")
                         found_next_chat = False  # Force re-fetch
                         break
                     
@@ -178,8 +199,9 @@ def loop_through_chats():
 
                     # Click chat
                     chat.click()
+                    chat_clicked = True
                     total_processed += 1
-                    print(f"\033[1;32m✅ Successfully clicked on chat: {current_chat_name}\033[0m")
+                    log.info(f"\033[1;32m✅ Successfully clicked on chat: {current_chat_name}\033[0m")
                     last_processed_chat_name = current_chat_name
                     found_next_chat = True
 
@@ -200,7 +222,7 @@ def loop_through_chats():
                     # Send message if allowed
                     if not group_unavailable and next_chat_name:
                         saved_position = get_current_scroll_position()
-                        print(f" DEBUG - Saved position: {saved_position}")
+                        log.debug(f" DEBUG - Saved position: {saved_position}")
                         test_send_message()
                         time.sleep(1)
                         scroll_to_top()
@@ -208,25 +230,30 @@ def loop_through_chats():
                         detect_chat_list_scrollbar(saved_position, next_chat_name)
                         time.sleep(3)
                     elif not next_chat_name:
-                        print(f"Last Chat: {current_chat_name} - no message sent")
+                        log.info(f"Last Chat: {current_chat_name} - no message sent")
                     else:
-                        print("Skipping message send - group is not available")
+                        log.info("Skipping message send - group is not available")
 
                     # Small delay before next iteration
                     time.sleep(1)
 
                 except Exception as e:
-                    print(f"⚠️ Error on chat #{total_processed}: {e}")
+                    log.warning(f"⚠️ Error on chat #{total_processed}: {e}")
                     continue
+                finally:
+                    used = command_counter.end_entry(keep=chat_clicked)
+                    if chat_clicked:
+                        log.info(f"🔌 Driver commands for this chat: {used}")
+                        entry_done()
 
             if not found_next_chat:
                 # Scroll down to load more chats if no new chat was processed
-                print("🔄 Scrolling to load more chats...")
+                log.info("🔄 Scrolling to load more chats...")
                 driver.execute_script("document.querySelector('div._ak72').scrollIntoView(false);")
                 time.sleep(2)
 
     except Exception as e:
-        print(f"❌ Error in loop_through_chats: {e}")
+        log.warning(f"❌ Error in loop_through_chats: {e}")
         return False
 
 
@@ -262,7 +289,7 @@ def find_first_visible_chat_and_next():
         
         return None, None
     except Exception as e:
-        print(f"❌ Error finding first visible chat and next: {e}")
+        log.warning(f"❌ Error finding first visible chat and next: {e}")
         return None, None
 
 def get_current_chat_name():
@@ -289,7 +316,7 @@ def get_current_chat_name():
         return "Unknown Chat"
         
     except Exception as e:
-        print(f"❌ Error getting current chat name: {e}")
+        log.warning(f"❌ Error getting current chat name: {e}")
         return "Unknown Chat"
 
 def find_next_chat_name():
@@ -317,7 +344,7 @@ def find_next_chat_name():
         return None  # No next chat found
         
     except Exception as e:
-        print(f"❌ Error finding next chat name: {e}")
+        log.warning(f"❌ Error finding next chat name: {e}")
         return None
 
 def get_current_scroll_position():
@@ -343,11 +370,11 @@ def get_current_scroll_position():
             'scroll_percentage': scroll_percentage
         }
         
-        print(f"📍 Current scroll position: {scroll_top}px (\033[92m{scroll_percentage:.1f}%\033[0m)")
+        log.debug(f"📍 Current scroll position: {scroll_top}px (\033[92m{scroll_percentage:.1f}%\033[0m)")
         return position_info
         
     except Exception as e:
-        print(f"❌ Error getting scroll position: {e}")
+        log.warning(f"❌ Error getting scroll position: {e}")
         return None
 
 def detect_chat_list_scrollbar(target_position=None, next_chat_to_click=None):
@@ -372,7 +399,7 @@ def detect_chat_list_scrollbar(target_position=None, next_chat_to_click=None):
                 for i, container in enumerate(containers):
                     scroll_height = driver.execute_script("return arguments[0].scrollHeight;", container)
                     client_height = driver.execute_script("return arguments[0].clientHeight;", container)
-                    print(f"   Container {i+1}: Height={client_height}px, ScrollHeight={scroll_height}px")
+                    log.debug(f"   Container {i+1}: Height={client_height}px, ScrollHeight={scroll_height}px")
                     
                     if scroll_height > client_height:
                         # print(f"✅ Found scrollable container using '{selector}' (container {i+1})")
@@ -383,43 +410,43 @@ def detect_chat_list_scrollbar(target_position=None, next_chat_to_click=None):
                     break
                     
             except Exception as e:
-                print(f"❌ Error with selector '{selector}': {e}")
+                log.warning(f"❌ Error with selector '{selector}': {e}")
                 continue
         
         if not found_container:
-            print("❌ No scrollable chat list container found")
+            log.warning("❌ No scrollable chat list container found")
             return False
         
         # If target_position is provided, move to that position
         if target_position:
             target_scroll = target_position.get('scroll_top', 0)
-            print(f"[INFO] Moving to target position: {target_scroll}px")
+            log.info(f"[INFO] Moving to target position: {target_scroll}px")
             driver.execute_script(f"arguments[0].scrollTop = {target_scroll};", found_container)
             time.sleep(1)
             new_position = driver.execute_script("return arguments[0].scrollTop;", found_container)
-            print(f"[APPROVED] Moved to position: {new_position}px")
+            log.info(f"[APPROVED] Moved to position: {new_position}px")
             time.sleep(3)
             # If next_chat_to_click is provided, find and click that chat
             if next_chat_to_click:
                 # print(f"🔍 Looking for chat: {next_chat_to_click}")
                 chat_found = click_chat_by_name(next_chat_to_click)
                 if chat_found:
-                    print(f"\033[1;33m✅ Successfully clicked on chat: {next_chat_to_click}\033[0m")
+                    log.info(f"\033[1;33m✅ Successfully clicked on chat: {next_chat_to_click}\033[0m")
                     test_send_message()
                     
                     time.sleep(2)
                     
                     # Don't send message here - let the main loop handle it
                 else:
-                    print(f"❌ Could not find chat: {next_chat_to_click}")
+                    log.warning(f"❌ Could not find chat: {next_chat_to_click}")
             
             return True
         else:
-            print("✅ Chat list scrollbar detected, returning container info")
+            log.info("✅ Chat list scrollbar detected, returning container info")
             return {'container': found_container}
         
     except Exception as e:
-        print(f"❌ Error detecting chat list scrollbar: {e}")
+        log.warning(f"❌ Error detecting chat list scrollbar: {e}")
         return False
 
 def get_chat_name(chat_element):
@@ -433,37 +460,46 @@ def get_chat_name(chat_element):
     
     max_retries = 3
     retry_delay = 0.5
+    # Evaluated once: below DEBUG the per-selector lines cost nothing
+    debug = log.isEnabledFor(logging.DEBUG)
     
     for attempt in range(max_retries):
         try:
             # 1. Pre-check: Validate chat_element
             if chat_element is None:
-                print(f"🔴 [Attempt {attempt + 1}] ERROR: chat_element is None")
+                if debug:
+                    log.debug(f"🔴 [Attempt {attempt + 1}] ERROR: chat_element is None")
                 if attempt < max_retries - 1:
                     time.sleep(retry_delay)
                     continue
                 return "Unknown_Error_NoneElement"
             
-            print(f"🔍 [Attempt {attempt + 1}] Starting chat name extraction...")
+            if debug:
+                log.debug(f"🔍 [Attempt {attempt + 1}] Starting chat name extraction...")
             
             # 2. JavaScript execution error handling
             try:
-                print(f"📍 [Attempt {attempt + 1}] Scrolling element into view...")
+                if debug:
+                    log.debug(f"📍 [Attempt {attempt + 1}] Scrolling element into view...")
                 driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", chat_element)
                 time.sleep(0.2)
-                print(f"✅ [Attempt {attempt + 1}] Element scrolled successfully")
+                if debug:
+                    log.debug(f"✅ [Attempt {attempt + 1}] Element scrolled successfully")
             except StaleElementReferenceException:
-                print(f"🔴 [Attempt {attempt + 1}] STALE ELEMENT: Chat element is no longer attached to DOM")
-                print(f"🔄 [Attempt {attempt + 1}] Need to re-fetch chat elements from main loop")
+                if debug:
+                    log.debug(f"🔴 [Attempt {attempt + 1}] STALE ELEMENT: Chat element is no longer attached to DOM")
+                    log.debug(f"🔄 [Attempt {attempt + 1}] Need to re-fetch chat elements from main loop")
                 return "Unknown_Error_StaleElement_RefetchNeeded"
             except WebDriverException as e:
-                print(f"🔴 [Attempt {attempt + 1}] WEBDRIVER ERROR during scroll: {str(e)[:100]}")
+                if debug:
+                    log.debug(f"🔴 [Attempt {attempt + 1}] WEBDRIVER ERROR during scroll: {str(e)[:100]}")
                 if attempt < max_retries - 1:
                     time.sleep(retry_delay)
                     continue
                 return f"Unknown_Error_WebDriver_{str(e)[:10]}"
             except Exception as e:
-                print(f"🔴 [Attempt {attempt + 1}] JS EXECUTION ERROR: {type(e).__name__}: {str(e)[:50]}")
+                if debug:
+                    log.debug(f"🔴 [Attempt {attempt + 1}] JS EXECUTION ERROR: {type(e).__name__}: {str(e)[:50]}")
                 if attempt < max_retries - 1:
                     time.sleep(retry_delay)
                     continue
@@ -477,95 +513,118 @@ def get_chat_name(chat_element):
                 'div[title]'
             ]
             
-            print(f"🔍 [Attempt {attempt + 1}] Trying {len(name_selectors)} CSS selectors...")
+            if debug:
+                log.debug(f"🔍 [Attempt {attempt + 1}] Trying {len(name_selectors)} CSS selectors...")
             selector_results = []
             
             for i, selector in enumerate(name_selectors):
                 try:
-                    print(f"🔍 [Attempt {attempt + 1}] Selector {i+1}/{len(name_selectors)}: {selector}")
+                    if debug:
+                        log.debug(f"🔍 [Attempt {attempt + 1}] Selector {i+1}/{len(name_selectors)}: {selector}")
                     name_element = chat_element.find_element(By.CSS_SELECTOR, selector)
-                    print(f"✅ [Attempt {attempt + 1}] Found element with selector: {selector}")
+                    if debug:
+                        log.debug(f"✅ [Attempt {attempt + 1}] Found element with selector: {selector}")
                     
                     # 4. Attribute/text retrieval error handling
                     try:
                         name = name_element.get_attribute('title') or name_element.text.strip()
-                        print(f"📝 [Attempt {attempt + 1}] Retrieved text: '{name[:50]}...' (length: {len(name)})")
+                        if debug:
+                            log.debug(f"📝 [Attempt {attempt + 1}] Retrieved text: '{name[:50]}...' (length: {len(name)})")
                         
                         if name and name != "":
-                            print(f"✅ [Attempt {attempt + 1}] SUCCESS: Chat name found via selector {i+1}: '{name}'")
+                            if debug:
+                                log.debug(f"✅ [Attempt {attempt + 1}] SUCCESS: Chat name found via selector {i+1}: '{name}'")
                             return name
                         else:
-                            print(f"⚠️ [Attempt {attempt + 1}] Selector {i+1} returned empty text")
+                            if debug:
+                                log.debug(f"⚠️ [Attempt {attempt + 1}] Selector {i+1} returned empty text")
                             
                     except StaleElementReferenceException:
-                        print(f"🔴 [Attempt {attempt + 1}] STALE ELEMENT during text retrieval with selector {i+1}")
+                        if debug:
+                            log.debug(f"🔴 [Attempt {attempt + 1}] STALE ELEMENT during text retrieval with selector {i+1}")
                         selector_results.append(f"selector_{i+1}_stale")
                         continue
                     except Exception as e:
-                        print(f"🔴 [Attempt {attempt + 1}] ATTRIBUTE ERROR with selector {i+1}: {type(e).__name__}: {str(e)[:50]}")
+                        if debug:
+                            log.debug(f"🔴 [Attempt {attempt + 1}] ATTRIBUTE ERROR with selector {i+1}: {type(e).__name__}: {str(e)[:50]}")
                         selector_results.append(f"selector_{i+1}_attr_error")
                         continue
                         
                 except NoSuchElementException:
-                    print(f"⚠️ [Attempt {attempt + 1}] NO ELEMENT found with selector {i+1}: {selector}")
+                    if debug:
+                        log.debug(f"⚠️ [Attempt {attempt + 1}] NO ELEMENT found with selector {i+1}: {selector}")
                     selector_results.append(f"selector_{i+1}_not_found")
                     continue
                 except StaleElementReferenceException:
-                    print(f"🔴 [Attempt {attempt + 1}] STALE ELEMENT during find with selector {i+1}")
+                    if debug:
+                        log.debug(f"🔴 [Attempt {attempt + 1}] STALE ELEMENT during find with selector {i+1}")
                     selector_results.append(f"selector_{i+1}_stale")
                     continue
                 except ElementNotInteractableException:
-                    print(f"🔴 [Attempt {attempt + 1}] ELEMENT NOT INTERACTABLE with selector {i+1}")
+                    if debug:
+                        log.debug(f"🔴 [Attempt {attempt + 1}] ELEMENT NOT INTERACTABLE with selector {i+1}")
                     selector_results.append(f"selector_{i+1}_not_interactable")
                     continue
                 except Exception as e:
-                    print(f"🔴 [Attempt {attempt + 1}] DOM ERROR with selector {i+1}: {type(e).__name__}: {str(e)[:50]}")
+                    if debug:
+                        log.debug(f"🔴 [Attempt {attempt + 1}] DOM ERROR with selector {i+1}: {type(e).__name__}: {str(e)[:50]}")
                     selector_results.append(f"selector_{i+1}_dom_error")
                     continue
             
-            print(f"⚠️ [Attempt {attempt + 1}] All selectors failed. Results: {selector_results}")
+            if debug:
+                log.debug(f"⚠️ [Attempt {attempt + 1}] All selectors failed. Results: {selector_results}")
             
             # 5. Fallback: get text content with error handling
             try:
-                print(f"🔄 [Attempt {attempt + 1}] Trying fallback: direct text extraction...")
+                if debug:
+                    log.debug(f"🔄 [Attempt {attempt + 1}] Trying fallback: direct text extraction...")
                 text_content = chat_element.text.strip()
-                print(f"📝 [Attempt {attempt + 1}] Raw text content: '{text_content[:100]}...' (length: {len(text_content)})")
+                if debug:
+                    log.debug(f"📝 [Attempt {attempt + 1}] Raw text content: '{text_content[:100]}...' (length: {len(text_content)})")
                 
                 if text_content and len(text_content) > 0:
                     first_line = text_content.split('\n')[0].strip()
-                    print(f"📝 [Attempt {attempt + 1}] First line: '{first_line}'")
+                    if debug:
+                        log.debug(f"📝 [Attempt {attempt + 1}] First line: '{first_line}'")
                     
                     if first_line and first_line != "":
-                        print(f"✅ [Attempt {attempt + 1}] SUCCESS: Chat name found via fallback: '{first_line}'")
+                        if debug:
+                            log.debug(f"✅ [Attempt {attempt + 1}] SUCCESS: Chat name found via fallback: '{first_line}'")
                         return first_line
                     else:
-                        print(f"⚠️ [Attempt {attempt + 1}] Fallback returned empty first line")
+                        if debug:
+                            log.debug(f"⚠️ [Attempt {attempt + 1}] Fallback returned empty first line")
                 else:
-                    print(f"⚠️ [Attempt {attempt + 1}] Fallback returned empty text content")
+                    if debug:
+                        log.debug(f"⚠️ [Attempt {attempt + 1}] Fallback returned empty text content")
                     
             except StaleElementReferenceException:
-                print(f"🔴 [Attempt {attempt + 1}] STALE ELEMENT during fallback text extraction")
+                if debug:
+                    log.debug(f"🔴 [Attempt {attempt + 1}] STALE ELEMENT during fallback text extraction")
             except Exception as e:
-                print(f"🔴 [Attempt {attempt + 1}] FALLBACK ERROR: {type(e).__name__}: {str(e)[:50]}")
+                if debug:
+                    log.debug(f"🔴 [Attempt {attempt + 1}] FALLBACK ERROR: {type(e).__name__}: {str(e)[:50]}")
             
             # If we get here, element might not be loaded yet
             if attempt < max_retries - 1:
-                print(f"⚠️ [Attempt {attempt + 1}] Chat name not found, retrying in {retry_delay}s...")
+                if debug:
+                    log.debug(f"⚠️ [Attempt {attempt + 1}] Chat name not found, retrying in {retry_delay}s...")
                 time.sleep(retry_delay)
                 continue
                 
         except Exception as e:
             error_type = type(e).__name__
             error_msg = str(e)
-            print(f"🔴 [Attempt {attempt + 1}] UNEXPECTED ERROR: {error_type}: {error_msg[:100]}")
+            log.warning(f"🔴 [Attempt {attempt + 1}] UNEXPECTED ERROR: {error_type}: {error_msg[:100]}")
             
             if attempt < max_retries - 1:
-                print(f"🔄 [Attempt {attempt + 1}] Retrying in {retry_delay}s...")
+                if debug:
+                    log.debug(f"🔄 [Attempt {attempt + 1}] Retrying in {retry_delay}s...")
                 time.sleep(retry_delay)
                 continue
             return f"Unknown_Error_{error_type}_{error_msg[:10]}"
     
-    print(f"❌ All {max_retries} attempts failed - returning Unknown_NotLoaded")
+    log.warning(f"❌ All {max_retries} attempts failed - returning Unknown_NotLoaded")
     return "Unknown_NotLoaded"
 
 def click_chat_by_name(chat_name):
@@ -623,14 +682,14 @@ def click_chat_by_name(chat_name):
                         continue
                         
             except Exception as e:
-                print(f"❌ Error with selector {selector}: {e}")
+                log.warning(f"❌ Error with selector {selector}: {e}")
                 continue
         
-        print(f"❌ Chat '{chat_name}' not found in current visible chats")
+        log.warning(f"❌ Chat '{chat_name}' not found in current visible chats")
         return False
         
     except Exception as e:
-        print(f"❌ Error finding chat by name: {e}")
+        log.warning(f"❌ Error finding chat by name: {e}")
         return False
 
 def scroll_to_top():
@@ -638,10 +697,10 @@ def scroll_to_top():
     try:
         container = driver.find_element(By.CSS_SELECTOR, '#pane-side')
         driver.execute_script("arguments[0].scrollTop = 0;", container)
-        print("🔝 Scrolled to top of chat list")
+        log.info("🔝 Scrolled to top of chat list")
         return True
     except Exception as e:
-        print(f"❌ Error scrolling to top: {e}")
+        log.warning(f"❌ Error scrolling to top: {e}")
         return False
 
 
@@ -652,13 +711,13 @@ def check_group_availability():
         unavailable_message = driver.find_elements(By.XPATH, "//h1[contains(text(), 'This group is no longer available')]")
         
         if len(unavailable_message) > 0:
-            print("\033[91mGroup is no longer available - looking for 'See group' button\033[0m")
+            log.warning("\033[91mGroup is no longer available - looking for 'See group' button\033[0m")
             # Look for "See group" button and click it
             see_group_button = WebDriverWait(driver, 5).until(
                 EC.element_to_be_clickable((By.XPATH, "//div[contains(text(), 'See group')]"))
             )
             see_group_button.click()
-            print("Clicked 'See group' button")
+            log.info("Clicked 'See group' button")
             time.sleep(2)  # Wait for action to complete
             return True
         
@@ -666,14 +725,14 @@ def check_group_availability():
         no_member_message = driver.find_elements(By.XPATH, "//div[contains(text(), \"You can't send messages to this group because you're no longer a member\")]")
         
         if len(no_member_message) > 0:
-            print("\033[91mYou're no longer a member of this group - skipping to next chat\033[0m")
+            log.warning("\033[91mYou're no longer a member of this group - skipping to next chat\033[0m")
             return True  # Return True to skip sending message
         
         # Group is available, continue normally
         return False
             
     except Exception as e:
-        print(f"Error checking group availability: {e}")
+        log.warning(f"Error checking group availability: {e}")
         return False
 
 def test_send_message():
@@ -693,14 +752,14 @@ def test_send_message():
     message_input.click()
     time.sleep(0.5)
     # Select all text and delete
-    message_input.send_keys(Keys.COMMAND, 'a')  # Select all (macOS)
+    message_input.send_keys(modifier_key(), 'a')  # Select all (Cmd on macOS, Ctrl elsewhere)
     message_input.send_keys(Keys.DELETE)  # Clear selected text
-    print("Message input cleared")
+    log.info("Message input cleared")
     return True
 
 def send_message_from_file(message_index=0):
     """Parse and send message content from description.txt file and attach an image from IMAGE-TO-SEND folder"""
-    import os, glob, time, pyperclip
+    import os, glob, time
     from selenium.webdriver.common.by import By
     from selenium.webdriver.common.keys import Keys
     from selenium.webdriver.support.ui import WebDriverWait
@@ -718,10 +777,10 @@ def send_message_from_file(message_index=0):
         message = messages[message_index]
         message_content = message.get('content', '')
         if not message_content:
-            print("Selected message is empty - skipping")
+            log.info("Selected message is empty - skipping")
             return False
 
-        print(f"📤 Sending message ({message['type']}): {message_content[:50]}...")
+        log.info(f"📤 Sending message ({message['type']}): {message_content[:50]}...")
 
         # --- Locate message input ---
         selectors = [
@@ -738,16 +797,15 @@ def send_message_from_file(message_index=0):
         message_input.click()
         time.sleep(0.5)
         # Select all text and delete
-        message_input.send_keys(Keys.COMMAND, 'a')  # Select all (macOS)
+        message_input.send_keys(modifier_key(), 'a')  # Select all (Cmd on macOS, Ctrl elsewhere)
         message_input.send_keys(Keys.DELETE)  # Clear selected text
-        print("Message input cleared")
+        log.info("Message input cleared")
         time.sleep(1)
 
         # --- Paste text into input ---
-        pyperclip.copy(message_content)
         message_input.click()
-        message_input.send_keys(Keys.COMMAND, 'v')  # macOS paste
-        print(f"[INFO] Text pasted: {message_content[:50]}...")
+        put_text(driver, message_input, message_content, INPUT_MODE)
+        log.info(f"[INFO] Text pasted: {message_content[:50]}...")
         time.sleep(1)
 
         # --- Check for image in IMAGE-TO-SEND folder ---
@@ -761,26 +819,15 @@ def send_message_from_file(message_index=0):
                 break
 
         if image_path:
-            print(f"[INFO] Found image: {image_path}")
+            log.info(f"[INFO] Found image: {image_path}")
             
-            # Use system clipboard method to attach image
+            # Clipboard paste on a macOS desktop, the attach menu's file input elsewhere
             import subprocess
             try:
-                # Copy image to clipboard using osascript (macOS)
-                subprocess.run([
-                    'osascript', '-e',
-                    f'set the clipboard to (read file POSIX file "{image_path}" as JPEG picture)'
-                ], check=True)
-                
-                # Click message input and paste
-                message_input.click()
-                time.sleep(0.5)
-                
-                # Paste the image
-                message_input.send_keys(Keys.COMMAND, 'v')
+                attach_image(driver, message_input, image_path, INPUT_MODE)
                 time.sleep(2)
                 
-                print(f"[INFO] Image pasted from clipboard: {os.path.basename(image_path)}")
+                log.info(f"[INFO] Image attached: {os.path.basename(image_path)}")
                 time.sleep(1)
                 # Send the message using Enter key
                 # wait for the button to be clickable
@@ -789,24 +836,24 @@ def send_message_from_file(message_index=0):
                 )
 
                 send_button.click()
-                print("[INFO] Message + image sent successfully!")
+                log.info("[INFO] Message + image sent successfully!")
                 time.sleep(3)
                 
-            except subprocess.CalledProcessError as e:
-                print(f"[ERROR] Failed to copy image to clipboard: {e}")
-                print("[INFO] Sending text message only")
+            except (subprocess.CalledProcessError, TimeoutException) as e:
+                log.info(f"[ERROR] Failed to attach image: {e}")
+                log.info("[INFO] Sending text message only")
         else:
             # No image found, just send text
-            print("[INFO] Text message sent successfully!")
+            log.info("[INFO] Text message sent successfully!")
 
         return True
     
     
     except FileNotFoundError:
-        print("description.txt file not found")
+        log.info("description.txt file not found")
         return False
     except Exception as e:
-        print(f"Error sending message: {e}")
+        log.warning(f"Error sending message: {e}")
         return False
     
 
@@ -823,7 +870,7 @@ def load_message_from_file():
             content = file.read().strip()
         
         if not content:
-            print("⚠️ description.txt is empty")
+            log.warning("⚠️ description.txt is empty")
             return None
             
         # Parse different message formats
@@ -835,7 +882,7 @@ def load_message_from_file():
                 "content": content,
                 "type": "simple"
             })
-            print(f"📄 Loaded simple message ({len(content)} characters)")
+            log.info(f"📄 Loaded simple message ({len(content)} characters)")
             
         # Format 2: Multiple messages separated by ---
         elif '---' in content:
@@ -846,7 +893,7 @@ def load_message_from_file():
                     "type": "multi",
                     "index": i + 1
                 })
-            print(f"📄 Loaded {len(messages)} messages separated by '---'")
+            log.info(f"📄 Loaded {len(messages)} messages separated by '---'")
             
         # Format 3: Numbered messages with #MESSAGE pattern
         elif '#MESSAGE' in content.upper():
@@ -858,10 +905,10 @@ def load_message_from_file():
                     "type": "numbered",
                     "number": int(num)
                 })
-            print(f"📄 Loaded {len(messages)} numbered messages")
+            log.info(f"📄 Loaded {len(messages)} numbered messages")
             
         if not messages:
-            print("⚠️ Could not parse message format, using entire content as single message")
+            log.warning("⚠️ Could not parse message format, using entire content as single message")
             messages.append({
                 "content": content,
                 "type": "fallback"
@@ -870,10 +917,10 @@ def load_message_from_file():
         return messages
         
     except FileNotFoundError:
-        print("❌ description.txt file not found")
+        log.warning("❌ description.txt file not found")
         return None
     except Exception as e:
-        print(f"❌ Error loading message file: {e}")
+        log.warning(f"❌ Error loading message file: {e}")
         return None
 
 
@@ -881,24 +928,30 @@ def load_message_from_file():
 
 # ============= Main Script =============
 
+setup_logging("whatsapp_chats")
 
-profile_path = "/Users/admin/Library/Application Support/Firefox/Profiles/7oz304au.default-release"
+profile_path = os.environ.get("WA_FIREFOX_PROFILE", "/Users/admin/Library/Application Support/Firefox/Profiles/7oz304au.default-release")
 
 options = Options()
-options.profile = webdriver.FirefoxProfile(profile_path)
+apply_profile(options, profile_path)
 
-# Anti-detection measures
-options.set_preference("dom.webdriver.enabled", False)
-options.set_preference("useAutomationExtension", False)
-options.set_preference("general.useragent.override", "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:109.0) Gecko/20100101 Firefox/115.0")
+# Anti-detection measures, plus the lean set with WA_BROWSER_MODE=lean
+apply_prefs(options)
 
-# Headless mode if needed
-# options.add_argument('--headless')
+# Headless mode: WA_HEADLESS=1, or automatically when there is no display
+HEADLESS = headless_requested()
+INPUT_MODE = input_mode(HEADLESS)
+if HEADLESS:
+    width, height = viewport_size()
+    options.add_argument('-headless')
+    options.add_argument(f'--width={width}')
+    options.add_argument(f'--height={height}')
 
 # Setup the driver
-service = Service(GeckoDriverManager().install())
+service = Service(resolve_geckodriver()['path'])
 driver = webdriver.Firefox(service=service, options=options)
-driver.maximize_window()
+command_counter.install(driver)
+size_window(driver, HEADLESS)
 
 # Setup signal handlers for pause/stop controls
 setup_signal_handlers()
@@ -906,11 +959,9 @@ setup_signal_handlers()
 driver.get("https://web.whatsapp.com/")
 
 # Wait and check if login is required
-try:
-    # Check if WhatsApp Web header is present (means not logged in)
-    login_header = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'x3nfvp2')]//h1[text()='WhatsApp Web']"))
-    )
+# One in-page probe, polled until the login screen or the chat list appears
+if wait_for_state(driver, timeout=30) == LOGIN:
+    print("📱 WhatsApp Web needs a login - scan the QR code")
     # Click the Groups filter button
     click_group_filter()
     # Pause here to allow user adjust position
@@ -919,8 +970,8 @@ try:
     loop_through_chats()    
     # loop_through_all_chats_with_scroll()
 
-except:
-    print("WhatsApp Web header not found - already logged in")
+else:
+    print("✅ Already logged in")
     # Click the Groups filter button
     click_group_filter()
     time.sleep(2)
@@ -0,0 +1,45 @@
+"""
+WhatsApp automation engine
+Search/resolve/send/extract logic shared by whatsapp-phone-number.py, the
+automation daemon and the batch job runner. Every function takes an explicit
+Session; importing the package starts nothing and loads selenium, pyperclip
+and webdriver_manager only when they are first needed.
+
+Usage:
+    from wa_engine import Session, run_entries
+
+    session = Session()
+    session.start()
+    session.open_whatsapp(login_timeout=120)
+    run_entries(session, start_row=1, max_rows=20)
+    session.close()
+"""
+
+import importlib
+
+_EXPORTS = {
+    'Session': 'wa_engine.session',
+    'WHATSAPP_URL': 'wa_engine.session',
+    'DEFAULT_PROFILE_PATH': 'wa_engine.session',
+    'parse_entry': 'wa_engine.entries',
+    'load_entries': 'wa_engine.entries',
+    'run_entries': 'wa_engine.runner',
+    'run_entry_macro': 'wa_engine.macro',
+    'send_message': 'wa_engine.messaging',
+    'load_messages': 'wa_engine.messaging',
+    'load_exclude_words': 'wa_engine.messaging',
+    'click_non_excluded_names': 'wa_engine.messaging',
+    'extract_groups': 'wa_engine.extract',
+    'resolve_geckodriver': 'wa_engine.geckodriver',
+    'apply_profile': 'wa_engine.profile',
+    'get_backend': 'wa_engine.backends',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    # Submodules are imported on first attribute access
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'wa_engine' has no attribute {name!r}")
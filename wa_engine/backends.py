@@ -0,0 +1,174 @@
+"""
+Browser backends
+How a Session gets its browser and the two hot primitives the engine leans
+on, text insertion and page evaluation. Everything else (waits, element
+lookup, clicks) is plain WebDriver and is shared by both backends.
+
+    firefox   geckodriver; text via execCommand('insertText'), evaluation via
+              execute_script. Supports profile modes, lean prefs and reattach.
+    chromium  chromedriver with CDP: Input.insertText for text and
+              Runtime.evaluate for probes, each a single CDP command with no
+              script wrapper. WA_CHROME_DEBUGGER=127.0.0.1:9222 attaches to an
+              already-running Chromium (e.g. Ferdium) instead of starting one.
+
+Chosen with WA_BACKEND (default firefox); compare them with
+tools/bench_backends.py.
+"""
+
+import json
+import os
+
+from wa_engine import platform_input
+from wa_engine.events import bidi_enabled
+
+BACKENDS = ("firefox", "chromium")
+DEFAULT_CHROME_PROFILE = "Data/chrome-profile"
+
+# Chromium equivalents of the lean Firefox prefs (wa_engine.prefs.LEAN_PREFS)
+CHROME_LEAN_ARGS = (
+    "--blink-settings=imagesEnabled=false",
+    "--disable-smooth-scrolling",
+    "--disable-remote-fonts",
+    "--disk-cache-size=1",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-sync",
+    "--force-prefers-reduced-motion",
+)
+
+
+class FirefoxBackend:
+    """Firefox through geckodriver (the original engine)"""
+
+    name = "firefox"
+    supports_reattach = True
+
+    def default_profile(self):
+        from wa_engine.session import DEFAULT_PROFILE_PATH
+
+        return DEFAULT_PROFILE_PATH
+
+    def start(self, session, profile_path=None, profile_mode=None, browser_mode=None):
+        """Start Firefox for session (headless/reattach already decided); returns the driver"""
+        from selenium import webdriver
+        from selenium.webdriver.firefox.options import Options
+        from selenium.webdriver.firefox.service import Service
+
+        from wa_engine.geckodriver import resolve_geckodriver
+        from wa_engine.prefs import apply_prefs
+        from wa_engine.profile import apply_profile
+        from wa_engine.reattach import start_detached
+
+        options = Options()
+        try:
+            apply_profile(options, profile_path, profile_mode)
+        except Exception as e:
+            print(f"⚠️ Error loading profile: {e}")
+            print("Using default Firefox profile...")
+
+        # Anti-detection measures, plus the lean set when requested
+        if apply_prefs(options, browser_mode) == "lean":
+            print("✅ Lean browser mode: animations, images and web fonts disabled")
+
+        # WebDriver BiDi for event waits (see wa_engine.events)
+        options.enable_bidi = bidi_enabled()
+
+        if session.headless:
+            width, height = platform_input.viewport_size()
+            options.add_argument('-headless')
+            options.add_argument(f'--width={width}')
+            options.add_argument(f'--height={height}')
+
+        gecko = resolve_geckodriver()
+        print("🔄 Starting Firefox browser...")
+        if session.reattach:
+            # Detached geckodriver: the browser outlives this process
+            driver = start_detached(gecko['path'], options, profile_path, session.headless)
+            print(f"✅ Detached GeckoDriver session saved for reattach ({gecko['path']})")
+        else:
+            service = Service(gecko['path'])
+            print(f"✅ GeckoDriver service created ({gecko['source']}: {gecko['path']})")
+            driver = webdriver.Firefox(service=service, options=options)
+        print("✅ Firefox started successfully!")
+        return driver
+
+    def insert_text(self, driver, element, text, replace=False):
+        return platform_input.insert_text(driver, element, text, replace=replace)
+
+    def evaluate(self, driver, expression):
+        """Value of a JavaScript expression in the page"""
+        return driver.execute_script(f"return ({expression});")
+
+
+class ChromiumBackend:
+    """Chromium through chromedriver, with CDP for text insertion and evaluation"""
+
+    name = "chromium"
+    supports_reattach = False
+
+    # Focus (and optionally select) the target so Input.insertText lands in it
+    FOCUS_SCRIPT = """
+const el = arguments[0];
+el.focus();
+if (arguments[1]) {
+    if (el.select) { el.select(); } else { document.execCommand('selectAll', false, null); }
+}
+"""
+
+    def default_profile(self):
+        return os.environ.get("WA_CHROME_PROFILE", DEFAULT_CHROME_PROFILE)
+
+    def start(self, session, profile_path=None, profile_mode=None, browser_mode=None):
+        """Start (or attach to) Chromium for session; returns the driver"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        from wa_engine.prefs import browser_mode as resolve_browser_mode
+
+        options = Options()
+        debugger = os.environ.get("WA_CHROME_DEBUGGER")
+        if debugger:
+            options.add_experimental_option("debuggerAddress", debugger)
+            print(f"🔄 Attaching to Chromium at {debugger}...")
+        else:
+            user_data_dir = os.path.abspath(profile_path or self.default_profile())
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+            options.add_argument("--disable-blink-features=AutomationControlled")
+            options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            options.enable_bidi = bidi_enabled()
+            if resolve_browser_mode(browser_mode) == "lean":
+                for arg in CHROME_LEAN_ARGS:
+                    options.add_argument(arg)
+                print("✅ Lean browser mode: images, smooth scrolling and web fonts disabled")
+            if session.headless:
+                width, height = platform_input.viewport_size()
+                options.add_argument("--headless=new")
+                options.add_argument(f"--window-size={width},{height}")
+            print(f"🔄 Starting Chromium with profile {user_data_dir}...")
+
+        # Selenium Manager finds (and caches) a matching chromedriver
+        driver = webdriver.Chrome(options=options)
+        print("✅ Chromium started successfully!")
+        return driver
+
+    def insert_text(self, driver, element, text, replace=False):
+        driver.execute_script(self.FOCUS_SCRIPT, element, replace)
+        driver.execute_cdp_cmd("Input.insertText", {"text": text})
+        return True
+
+    def evaluate(self, driver, expression):
+        """Value of a JavaScript expression in the page, via Runtime.evaluate"""
+        result = driver.execute_cdp_cmd("Runtime.evaluate", {"expression": expression, "returnByValue": True})
+        if result.get("exceptionDetails"):
+            raise RuntimeError(json.dumps(result["exceptionDetails"])[:300])
+        return result.get("result", {}).get("value")
+
+
+def get_backend(name=None):
+    """Backend by name, falling back to WA_BACKEND and then firefox"""
+    name = (name or os.environ.get("WA_BACKEND") or "firefox").strip().lower()
+    if name == "chromium" or name == "chrome":
+        return ChromiumBackend()
+    if name != "firefox":
+        print(f"⚠️ Unknown browser backend '{name}', using firefox")
+    return FirefoxBackend()
@@ -0,0 +1,33 @@
+"""
+Entry lists: phone numbers and group chat names, one per line
+"""
+
+import re
+
+PHONE_RE = re.compile(r'^\d{10,15}$')
+
+
+def parse_entry(line):
+    """Classify one line of an entry list as a phone number or a group chat name
+
+    Returns:
+        dict with 'type' ('phone' or 'group'), 'value' (what is searched for)
+        and 'original' (the line as written), or None for blank lines
+    """
+    entry = line.strip()
+    if not entry:
+        return None
+    # Check if it's a phone number (digits only, with optional + and spaces/dashes)
+    cleaned_entry = entry.replace(" ", "").replace("-", "").replace("+", "")
+    if PHONE_RE.match(cleaned_entry):
+        return {'type': 'phone', 'value': cleaned_entry, 'original': entry}
+    # It's likely a group chat name
+    return {'type': 'group', 'value': entry, 'original': entry}
+
+
+def load_entries(lines):
+    """Parse lines (or a file path) into entries, skipping blank lines"""
+    if isinstance(lines, str):
+        with open(lines, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    return [entry for entry in map(parse_entry, lines) if entry is not None]
@@ -0,0 +1,153 @@
+"""
+Event waits
+Waits the page pushes instead of Python polling for them. An in-page
+MutationObserver re-checks a JavaScript condition on every DOM change and,
+once it holds, writes a tagged console.debug line; the WebDriver BiDi
+log.entryAdded subscription wakes the waiting thread straight away.
+
+A slow safety poll (SAFETY_POLL) re-arms the observer after navigation and
+covers missed events. Drivers without a BiDi connection, or WA_BIDI=0, fall
+back to plain WebDriverWait polling with the caller's poll_frequency.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+
+from tools.log_setup import get_logger
+
+log = get_logger("engine")
+
+PREFIX = "__wa_wait__:"
+SAFETY_POLL = 1.0
+
+# Returns true if the condition already holds; otherwise leaves one observer
+# per token on the page (a reload drops it and the next safety poll re-arms it)
+OBSERVE_SCRIPT = """
+const token = arguments[0], check = new Function(arguments[1]), ttl = arguments[2], prefix = arguments[3];
+if (check()) { return true; }
+const waits = window.__waWaits = window.__waWaits || {};
+if (!waits[token]) {
+    const observer = new MutationObserver(() => {
+        if (!check()) { return; }
+        observer.disconnect();
+        delete waits[token];
+        console.debug(prefix + token);
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    waits[token] = observer;
+    setTimeout(() => { observer.disconnect(); delete waits[token]; }, ttl);
+}
+return false;
+"""
+
+
+def bidi_enabled():
+    """False when WA_BIDI=0 turns event waits off"""
+    return os.environ.get("WA_BIDI", "1").strip().lower() not in ("0", "false", "no")
+
+
+# JS predicate for an element a user could click: rendered and not disabled
+USABLE = "(el => !!el && el.getClientRects().length > 0 && !el.disabled)"
+
+
+def css_condition(*selectors, clickable=False):
+    """JS condition: any of the CSS selectors matches (with clickable, a rendered, enabled element)"""
+    if clickable:
+        return ("return " + " || ".join(f"Array.from(document.querySelectorAll({json.dumps(s)})).some({USABLE})"
+                                         for s in selectors) + ";")
+    return "return " + " || ".join(f"!!document.querySelector({json.dumps(s)})" for s in selectors) + ";"
+
+
+def xpath_condition(xpath, clickable=False):
+    """JS condition: the XPath matches a node (with clickable, a rendered, enabled one)"""
+    node = (f"document.evaluate({json.dumps(xpath)}, document, null, "
+            f"XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue")
+    return f"return {USABLE}({node});" if clickable else f"return !!{node};"
+
+
+class EventWaits:
+    """Event-driven waits for one driver, with WebDriverWait as the fallback"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._events = {}
+        self._lock = threading.Lock()
+        self._tokens = itertools.count(1)
+        self._handler_id = None
+        caps = getattr(driver, "caps", None) or {}
+        self.available = bidi_enabled() and bool(caps.get("webSocketUrl"))
+
+    def _subscribe(self):
+        if self._handler_id is None and self.available:
+            try:
+                self._handler_id = self.driver.script.add_console_message_handler(self._on_console)
+            except Exception as e:
+                log.debug("BiDi console subscription failed, polling instead: %r", e)
+                self.available = False
+        return self.available
+
+    def _on_console(self, entry):
+        text = getattr(entry, "text", None) or ""
+        if text.startswith(PREFIX):
+            with self._lock:
+                event = self._events.get(text[len(PREFIX):])
+            if event is not None:
+                event.set()
+
+    def wait_event(self, js_condition, timeout):
+        """Block until js_condition holds in the page (pushed via BiDi) or timeout; returns whether it held
+
+        Without BiDi this only checks once and sleeps out the timeout.
+        """
+        token = f"{os.getpid()}-{next(self._tokens)}"
+        event = threading.Event()
+        with self._lock:
+            self._events[token] = event
+        try:
+            if self.driver.execute_script(OBSERVE_SCRIPT, token, js_condition, int(timeout * 1000) + 500, PREFIX):
+                return True
+            if not self._subscribe():
+                time.sleep(timeout)
+                return False
+            return event.wait(timeout)
+        finally:
+            with self._lock:
+                self._events.pop(token, None)
+
+    def until(self, condition, js_condition=None, timeout=10, poll_frequency=0.5, message=""):
+        """
+        Drop-in for WebDriverWait(driver, timeout, poll_frequency).until(condition)
+
+        condition is the usual expected condition and decides the return
+        value; js_condition (see css_condition / xpath_condition) tells the
+        page when it is worth checking again. Raises TimeoutException.
+        """
+        from selenium.common.exceptions import NoSuchElementException, TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        if not js_condition or not self._subscribe():
+            return WebDriverWait(self.driver, timeout, poll_frequency=poll_frequency).until(condition, message)
+
+        deadline = time.monotonic() + timeout
+        held = False
+        while True:
+            try:
+                value = condition(self.driver)
+            except NoSuchElementException:
+                value = None
+            if value:
+                return value
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(message)
+            if held:
+                # The page condition holds but condition does not yet (e.g. present, not clickable):
+                # wait_event would return at once, so poll at the caller's pace instead of spinning
+                time.sleep(min(poll_frequency, remaining))
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    continue
+            held = self.wait_event(js_condition, min(remaining, SAFETY_POLL))
@@ -0,0 +1,10 @@
+"""
+Group extraction on a session's browser
+"""
+
+
+def extract_groups(session, save_to_file=True):
+    """Extract all group chat names from the chat list; returns the list of names"""
+    from tools.extract_group_names import extract_all_group_names
+
+    return extract_all_group_names(session.driver, save_to_file=save_to_file) or []
@@ -0,0 +1,144 @@
+"""
+Geckodriver resolution
+Finds the geckodriver binary without going to the network on every launch.
+Order of preference:
+
+    1. WA_GECKODRIVER (explicit path)
+    2. the cached result in Data/geckodriver.json, while the binary and the
+       installed Firefox version are unchanged
+    3. geckodriver on PATH
+    4. webdriver_manager download (network), as the last resort
+
+A refresh is forced with WA_GECKODRIVER_REFRESH=1 or:
+
+    python3 -m wa_engine.geckodriver --refresh
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from datetime import datetime
+
+DEFAULT_CACHE_PATH = "Data/geckodriver.json"
+
+# application.ini carries the Firefox version; reading it is much cheaper than `firefox --version`
+FIREFOX_INI_PATHS = (
+    "/Applications/Firefox.app/Contents/Resources/application.ini",
+    "/usr/lib/firefox/application.ini",
+    "/usr/lib64/firefox/application.ini",
+    "/opt/firefox/application.ini",
+    "/snap/firefox/current/usr/lib/firefox/application.ini",
+)
+
+
+def firefox_version():
+    """Installed Firefox version from application.ini, or None if not found"""
+    for path in FIREFOX_INI_PATHS:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    if line.startswith("Version="):
+                        return line.split("=", 1)[1].strip()
+        except OSError:
+            continue
+    return None
+
+
+def geckodriver_version(path):
+    """Version reported by `geckodriver --version`, or None"""
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"geckodriver (\d+(?:\.\d+)+)", output)
+    return match.group(1) if match else None
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_path, record):
+    try:
+        folder = os.path.dirname(cache_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+    except OSError as e:
+        print(f"⚠️ Could not cache geckodriver location: {e}")
+
+
+def _cache_valid(record, firefox):
+    """Cached record still points at the same binary for the same Firefox"""
+    path = record.get('path')
+    if not path or not os.access(path, os.X_OK):
+        return False
+    try:
+        if _fingerprint(path) != record.get('fingerprint'):
+            return False
+    except OSError:
+        return False
+    return firefox is None or record.get('firefox_version') in (None, firefox)
+
+
+def resolve_geckodriver(refresh=None, cache_path=DEFAULT_CACHE_PATH):
+    """
+    Path to a usable geckodriver binary
+
+    Returns:
+        dict with 'path', 'version', 'source' ('env', 'cache', 'path', 'download')
+        and 'firefox_version'
+    """
+    explicit = os.environ.get("WA_GECKODRIVER")
+    if explicit:
+        return {'path': explicit, 'version': None, 'source': 'env', 'firefox_version': None}
+
+    if refresh is None:
+        refresh = os.environ.get("WA_GECKODRIVER_REFRESH", "") not in ("", "0")
+    firefox = firefox_version()
+
+    if not refresh:
+        record = _read_cache(cache_path)
+        if record and _cache_valid(record, firefox):
+            return dict(record, source='cache')
+
+    path = shutil.which("geckodriver")
+    source = 'path'
+    if path is None:
+        from webdriver_manager.firefox import GeckoDriverManager
+        path = GeckoDriverManager().install()
+        source = 'download'
+
+    record = {
+        'path': os.path.abspath(path),
+        'version': geckodriver_version(path),
+        'firefox_version': firefox,
+        'fingerprint': _fingerprint(path),
+        'resolved_at': datetime.now().isoformat(timespec='seconds'),
+        'resolved_from': source,
+    }
+    _write_cache(cache_path, record)
+    return dict(record, source=source)
+
+
+def main():
+    result = resolve_geckodriver(refresh="--refresh" in sys.argv)
+    print(f"✅ geckodriver {result.get('version') or '?'} at {result['path']} "
+          f"(from {result['source']}, Firefox {result.get('firefox_version') or 'unknown'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Element handles
+WebElement handles for the long-lived elements (search box, compose box)
+kept across entries. A cached handle is re-validated with one small script
+(still attached and rendered) that can also do the caller's first action,
+scrolling it into view; only a stale handle pays for a full lookup through
+the page helpers and the event wait.
+"""
+
+from wa_engine.events import css_condition
+from wa_engine.selector_registry import ROLES
+
+# arguments: element, scroll into view; false when the handle is no longer usable
+CHECK_SCRIPT = """
+const el = arguments[0];
+if (!el.isConnected || !el.getClientRects().length) { return false; }
+if (arguments[1]) { el.scrollIntoView(true); }
+return true;
+"""
+SCROLL_SCRIPT = "arguments[0].scrollIntoView(true);"
+
+
+class HandleCache:
+    """Reusable element handles for one session's driver"""
+
+    LOOKUPS = {
+        'search_box': lambda page: page.search_box(),
+        'compose_box': lambda page: page.compose_box(),
+    }
+
+    def __init__(self, session):
+        self.session = session
+        self.driver = session.driver
+        self._handles = {}
+        self.stats = {role: {'reused': 0, 'looked_up': 0} for role in self.LOOKUPS}
+
+    def get(self, role, timeout=10, scroll=False):
+        """
+        Element for role, reused while it is still attached and visible
+
+        Args:
+            scroll: scroll the element into view (done by the validity check
+                    itself when the cached handle is still good)
+
+        Raises:
+            TimeoutException: no element for role appeared within timeout
+        """
+        element = self._handles.get(role)
+        if element is not None and self._usable(element, scroll):
+            self.stats[role]['reused'] += 1
+            return element
+
+        session = self.session
+        element = session.wait_until(lambda _: self.LOOKUPS[role](session.page),
+                                     css_condition(*ROLES[role], clickable=True), timeout=timeout)
+        if scroll:
+            self.driver.execute_script(SCROLL_SCRIPT, element)
+        self._handles[role] = element
+        self.stats[role]['looked_up'] += 1
+        return element
+
+    def _usable(self, element, scroll):
+        try:
+            return bool(self.driver.execute_script(CHECK_SCRIPT, element, scroll))
+        except Exception:
+            # StaleElementReferenceException after a re-render or reload
+            return False
+
+    def forget(self, role=None):
+        """Drop one cached handle, or all of them (e.g. after navigating)"""
+        if role is None:
+            self._handles.clear()
+        else:
+            self._handles.pop(role, None)
+
+    def summary(self):
+        """e.g. 'search_box 48/50 reused, compose_box 45/50 reused'"""
+        parts = []
+        for role, counts in self.stats.items():
+            total = counts['reused'] + counts['looked_up']
+            if total:
+                parts.append(f"{role} {counts['reused']}/{total} reused")
+        return ", ".join(parts) or "no lookups"
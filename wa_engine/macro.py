@@ -0,0 +1,247 @@
+"""
+Entry macro
+The whole per-entry workflow (search, classify, open, verify, mention,
+compose) as one execute_async_script state machine in the page, so an entry
+costs one WebDriver round trip plus page work instead of dozens of commands.
+Waits inside the page use MutationObservers with the same timeouts the step
+path uses.
+
+The page reports a compact result: outcome, chat title, the mention picked
+and per-step timings, which are recorded as ordinary stage spans (same
+names as the step path) so both modes compare in the stage table. Attaching
+an image needs a WebDriver file upload, so with an image the macro stops at
+a composed message ("attach") and Python attaches and sends.
+
+Text and clicks are script events (execCommand insertText, synthetic
+mouse events), whatever WA_INPUT_MODE says.
+
+Enabled with WA_ENTRY_MODE=macro (default: steps) or run_entries(entry_mode=...).
+"""
+
+import os
+import time
+
+from wa_engine.page import HELPERS_SCRIPT, VERSION
+
+ENTRY_MODES = ("steps", "macro")
+# Upper bound for one entry (the longest path waits 10 + 20 + 20 + 10 + 5 s)
+SCRIPT_TIMEOUT = 120
+
+# Page-side waits and pauses in milliseconds, matching the step path
+MACRO_TIMINGS = {
+    'settle': 500,
+    'chatLoad': 1000,
+    'searchTimeout': 10000,
+    'noResultTimeout': 2000,
+    'sectionTimeout': 2000,
+    'phoneTimeout': 20000,
+    'composeTimeout': 10000,
+    'mentionTimeout': 5000,
+}
+
+# arguments: search value, options, helper version, selector lists, callback
+ENTRY_MACRO_SCRIPT = """
+if (!window.__wa || window.__wa.version !== arguments[2]) {
+%s
+}
+const value = arguments[0], opts = arguments[1], done = arguments[arguments.length - 1];
+const wa = window.__wa, t0 = performance.now(), steps = [];
+let mention = null;
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+function waitFor(check, timeout) {
+    return new Promise(resolve => {
+        const found = check();
+        if (found) { resolve(found); return; }
+        const observer = new MutationObserver(() => {
+            const found = check();
+            if (found) { observer.disconnect(); clearTimeout(timer); resolve(found); }
+        });
+        const timer = setTimeout(() => { observer.disconnect(); resolve(check() || null); }, timeout);
+        observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    });
+}
+
+async function step(name, action) {
+    const start = performance.now();
+    try { return await action(); }
+    finally { steps.push({name: name, start: start - t0, duration: performance.now() - start}); }
+}
+
+function byXPath(xpath) {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function shown(el) { return el && el.isConnected && el.getClientRects().length > 0 ? el : null; }
+
+function click(el) {
+    el.scrollIntoView();
+    for (const type of ['pointerdown', 'mousedown', 'pointerup', 'mouseup']) {
+        const EventType = type.startsWith('pointer') ? PointerEvent : MouseEvent;
+        el.dispatchEvent(new EventType(type, {bubbles: true, cancelable: true, view: window}));
+    }
+    el.click();
+}
+
+function insertText(el, text, replace) {
+    el.focus();
+    if (replace) {
+        document.execCommand('selectAll', false, null);
+    } else {
+        const range = document.createRange();
+        range.selectNodeContents(el);
+        range.collapse(false);
+        const selection = window.getSelection();
+        selection.removeAllRanges();
+        selection.addRange(range);
+    }
+    return document.execCommand('insertText', false, text);
+}
+
+async function openAfter(xpath, timeout, settle) {
+    const chat = await waitFor(() => shown(byXPath(xpath)), timeout);
+    if (chat) {
+        chat.scrollIntoView();
+        if (settle) { await sleep(settle); }
+        click(chat);
+    }
+    return !!chat;
+}
+
+function finish(outcome, detail) {
+    const header = ['sent', 'resolved', 'attach'].includes(outcome) ? wa.chatHeader() : {};
+    done({outcome: outcome, detail: detail || null, title: header.title || null, mention: mention, steps: steps});
+}
+
+async function run() {
+    const search = await step('search_box', () => waitFor(wa.searchBox, opts.searchTimeout));
+    if (!search) { return finish('search_box_missing'); }
+    await step('search_input', async () => {
+        search.scrollIntoView(true);
+        insertText(search, value, true);
+        await sleep(opts.settle);
+    });
+
+    // "No chats" span, or stop waiting early once a "Groups in common" section shows
+    const noResult = await step('no_result_check', () => waitFor(
+        () => shown(byXPath(opts.noResultXPath)) || (wa.searchSections().groupsInCommon ? 'sections' : null),
+        opts.noResultTimeout));
+    if (noResult && noResult !== 'sections') { return finish('no_chat'); }
+    if (!(search.value || search.innerText || '').includes(value)) { return finish('error', 'search text not entered'); }
+
+    if (opts.type === 'group') {
+        await sleep(opts.settle);
+        const sections = await step('section_detect', () => wa.searchSections());
+        if (sections.contact && !sections.groupsInCommon && !sections.chats) { return finish('contact_only'); }
+        let opened = false;
+        if (sections.groupsInCommon) {
+            opened = await step('open_chat', () => openAfter(opts.afterGroupsXPath, opts.sectionTimeout, 0));
+        }
+        if (!opened && sections.chats) {
+            if (await step('open_chat', () => openAfter(opts.afterChatsXPath, opts.sectionTimeout, opts.settle))) {
+                await sleep(opts.chatLoad);
+                opened = await step('verify_group', () => wa.chatHeader().isGroup);
+                if (!opened) {
+                    // Back to the search box so nothing is sent to a person
+                    const box = wa.searchBox();
+                    if (box) { click(box); }
+                }
+            }
+        }
+        if (!opened) { return finish('no_group'); }
+    } else {
+        const found = await step('section_detect', () => waitFor(() => wa.searchSections().groupsInCommon, opts.phoneTimeout));
+        if (!found || !(await step('open_chat', () => openAfter(opts.afterGroupsXPath, opts.phoneTimeout, 0)))) {
+            return finish('not_in_group');
+        }
+    }
+
+    if (!opts.send) { return finish('resolved'); }
+    if (!opts.message) { return finish('error', 'no message to send'); }
+
+    const input = await step('compose_box', () => waitFor(wa.composeBox, opts.composeTimeout));
+    if (!input) { return finish('error', 'compose box not found'); }
+    await step('clear_input', () => {
+        input.focus();
+        document.execCommand('selectAll', false, null);
+        document.execCommand('delete', false, null);
+    });
+    await sleep(opts.settle);
+
+    await step('mention_picker', async () => {
+        insertText(input, '@', false);
+        const container = await waitFor(() => document.querySelector(opts.mentionSelector), opts.mentionTimeout);
+        if (!container) { return; }
+        for (const el of container.querySelectorAll('span._ao3e')) {
+            const name = (el.innerText || '').trim();
+            if (name && !opts.excludeWords.some(word => name.toLowerCase().includes(word.toLowerCase()))) {
+                click(el);
+                mention = name;
+                return;
+            }
+        }
+    });
+    await sleep(opts.settle);
+
+    await step('paste_text', () => insertText(input, opts.message, false));
+    finish(opts.image ? 'attach' : 'sent');
+}
+
+run().catch(e => done({outcome: 'error', detail: String(e), title: null, mention: mention, steps: steps}));
+""" % HELPERS_SCRIPT
+
+
+def entry_mode(mode=None):
+    """steps or macro: explicit value, else WA_ENTRY_MODE, else steps"""
+    mode = (mode or os.environ.get("WA_ENTRY_MODE") or "steps").strip().lower()
+    if mode not in ENTRY_MODES:
+        print(f"⚠️ Unknown entry mode '{mode}', using steps")
+        return "steps"
+    return mode
+
+
+def prepare_macro(session):
+    """Give async scripts room for a whole entry; call once before the first run_entry_macro"""
+    session.driver.set_script_timeout(SCRIPT_TIMEOUT)
+
+
+def run_entry_macro(session, entry, send=True, message=None, exclude_words=None):
+    """
+    Resolve (and with send, message) one entry in a single async page script
+
+    Args:
+        entry: parsed entry (see wa_engine.entries.parse_entry)
+        message: text to send; send without a message ends in 'error'
+        exclude_words: mention candidates containing any of these are skipped
+
+    Returns:
+        dict: outcome (sent, resolved, no_chat, contact_only, no_group,
+              not_in_group, search_box_missing or error), detail, title,
+              mention and steps ([{'name', 'start', 'duration'}] in ms)
+    """
+    from wa_engine.messaging import MENTION_CONTAINER_SELECTOR, attach_and_send, find_image
+    from wa_engine.runner import CHAT_AFTER_CHATS_XPATH, CHAT_AFTER_GROUPS_XPATH, NO_RESULT_XPATH
+
+    stage_timer = session.stage_timer
+    image_path = find_image(session) if send else None
+    options = dict(MACRO_TIMINGS, type=entry['type'], send=send, message=message or "",
+                   excludeWords=list(exclude_words or []), image=bool(image_path),
+                   noResultXPath=NO_RESULT_XPATH, afterGroupsXPath=CHAT_AFTER_GROUPS_XPATH,
+                   afterChatsXPath=CHAT_AFTER_CHATS_XPATH, mentionSelector=MENTION_CONTAINER_SELECTOR)
+
+    started = time.perf_counter()
+    with stage_timer.span("entry_macro"):
+        result = session.driver.execute_async_script(ENTRY_MACRO_SCRIPT, entry['value'], options, VERSION,
+                                                      session.page.registry.all_ordered()) or {}
+    for step in result.get('steps') or []:
+        stage_timer.record(step['name'], started + step['start'] / 1000, step['duration'] / 1000, source="page")
+
+    if result.get('outcome') == "attach":
+        # File uploads need WebDriver; the message is already composed
+        if attach_and_send(session, session.handles.get('compose_box'), image_path):
+            result['outcome'] = "sent"
+        else:
+            result['outcome'] = "error"
+            result['detail'] = "image attach or Send click failed"
+    result.setdefault('outcome', "error")
+    return result
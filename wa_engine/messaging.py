@@ -0,0 +1,252 @@
+"""
+Messaging
+Compose and send the campaign message (text, mention and image) in the chat
+that is currently open
+"""
+
+import glob
+import os
+import re
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+
+from tools.log_setup import get_logger
+from wa_engine.events import css_condition, xpath_condition
+from wa_engine.platform_input import attach_image, modifier_key, put_text
+
+log = get_logger("engine")
+
+MENTION_CONTAINER_SELECTOR = "div.xc9l9hb.x10l6tqk.x1lliihq"
+SEND_BUTTON_XPATH = '//div[@role="button" and @aria-label="Send"]'
+
+
+def load_exclude_words(path="TXT File/exclude_words.txt"):
+    """Load exclude words from exclude_words.txt file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            words = [line.strip() for line in f.readlines() if line.strip()]
+            return words if words else ["NepalWin", "NPW", "Blocked"]
+    except FileNotFoundError:
+        print("⚠️ exclude_words.txt not found, using default exclude words")
+        return ["NepalWin", "NPW", "Blocked"]
+
+
+def click_non_excluded_names(session, exclude_words=None):
+    """Pick the first mention suggestion whose name contains none of the exclude words"""
+    driver = session.driver
+    if exclude_words is None:
+        exclude_words = load_exclude_words(session.exclude_words_file)
+    
+    try:
+        # Wait for the tag suggestion container
+        container = session.wait_until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, MENTION_CONTAINER_SELECTOR)),
+            css_condition(MENTION_CONTAINER_SELECTOR), timeout=5
+        )
+
+        # Now only look for names inside this container
+        name_elements = container.find_elements(By.CSS_SELECTOR, "span._ao3e")
+
+        for elem in name_elements:
+            # Check for pause/stop before processing each name
+            session.checkpoint()
+            
+            name_text = elem.text.strip()
+            log.debug("\033[94m[DEBUG]\033[0m Found name element text: '%s'", name_text)
+            # Check if any exclude word is in the name (case insensitive)
+            should_exclude = any(exclude_word.lower() in name_text.lower() for exclude_word in exclude_words)
+            
+            if name_text and not should_exclude:
+                try:
+                    driver.execute_script("arguments[0].scrollIntoView(true);", elem)
+                    elem.click()
+                    log.info(f"\033[92m[APPROVED]\033[0m Clicked on: \033[92m{name_text}\033[0m")
+                    return True
+                except Exception as e:
+                    log.warning(f"\033[91m[WARN]\033[0m Could not click {name_text}: {repr(e)}")
+                    continue
+
+        log.debug("\033[93m[INFO]\033[0m No names found without %s inside container", exclude_words)
+        return False
+
+    except Exception as e:
+        log.warning(f"\033[91m[ERROR]\033[0m Could not retrieve names: {repr(e)}")
+        return False
+
+
+def send_message(session, message_index=0):
+    """Parse and send message content from description.txt file and attach an image from IMAGE-TO-SEND folder"""
+    driver = session.driver
+    stage_timer = session.stage_timer
+
+    try:
+        # --- Load messages ---
+        with stage_timer.span("load_message"):
+            messages = load_messages(session.message_file)
+        if not messages:
+            return False
+
+        if message_index >= len(messages):
+            message_index = 0
+
+        message = messages[message_index]
+        message_content = message.get('content', '')
+        if not message_content:
+            log.info("Selected message is empty - skipping")
+            return False
+
+        log.debug("📤 Sending message (%s): %s...", message['type'], message_content[:50])
+        # --- Locate message input (handle reused while the compose box survives) ---
+        with stage_timer.span("compose_box"):
+            message_input = session.handles.get('compose_box', timeout=10)
+
+        # Click and clear the message input
+        with stage_timer.span("clear_input"):
+            message_input.click()
+            stage_timer.sleep(0.5)
+            # Select all text and delete
+            message_input.send_keys(modifier_key(), 'a')  # Select all (Cmd on macOS, Ctrl elsewhere)
+            message_input.send_keys(Keys.DELETE)  # Clear selected text
+        log.debug("Message input cleared")
+        stage_timer.sleep(1)
+
+        # --- Click to open tag suggestions and select non-excluded name ---
+        with stage_timer.span("mention_picker"):
+            message_input.send_keys("@")
+            stage_timer.sleep(0.5)
+            click_non_excluded_names(session)
+        stage_timer.sleep(0.5)
+
+        # --- Paste text into input ---
+        with stage_timer.span("paste_text"):
+            message_input.click()
+            put_text(driver, message_input, message_content, session.input_mode, backend=session.backend)
+        log.debug("[INFO] Text pasted: %s...", message_content[:50])
+        stage_timer.sleep(.5)
+
+        # --- Check for image in IMAGE-TO-SEND folder ---
+        image_path = find_image(session)
+        if image_path:
+            if not attach_and_send(session, message_input, image_path):
+                return False
+        else:
+            # No image found, just send text
+            log.debug("[INFO] Text message sent successfully!")
+
+        return True
+    
+    
+    except FileNotFoundError:
+        log.warning("description.txt file not found")
+        return False
+    except Exception as e:
+        log.warning(f"Error sending message: {e}")
+        return False
+
+
+
+def find_image(session):
+    """Absolute path of the image to send (session.image_file, else the first in IMAGE-TO-SEND), or None"""
+    if session.image_file:
+        return os.path.abspath(session.image_file)
+    image_extensions = ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.bmp", "*.webp"]
+    for ext in image_extensions:
+        files = glob.glob(os.path.join(session.image_folder, ext))
+        if files:
+            return os.path.abspath(files[0])
+    return None
+
+
+def attach_and_send(session, message_input, image_path):
+    """Attach the image to the composed message and click Send; returns False if the attach failed"""
+    driver = session.driver
+    stage_timer = session.stage_timer
+
+    log.debug("[INFO] Found image: %s", image_path)
+    # Clipboard paste on a macOS desktop, the attach menu's file input elsewhere
+    import subprocess
+    try:
+        with stage_timer.span("attach_image"):
+            attach_image(driver, message_input, image_path, session.input_mode)
+            stage_timer.sleep(1)
+        
+        log.debug("[INFO] Image attached: %s", os.path.basename(image_path))
+        stage_timer.sleep(1)
+        # wait for the button to be clickable
+        with stage_timer.span("send_click"):
+            send_button = session.wait_until(
+                EC.element_to_be_clickable((By.XPATH, SEND_BUTTON_XPATH)),
+                xpath_condition(SEND_BUTTON_XPATH, clickable=True), timeout=10
+            )
+
+            send_button.click()
+        log.debug("[INFO] Message + image sent successfully!")
+        stage_timer.sleep(1.5)
+        return True
+        
+    except (subprocess.CalledProcessError, TimeoutException) as e:
+        log.warning(f"[ERROR] Failed to attach image: {e}")
+        log.debug("[INFO] Sending text message only")
+        return False
+
+
+def load_messages(filename="TXT File/description.txt"):
+    """Load and parse message content from description.txt file"""
+    try:
+        
+        with open(filename, 'r', encoding='utf-8') as file:
+            content = file.read().strip()
+        
+        if not content:
+            log.warning("⚠️ description.txt is empty")
+            return None
+            
+        # Parse different message formats
+        messages = []
+        
+        # Format 1: Simple text (entire file is one message)
+        if not any(marker in content for marker in ['---', '###', '#MESSAGE']):
+            messages.append({
+                "content": content,
+                "type": "simple"
+            })
+            log.debug("📄 Loaded simple message (%s characters)", len(content))
+        # Format 2: Multiple messages separated by ---
+        elif '---' in content:
+            parts = [part.strip() for part in content.split('---') if part.strip()]
+            for i, part in enumerate(parts):
+                messages.append({
+                    "content": part,
+                    "type": "multi",
+                    "index": i + 1
+                })
+            log.debug("📄 Loaded %s messages separated by '---'", len(messages))
+        # Format 3: Numbered messages with #MESSAGE pattern
+        elif '#MESSAGE' in content.upper():
+            pattern = re.compile(r"#MESSAGE\s*(\d+)\s*[:-]\s*(.*?)(?=#MESSAGE|\Z)", re.DOTALL | re.IGNORECASE)
+            matches = pattern.findall(content)
+            for num, msg_content in matches:
+                messages.append({
+                    "content": msg_content.strip(),
+                    "type": "numbered",
+                    "number": int(num)
+                })
+            log.debug("📄 Loaded %s numbered messages", len(messages))
+        if not messages:
+            log.warning("⚠️ Could not parse message format, using entire content as single message")
+            messages.append({
+                "content": content,
+                "type": "fallback"
+            })
+            
+        return messages
+        
+    except FileNotFoundError:
+        log.warning("❌ description.txt file not found")
+        return None
+    except Exception as e:
+        log.warning(f"❌ Error loading message file: {e}")
+        return None
@@ -0,0 +1,250 @@
+"""
+Page helpers
+A small JavaScript library installed in WhatsApp Web as window.__wa so each
+question about the page is one script call instead of a walk through many
+find_element round trips. The library keeps its own element cache (entries
+re-validated with isConnected) and a chat-list index that a MutationObserver
+drops whenever the list changes, so repeated reads of an unchanged list cost
+nothing in the page either.
+
+Installed lazily: a call that finds no library (first use, or a reload wiped
+it) installs it and answers in the same round trip. Selector lists come from
+the selector registry in their learned order; flush_stats() hands the page's
+hit/miss counts back to it.
+"""
+
+import hashlib
+
+from tools.log_setup import get_logger
+from wa_engine.selector_registry import get_registry
+
+log = get_logger("engine")
+
+MISSING = "__wa_missing__"
+
+# The library; arguments[2] is the version stamp, arguments[3] the selector lists by role
+HELPERS_SCRIPT = """
+(function (version, selectors) {
+    // Role -> selectors in learned order (wa_engine.selector_registry); a winner moves to the front
+    const SELECTORS = selectors;
+    const ROW_GROUP_HINT = "svg[data-testid*='group'], span[data-testid*='group'], [title*='admin'], [title*='participant']";
+    const HEADER_GROUP = "div[data-testid='conversation-info-header-group'], span[data-icon='group'], " +
+                         "div[data-testid='group-info'], span[title*='participant'], span[title*='member']";
+    const SECTIONS = {groupsInCommon: 'Groups in common', chats: 'Chats', contact: 'Contact'};
+    const GROUP_WORDS = ['participant', 'member', 'you, ', ', you'];
+    const GROUP_XPATH = "//*[contains(text(), 'Group') or contains(text(), 'Admin') or contains(@aria-label, 'Group')]";
+
+    const cache = {}, stats = {}, winners = {};
+    let index = null, observer = null, observed = null;
+
+    function visible(el) { return el.isConnected && el.getClientRects().length > 0; }
+
+    function note(role, selector, hit, ms) {
+        const byRole = stats[role] = stats[role] || {};
+        const counts = byRole[selector] = byRole[selector] || {hits: 0, misses: 0, ms: 0};
+        counts[hit ? 'hits' : 'misses'] += 1;
+        counts.ms += ms;
+        if (hit) { winners[role] = selector; }
+    }
+
+    // Every match of the first selector of role that matches anything under root
+    function findAll(role, root) {
+        const list = SELECTORS[role];
+        for (let i = 0; i < list.length; i++) {
+            const selector = list[i], start = performance.now();
+            const found = root.querySelectorAll(selector);
+            note(role, selector, found.length > 0, performance.now() - start);
+            if (found.length) {
+                if (i > 0) { list.splice(i, 1); list.unshift(selector); }
+                return found;
+            }
+        }
+        return [];
+    }
+
+    function find(role, test, root) {
+        const list = SELECTORS[role];
+        for (let i = 0; i < list.length; i++) {
+            const selector = list[i], start = performance.now();
+            let hit = null;
+            for (const el of (root || document).querySelectorAll(selector)) {
+                if (!test || test(el)) { hit = el; break; }
+            }
+            note(role, selector, !!hit, performance.now() - start);
+            if (hit) {
+                if (i > 0) { list.splice(i, 1); list.unshift(selector); }
+                return hit;
+            }
+        }
+        return null;
+    }
+
+    function takeStats() {
+        const report = {stats: JSON.parse(JSON.stringify(stats)), winners: Object.assign({}, winners)};
+        for (const role of Object.keys(stats)) { delete stats[role]; }
+        return report;
+    }
+
+    // Element cache: a hit costs one isConnected check
+    function cached(role, test) {
+        const el = cache[role];
+        if (el && el.isConnected && (!test || test(el))) { return el; }
+        return (cache[role] = find(role, test));
+    }
+
+    function watch(list) {
+        if (observed === list) { return; }
+        if (observer) { observer.disconnect(); }
+        observer = new MutationObserver(() => { index = null; });
+        observer.observe(list, {childList: true, subtree: true, characterData: true,
+                                attributes: true, attributeFilter: ['title']});
+        observed = list;
+        index = null;
+    }
+
+    function rowName(row) {
+        const el = find('chat_name', el => {
+            const name = (el.getAttribute('title') || el.textContent || '').trim();
+            return name && name.length < 200;
+        }, row);
+        return el ? (el.getAttribute('title') || el.textContent).trim() : null;
+    }
+
+    function chatList() {
+        const list = cached('chat_list');
+        if (!list) { return null; }
+        watch(list);
+        if (!index) {
+            let rows = findAll('chat_row', list);
+            if (!rows.length) { rows = findAll('chat_row', document); }
+            index = [];
+            for (const row of rows) {
+                const name = rowName(row);
+                if (name) {
+                    index.push({name: name, groupHint: !!row.querySelector(ROW_GROUP_HINT) || row.textContent.includes('~')});
+                }
+            }
+        }
+        return index;
+    }
+
+    function scrollChatList(by) {
+        const list = cached('chat_list');
+        if (!list) { return true; }
+        list.scrollTop += by;
+        return list.scrollTop >= list.scrollHeight - list.clientHeight - 10;
+    }
+
+    function searchSections() {
+        const found = {groupsInCommon: false, chats: false, contact: false};
+        for (const item of document.querySelectorAll("div[role='listitem']")) {
+            const text = item.textContent;
+            for (const key in SECTIONS) {
+                if (text.includes(SECTIONS[key])) { found[key] = true; }
+            }
+        }
+        return found;
+    }
+
+    function chatHeader() {
+        const header = document.querySelector('#main header');
+        const texts = header ? Array.from(header.querySelectorAll('span[title], span[dir="auto"]'))
+            .map(el => (el.getAttribute('title') || el.textContent || '').trim()).filter(Boolean) : [];
+        let isGroup = !!document.querySelector(HEADER_GROUP);
+        if (!isGroup) {
+            isGroup = Array.from(document.querySelectorAll('header span, header div'))
+                .some(el => GROUP_WORDS.some(word => (el.innerText || '').toLowerCase().includes(word)));
+        }
+        if (!isGroup) {
+            isGroup = !!document.evaluate(GROUP_XPATH, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)
+                .singleNodeValue;
+        }
+        return {title: texts[0] || null, subtitle: texts.find((text, i) => i > 0 && text !== texts[0]) || null,
+                isGroup: isGroup};
+    }
+
+    window.__wa = {
+        version: version,
+        searchBox: () => cached('search_box', visible),
+        composeBox: () => cached('compose_box', visible),
+        chatList: chatList,
+        scrollChatList: scrollChatList,
+        searchSections: searchSections,
+        chatHeader: chatHeader,
+        takeStats: takeStats,
+    };
+})(arguments[2], arguments[3]);
+"""
+
+# arguments: function name, argument list, version stamp
+CALL_SCRIPT = """
+const wa = window.__wa;
+if (!wa || wa.version !== arguments[2]) { return '%s'; }
+return wa[arguments[0]].apply(null, arguments[1]);
+""" % MISSING
+
+# A changed library gets a new stamp, so pages holding the old one re-install it
+VERSION = hashlib.sha1(HELPERS_SCRIPT.encode("utf-8")).hexdigest()[:12]
+
+
+class PageHelpers:
+    """Calls into the in-page helper library for one driver"""
+
+    def __init__(self, driver, registry=None):
+        self.driver = driver
+        self.registry = registry or get_registry()
+        self.installs = 0
+
+    def call(self, name, *args):
+        """Result of window.__wa[name](*args), installing the library first when the page lacks it"""
+        result = self.driver.execute_script(CALL_SCRIPT, name, list(args), VERSION)
+        if result == MISSING:
+            self.installs += 1
+            log.debug("Installing page helpers (v%s, install %d)", VERSION, self.installs)
+            result = self.driver.execute_script(HELPERS_SCRIPT + CALL_SCRIPT, name, list(args), VERSION,
+                                                self.registry.all_ordered())
+        return result
+
+    def flush_stats(self):
+        """Move the page's selector counts into the registry and save it; False if the page had none to give
+
+        The registry is saved either way, so counts from Python-side lookups
+        (SelectorRegistry.find) are kept when the page has no library.
+        """
+        merged = False
+        try:
+            report = self.driver.execute_script(CALL_SCRIPT, "takeStats", [], VERSION)
+            if report != MISSING:
+                self.registry.merge(report or {})
+                merged = True
+        except Exception as e:
+            log.debug("Could not read selector statistics from the page: %r", e)
+        try:
+            self.registry.save()
+        except Exception as e:
+            log.debug("Could not save selector statistics: %r", e)
+        return merged
+
+    def search_box(self):
+        """The visible search box element, or None"""
+        return self.call("searchBox")
+
+    def compose_box(self):
+        """The visible message compose box element, or None"""
+        return self.call("composeBox")
+
+    def chat_list(self):
+        """[{'name', 'groupHint'}] for the chat rows currently rendered, or None without a chat list"""
+        return self.call("chatList")
+
+    def scroll_chat_list(self, by=500):
+        """Scroll the chat list down by `by` pixels; returns whether it is at the end"""
+        return self.call("scrollChatList", by)
+
+    def search_sections(self):
+        """Which search result sections are shown: {'groupsInCommon', 'chats', 'contact'} -> bool"""
+        return self.call("searchSections") or {}
+
+    def chat_header(self):
+        """{'title', 'subtitle', 'isGroup'} for the open chat"""
+        return self.call("chatHeader") or {}
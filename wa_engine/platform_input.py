@@ -0,0 +1,166 @@
+"""
+Platform input
+Headless detection, viewport sizing and the two ways text and images get into
+WhatsApp Web:
+
+    clipboard  pyperclip + Cmd/Ctrl+V, and osascript for images (macOS desktop)
+    script     document.execCommand('insertText') for text and the attach
+               menu's <input type=file> for images; needs no display, no
+               clipboard and no window focus, so it works on a Linux server
+
+Environment:
+    WA_HEADLESS=1|0        force headless on or off (default: headless on a
+                           Linux host without DISPLAY / WAYLAND_DISPLAY)
+    WA_VIEWPORT=1600x1000  headless window size
+    WA_INPUT_MODE          clipboard | script (default: script when headless)
+"""
+
+import importlib.util
+import os
+import platform
+
+INPUT_MODES = ("clipboard", "script")
+DEFAULT_VIEWPORT = (1600, 1000)
+
+# Selects the editable's content (optionally) and inserts text the way a paste
+# would, so the page's input handlers see a normal beforeinput/input pair.
+# <input> elements that refuse execCommand get the value set directly instead.
+INSERT_TEXT_SCRIPT = """
+const el = arguments[0], text = arguments[1], replace = arguments[2];
+el.focus();
+if (replace) {
+    if (el.select) { el.select(); } else { document.execCommand('selectAll', false, null); }
+}
+if (document.execCommand('insertText', false, text)) { return true; }
+if ('value' in el) {
+    const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+    setter.call(el, replace ? text : el.value + text);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    return true;
+}
+return false;
+"""
+
+IMAGE_INPUT_SELECTOR = 'input[type="file"][accept*="image"]'
+
+
+def has_display():
+    """False on a Linux host with no X11 or Wayland display"""
+    if platform.system() != "Linux":
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def headless_requested(headless=None):
+    """Explicit value, else WA_HEADLESS, else headless whenever there is no display"""
+    if headless is not None:
+        return bool(headless)
+    value = os.environ.get("WA_HEADLESS")
+    if value is not None and value.strip():
+        return value.strip().lower() not in ("0", "false", "no")
+    return not has_display()
+
+
+def viewport_size():
+    """(width, height) from WA_VIEWPORT, e.g. 1600x1000"""
+    value = os.environ.get("WA_VIEWPORT", "")
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+        return width, height
+    except ValueError:
+        if value:
+            print(f"⚠️ Invalid WA_VIEWPORT '{value}', using {DEFAULT_VIEWPORT[0]}x{DEFAULT_VIEWPORT[1]}")
+        return DEFAULT_VIEWPORT
+
+
+def input_mode(headless=False, mode=None):
+    """clipboard on a desktop with pyperclip available, script otherwise (or as requested)"""
+    mode = (mode or os.environ.get("WA_INPUT_MODE") or "").strip().lower()
+    if mode in INPUT_MODES:
+        return mode
+    if mode:
+        print(f"⚠️ Unknown input mode '{mode}', choosing automatically")
+    if headless or not has_display():
+        return "script"
+    if importlib.util.find_spec("pyperclip") is None:
+        return "script"
+    return "clipboard"
+
+
+def modifier_key():
+    """Cmd on macOS, Ctrl everywhere else"""
+    from selenium.webdriver.common.keys import Keys
+
+    return Keys.COMMAND if platform.system() == "Darwin" else Keys.CONTROL
+
+
+def insert_text(driver, element, text, replace=False):
+    """Type text into an input or contenteditable from script; returns False if the page refused it"""
+    return bool(driver.execute_script(INSERT_TEXT_SCRIPT, element, text, replace))
+
+
+def put_text(driver, element, text, mode, replace=False, backend=None):
+    """Enter text with the given input mode, optionally replacing what is already there
+
+    In script mode the backend's insert_text is used when given (CDP
+    Input.insertText on Chromium), execCommand otherwise.
+    """
+    if mode == "script":
+        if backend is not None:
+            return backend.insert_text(driver, element, text, replace=replace)
+        return insert_text(driver, element, text, replace=replace)
+
+    import pyperclip
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.common.keys import Keys
+
+    pyperclip.copy(text)
+    modifier = modifier_key()
+    actions = ActionChains(driver).click(element)
+    if replace:
+        actions.key_down(modifier).send_keys("a").key_up(modifier).send_keys(Keys.DELETE)
+    actions.key_down(modifier).send_keys("v").key_up(modifier).perform()
+    return True
+
+
+def attach_file(driver, path, timeout=10):
+    """Attach a file through the attach menu's file input (no clipboard, works headless)"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    from wa_engine.selector_registry import get_registry
+
+    inputs = driver.find_elements(By.CSS_SELECTOR, IMAGE_INPUT_SELECTOR)
+    if not inputs:
+        # Attach button selectors in learned order (see wa_engine.selector_registry)
+        registry = get_registry()
+        WebDriverWait(driver, timeout).until(
+            lambda d: registry.find(d, 'attach_button', test=lambda el: el.is_displayed() and el.is_enabled())
+        ).click()
+        inputs = WebDriverWait(driver, timeout).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, IMAGE_INPUT_SELECTOR))
+    inputs[0].send_keys(os.path.abspath(path))
+
+
+def attach_image(driver, element, path, mode):
+    """Attach an image: osascript + paste on a macOS desktop, file input everywhere else"""
+    if mode == "clipboard" and platform.system() == "Darwin":
+        import subprocess
+        subprocess.run([
+            'osascript', '-e',
+            f'set the clipboard to (read file POSIX file "{path}" as JPEG picture)'
+        ], check=True)
+        element.click()
+        element.send_keys(modifier_key(), 'v')
+    else:
+        attach_file(driver, path)
+
+
+def size_window(driver, headless):
+    """Maximize on a desktop; headless windows get the WA_VIEWPORT size"""
+    if headless:
+        width, height = viewport_size()
+        driver.set_window_size(width, height)
+        return f"{width}x{height}"
+    driver.maximize_window()
+    return "maximized"
@@ -0,0 +1,65 @@
+"""
+Firefox preference sets
+ANTI_DETECTION_PREFS are always applied. LEAN_PREFS ("lean" browser mode)
+switch off rendering and network work the automation never looks at:
+animations, smooth scrolling, avatar/thumbnail images, web fonts and most of
+the caches. Lean mode is enabled with WA_BROWSER_MODE=lean; compare the two
+with tools/bench_lean.py.
+"""
+
+import os
+
+BROWSER_MODES = ("standard", "lean")
+
+ANTI_DETECTION_PREFS = {
+    "dom.webdriver.enabled": False,
+    "useAutomationExtension": False,
+    "general.useragent.override": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:109.0) Gecko/20100101 Firefox/115.0",
+}
+
+LEAN_PREFS = {
+    # Animations and scrolling: chat list updates land in one frame instead of tweening
+    "ui.prefersReducedMotion": 1,
+    "toolkit.cosmeticAnimations.enabled": False,
+    "general.smoothScroll": False,
+    "image.animation_mode": "none",
+    # Images: avatars and media thumbnails are never read, so they are never fetched or decoded
+    "permissions.default.image": 2,
+    "browser.display.use_document_fonts": 0,
+    "gfx.downloadable_fonts.enabled": False,
+    # Caches: small memory cache, no disk cache or back/forward cache to maintain
+    "browser.cache.disk.enable": False,
+    "browser.cache.memory.capacity": 32768,
+    "browser.sessionhistory.max_total_viewers": 0,
+    "browser.sessionstore.interval": 600000,
+    # Background work unrelated to the page
+    "media.autoplay.default": 5,
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "app.update.auto": False,
+}
+
+
+def browser_mode(mode=None):
+    """Requested browser mode, falling back to WA_BROWSER_MODE and then standard"""
+    mode = (mode or os.environ.get("WA_BROWSER_MODE") or "standard").strip().lower()
+    if mode not in BROWSER_MODES:
+        print(f"⚠️ Unknown browser mode '{mode}', using standard")
+        mode = "standard"
+    return mode
+
+
+def apply_prefs(options, mode=None):
+    """Set the anti-detection prefs, plus LEAN_PREFS in lean mode; returns the mode used"""
+    mode = browser_mode(mode)
+    prefs = dict(ANTI_DETECTION_PREFS)
+    if mode == "lean":
+        prefs.update(LEAN_PREFS)
+    for name, value in prefs.items():
+        options.set_preference(name, value)
+    return mode
@@ -0,0 +1,196 @@
+"""
+Firefox profile strategies
+How the logged-in WhatsApp profile is handed to Firefox:
+
+    inplace  launch Firefox directly on the profile (-profile <dir>); nothing
+             is copied, so start-up cost does not depend on profile size.
+             Firefox must not already be running on that profile.
+    slim     launch on a clone under Data/profiles/ holding only what the
+             WhatsApp Web session needs (cookies, certificates, the
+             web.whatsapp.com storage). Items are re-copied only when they
+             changed in the source profile since the last sync.
+    copy     the old behaviour: FirefoxProfile copies the whole profile into a
+             temp dir on every start.
+
+The mode comes from WA_PROFILE_MODE (default inplace); the profile directory
+can be overridden with WA_FIREFOX_PROFILE.
+"""
+
+import json
+import os
+import shutil
+
+PROFILE_MODES = ("inplace", "slim", "copy")
+DEFAULT_MODE = "inplace"
+SLIM_ROOT = "Data/profiles"
+SLIM_STATE_FILE = ".wa_slim.json"
+
+# Everything a WhatsApp Web login survives on; SQLite side files go with their database
+SLIM_ITEMS = (
+    "prefs.js",
+    "cookies.sqlite",
+    "permissions.sqlite",
+    "cert9.db",
+    "key4.db",
+    "storage.sqlite",
+    "webappsstore.sqlite",
+    "serviceworker.txt",
+    "storage/default/https+++web.whatsapp.com",
+)
+SQLITE_SIDE_FILES = ("-wal", "-shm")
+
+
+def profile_mode(mode=None):
+    """Requested profile mode, falling back to WA_PROFILE_MODE and then inplace"""
+    mode = (mode or os.environ.get("WA_PROFILE_MODE") or DEFAULT_MODE).strip().lower()
+    if mode not in PROFILE_MODES:
+        print(f"⚠️ Unknown profile mode '{mode}', using {DEFAULT_MODE}")
+        mode = DEFAULT_MODE
+    return mode
+
+
+def profile_in_use(profile_path):
+    """
+    True if a running Firefox holds the profile
+
+    Linux: the 'lock' symlink exists only while Firefox runs. macOS (and
+    Linux): Firefox keeps an fcntl lock on '.parentlock', which stays on disk
+    after it exits, so only a held lock counts. Windows: Firefox opens
+    'parent.lock' without sharing, so opening it fails while it runs.
+    """
+    if os.path.islink(os.path.join(profile_path, "lock")):
+        return True
+    parentlock = os.path.join(profile_path, ".parentlock")
+    if os.path.exists(parentlock):
+        try:
+            import fcntl
+            with open(parentlock, "a") as f:
+                fcntl.lockf(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.lockf(f, fcntl.LOCK_UN)
+        except ImportError:
+            pass
+        except OSError:
+            return True
+    parent_lock = os.path.join(profile_path, "parent.lock")
+    if os.path.exists(parent_lock):
+        try:
+            with open(parent_lock, "a"):
+                pass
+        except OSError:
+            return True
+    return False
+
+
+def _item_fingerprint(path):
+    """(file count, total size, newest mtime) of a file or directory tree"""
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [1, stat.st_size, int(stat.st_mtime)]
+    count = size = newest = 0
+    for folder, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(folder, name))
+            except OSError:
+                continue
+            count += 1
+            size += stat.st_size
+            newest = max(newest, int(stat.st_mtime))
+    return [count, size, newest]
+
+
+def _item_files(profile_path, item):
+    """The item plus any SQLite side files next to it, relative to the profile"""
+    return [item] + [item + suffix for suffix in SQLITE_SIDE_FILES
+                     if os.path.exists(os.path.join(profile_path, item + suffix))]
+
+
+def _copy_item(source, target):
+    if os.path.isdir(target) and not os.path.islink(target):
+        shutil.rmtree(target)
+    elif os.path.exists(target):
+        os.remove(target)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.isdir(source):
+        shutil.copytree(source, target)
+    else:
+        shutil.copy2(source, target)
+
+
+def sync_slim_profile(profile_path, slim_root=SLIM_ROOT):
+    """
+    Create or refresh the slim clone of a profile
+
+    An item is copied only when its fingerprint in the source profile changed
+    since the last sync, so the clone keeps its own newer session state
+    between runs and a refresh costs a stat() per file.
+
+    Returns:
+        tuple: (clone directory, number of items copied)
+    """
+    clone = os.path.abspath(os.path.join(slim_root, os.path.basename(os.path.normpath(profile_path)) + ".slim"))
+    os.makedirs(clone, exist_ok=True)
+    state_path = os.path.join(clone, SLIM_STATE_FILE)
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+
+    copied = 0
+    for item in SLIM_ITEMS:
+        if not os.path.exists(os.path.join(profile_path, item)):
+            continue
+        # A database and its -wal/-shm only make sense together, so they share one fingerprint
+        files = _item_files(profile_path, item)
+        fingerprint = [_item_fingerprint(os.path.join(profile_path, name)) for name in files]
+        if state.get(item) == fingerprint and os.path.exists(os.path.join(clone, item)):
+            continue
+        try:
+            for suffix in SQLITE_SIDE_FILES:
+                stale = os.path.join(clone, item + suffix)
+                if os.path.exists(stale):
+                    os.remove(stale)
+            for name in files:
+                _copy_item(os.path.join(profile_path, name), os.path.join(clone, name))
+            state[item] = fingerprint
+            copied += 1
+        except OSError as e:
+            print(f"⚠️ Could not copy {item} into the slim profile: {e}")
+
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    return clone, copied
+
+
+def apply_profile(options, profile_path, mode=None):
+    """
+    Point Firefox options at the WhatsApp profile using the chosen strategy
+
+    Returns:
+        str: the mode actually used, or None if the profile was not found
+    """
+    if not profile_path or not os.path.isdir(profile_path):
+        print(f"⚠️ Profile not found: {profile_path}")
+        print("Using default Firefox profile...")
+        return None
+
+    mode = profile_mode(mode)
+    if mode == "inplace" and profile_in_use(profile_path):
+        print("⚠️ Firefox is already running on this profile, launching on a slim clone instead")
+        mode = "slim"
+
+    if mode == "copy":
+        from selenium import webdriver
+        options.profile = webdriver.FirefoxProfile(profile_path)
+        print(f"✅ Using a copy of Firefox profile: {profile_path}")
+        return mode
+
+    target = profile_path
+    if mode == "slim":
+        target, copied = sync_slim_profile(profile_path)
+        print(f"✅ Slim profile ready ({copied} item(s) refreshed): {target}")
+    options.add_argument("-profile")
+    options.add_argument(os.path.abspath(target))
+    print(f"✅ Launching Firefox directly on profile: {target}")
+    return mode
@@ -0,0 +1,178 @@
+"""
+Reattach
+Keeps Firefox and the synced WhatsApp Web tab alive across script restarts.
+geckodriver is started detached from the Python process and the WebDriver
+endpoint and session id are saved in Data/browser_sessions/<profile>.json.
+The next start adopts that session instead of launching and syncing again.
+
+Enabled with WA_REATTACH=1. Session.close() then leaves the browser running;
+quit it for good with:
+
+    python3 -m wa_engine.reattach --stop
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+RECORD_FOLDER = "Data/browser_sessions"
+START_TIMEOUT = 15
+
+
+def reattach_enabled(value=None):
+    """Explicit value, else WA_REATTACH"""
+    if value is not None:
+        return bool(value)
+    return os.environ.get("WA_REATTACH", "").strip().lower() in ("1", "true", "yes")
+
+
+def record_path(profile_path):
+    name = os.path.basename(os.path.normpath(profile_path or "default")) or "default"
+    return os.path.join(RECORD_FOLDER, f"{name}.json")
+
+
+def load_record(profile_path):
+    try:
+        with open(record_path(profile_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_record(profile_path, record):
+    os.makedirs(RECORD_FOLDER, exist_ok=True)
+    with open(record_path(profile_path), "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+
+
+def clear_record(profile_path):
+    try:
+        os.remove(record_path(profile_path))
+    except OSError:
+        pass
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def driver_status(url, timeout=1):
+    """geckodriver's /status payload, or None if nothing answers at url"""
+    try:
+        with urllib.request.urlopen(f"{url}/status", timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8")).get("value", {})
+    except (OSError, ValueError):
+        return None
+
+
+def _attached_driver(url, session_id, capabilities):
+    """Remote WebDriver bound to an existing session instead of creating one"""
+    from selenium.webdriver.firefox.options import Options
+    from selenium.webdriver.remote.file_detector import UselessFileDetector
+    from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+
+    class AttachedDriver(RemoteWebDriver):
+        def start_session(self, caps):
+            # Adopt the saved session instead of sending New Session
+            self.session_id = session_id
+            self.caps = capabilities or {}
+
+    driver = AttachedDriver(command_executor=url, options=Options())
+    # geckodriver runs on this machine, so file inputs take local paths as-is
+    driver.file_detector = UselessFileDetector()
+    return driver
+
+
+def attach(record):
+    """Adopt the session in record; returns the driver, or None if it is gone"""
+    if driver_status(record['url']) is None:
+        return None
+    try:
+        driver = _attached_driver(record['url'], record['session_id'], record.get('capabilities'))
+        driver.execute_script("return 1")
+    except Exception:
+        return None
+    return driver
+
+
+def start_detached(gecko_path, options, profile_path, headless=False):
+    """Start geckodriver in its own process group and open a session on it; saves the record"""
+    from selenium import webdriver
+    from selenium.webdriver.remote.file_detector import UselessFileDetector
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    os.makedirs("Logs", exist_ok=True)
+    with open(os.path.join("Logs", "geckodriver_detached.log"), "ab") as log_file:
+        process = subprocess.Popen([gecko_path, "--port", str(port)], stdout=log_file, stderr=subprocess.STDOUT,
+                                   stdin=subprocess.DEVNULL, start_new_session=True)
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while driver_status(url) is None:
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"geckodriver did not start on port {port}")
+        time.sleep(0.1)
+
+    try:
+        driver = webdriver.Remote(command_executor=url, options=options)
+    except Exception:
+        process.kill()
+        raise
+    driver.file_detector = UselessFileDetector()
+    save_record(profile_path, {
+        'url': url,
+        'session_id': driver.session_id,
+        'pid': process.pid,
+        'headless': headless,
+        'capabilities': driver.caps,
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+    })
+    return driver
+
+
+def stop(profile_path, record=None):
+    """End the saved session and its geckodriver process, then forget the record"""
+    record = record or load_record(profile_path)
+    if not record:
+        return False
+    # A PID with nothing answering at the saved URL may have been reused by another process
+    if driver_status(record['url']) is not None:
+        driver = attach(record)
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        try:
+            os.kill(record['pid'], signal.SIGTERM)
+        except (OSError, KeyError):
+            pass
+    clear_record(profile_path)
+    return True
+
+
+def main():
+    from wa_engine.session import DEFAULT_PROFILE_PATH
+
+    record = load_record(DEFAULT_PROFILE_PATH)
+    if "--stop" in sys.argv:
+        print("✅ Browser session stopped" if stop(DEFAULT_PROFILE_PATH, record) else "ℹ️ No saved browser session")
+    elif record:
+        alive = driver_status(record['url']) is not None
+        print(f"{'✅' if alive else '⚠️'} Session {record['session_id']} at {record['url']} "
+              f"(pid {record['pid']}, started {record['started_at']}, {'running' if alive else 'gone'})")
+    else:
+        print("ℹ️ No saved browser session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+"""
+Runner
+The send loop: search each entry, open the matching group chat, send (or just
+resolve) and record failures in not_in_group.txt, with timing, command
+counts, progress, run database rows and live metrics for every entry
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from tools.log_setup import get_logger
+from tools.profiling import entry_done, profiled
+from wa_engine.entries import parse_entry
+from wa_engine.events import xpath_condition
+from wa_engine.macro import entry_mode as resolve_entry_mode
+from wa_engine.macro import prepare_macro, run_entry_macro
+from wa_engine.messaging import load_exclude_words, load_messages, send_message
+from wa_engine.platform_input import put_text
+
+log = get_logger("engine")
+
+NO_RESULT_XPATH = "//span[contains(text(), 'No chats, contacts or messages found')]"
+GROUPS_IN_COMMON_XPATH = "//div[@role='listitem' and contains(., 'Groups in common')]"
+CHAT_AFTER_GROUPS_XPATH = GROUPS_IN_COMMON_XPATH + "/following-sibling::div[1]"
+CHAT_AFTER_CHATS_XPATH = "//div[@role='listitem' and contains(., 'Chats')]/following-sibling::div[1]"
+
+
+@profiled("run_entries")
+def run_entries(session, start_row=None, max_rows=None, total_numbers=None, entries=None, deadline=None, send=True,
+                min_interval=None, entry_mode=None):
+    """Loop through phone numbers AND group chat names from phone_number.txt and search for them
+    
+    Args:
+        start_row (int): Starting row number (1-based index, None = start from beginning)
+        max_rows (int): Maximum number of rows to process (None = process all)
+        entries (list): Entry lines to process instead of phone_number.txt
+                        (e.g. failures from get_rerun_selection)
+        deadline (datetime): Stop before the first entry that would not finish by
+                             this time (default: WA_FINISH_BY / WA_RUN_MINUTES)
+        send (bool): False = resolve-only: find and open each chat, record
+                     failures as usual, but do not send the message
+        min_interval (float): Rate limit - minimum seconds between the starts of
+                              two entries (None = as fast as possible)
+        entry_mode (str): steps = one WebDriver command per action; macro = the
+                          whole entry as one in-page script (see wa_engine.macro);
+                          None uses WA_ENTRY_MODE
+
+    Counts and the row a time-boxed run stopped at are left in session.last_run.
+    """
+    from tools.progress import RunProgress
+    from tools.run_db import DEFAULT_DB_PATH, RunRecorder
+    from tools.time_box import TimeBox, deadline_from_env
+
+    driver = session.driver
+    stage_timer = session.stage_timer
+    command_counter = session.command_counter
+    output_journal = session.output_journal
+    send_metrics = session.metrics
+    last_run = session.last_run
+    NOT_IN_GROUP_FILE = session.not_in_group_file
+
+    # Initialize statistics
+    successful_numbers = 0
+    failed_numbers = 0
+    last_run.clear()
+    
+    # Add timestamp to not_in_group.txt at start of processing
+    # GMT+7 timezone (7 hours ahead of UTC)
+    gmt_plus_7 = datetime.utcnow() + timedelta(hours=7)
+    timestamp = gmt_plus_7.strftime("%Y-%m-%d %H:%M:%S GMT+7")
+    output_journal.reset_count(NOT_IN_GROUP_FILE)
+    output_journal.write(NOT_IN_GROUP_FILE, f"\n=== Processing started: {timestamp} ===\n", counted=False)
+    log.info(f"📅 GMT+7 Timestamp recorded in not_in_group.txt")
+    
+    try:
+        # Load phone numbers AND group chat names from file
+        all_entries = []
+        phone_count = 0
+        group_count = 0
+        
+        if entries is not None:
+            source_file = NOT_IN_GROUP_FILE
+            lines = entries
+        else:
+            source_file = session.phone_number_file
+            with open(source_file, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        
+        for line in lines:
+            entry = parse_entry(line)
+            if entry is None:
+                continue
+            all_entries.append(entry)
+            if entry['type'] == 'phone':
+                phone_count += 1
+            else:
+                group_count += 1
+        
+        if not all_entries:
+            log.warning(f"❌ No valid entries found in {os.path.basename(source_file)}")
+            return False
+        
+        log.info(f"📊 Loaded {phone_count} phone numbers and {group_count} group chat names")
+        
+        # Apply row filtering
+        if start_row is not None:
+            start_index = max(0, start_row - 1)  # Convert to 0-based index
+            all_entries = all_entries[start_index:]
+            
+        if max_rows is not None:
+            all_entries = all_entries[:max_rows]
+            
+        entries_to_process = all_entries
+        
+        if not entries_to_process:
+            log.warning("❌ No entries found in specified range")
+            return False
+        
+        range_info = ""
+        if start_row or max_rows:
+            start_display = start_row if start_row else 1
+            end_display = (start_display + len(entries_to_process) - 1) if entries_to_process else start_display
+            range_info = f" (rows {start_display}-{end_display})"
+            
+        log.info(f"📞 Processing {len(entries_to_process)} entries (phones + groups) from file{range_info}")
+        send_metrics.start_run(len(entries_to_process))
+
+        # Runs, attempts and stage timings go to SQLite through a write-behind thread
+        run_recorder = RunRecorder(os.environ.get("WA_RUN_DB", DEFAULT_DB_PATH))
+        run_recorder.start_run("send_messages" if send else "resolve_only", source_file, len(entries_to_process))
+
+        # Progress bar on a terminal, periodic summary lines in the log otherwise
+        progress = RunProgress(len(entries_to_process), "📤 Sending" if send else "🔎 Resolving",
+                               ok_label="sent" if send else "resolved")
+
+        # Time-boxed run: sized from history, re-checked against the live rate per entry
+        if deadline is None:
+            deadline = deadline_from_env()
+        time_box = TimeBox(deadline) if deadline else None
+        if time_box:
+            log.info(f"⏰ Time box: {time_box.describe()}")
+        stopped_at_row = None
+        last_entry_started = None
+
+        # Macro mode: message and exclude words are read once, each entry is one page script
+        use_macro = resolve_entry_mode(entry_mode) == "macro"
+        if use_macro:
+            prepare_macro(session)
+            macro_messages = load_messages(session.message_file) if send else None
+            macro_message = macro_messages[0].get('content', '') if macro_messages else ""
+            macro_exclude_words = load_exclude_words(session.exclude_words_file)
+            log.info("⚡ Entry macro mode: one in-page script per entry")
+        
+        for row_index, entry in enumerate(entries_to_process, start=1):
+            # Check for pause/stop before processing each number
+            session.checkpoint()
+            
+            # Calculate actual row number considering start_row offset
+            actual_row = (start_row if start_row else 1) + row_index - 1
+
+            if time_box and not time_box.has_time_for_next(progress.seconds_per_entry):
+                stopped_at_row = actual_row
+                log.info(f"⏰ Time box reached - stopping before row {actual_row}")
+                break
+
+            if min_interval and last_entry_started is not None:
+                wait = last_entry_started + min_interval - time.monotonic()
+                if wait > 0:
+                    stage_timer.sleep(wait, "rate_limit")
+            last_entry_started = time.monotonic()
+            
+            # Extract the search value and type
+            search_value = entry['value']
+            entry_type = entry['type']
+            original_entry = entry['original']
+            
+            if entry_type == 'phone':
+                log.info(f"🔍 Processing phone number: {search_value}")
+            else:
+                log.info(f"🔍 Processing group chat: {search_value}")
+
+            stage_timer.begin_entry(actual_row, search_value)
+            command_counter.begin_entry()
+            attempt_started = datetime.now().isoformat(timespec='seconds')
+            outcome = "error"
+            chat_title = None
+            try:
+                if use_macro:
+                    result = run_entry_macro(session, entry, send, macro_message, macro_exclude_words)
+                    outcome = result['outcome']
+                    chat_title = result.get('title')
+                    if outcome in ("sent", "resolved"):
+                        log.info(f"\033[1;32m[{actual_row}/{total_numbers}]\033[0m [{outcome.upper()}] "
+                                 f"{search_value} -> {result.get('title')}")
+                        successful_numbers += 1
+                        stage_timer.sleep(.7)
+                    elif outcome == "search_box_missing":
+                        log.warning(f"❌ Could not find search box for entry {search_value}")
+                    else:
+                        log.warning(f"\033[91m[WARN]\033[0m {outcome} for {search_value}"
+                                    + (f": {result['detail']}" if result.get('detail') else ""))
+                        if outcome != "error":
+                            output_journal.write(NOT_IN_GROUP_FILE, f"{original_entry}\n")
+                            log.info(f"\033[93m[RECORDED]\033[0m Entry \033[93m{search_value}\033[0m saved to not_in_group.txt")
+                        failed_numbers += 1
+                    continue
+
+                # Search box handle kept from the last entry while it is still attached;
+                # its validity check also scrolls it into view
+                try:
+                    with stage_timer.span("search_box"):
+                        search_box = session.handles.get('search_box', timeout=10, scroll=True)
+                    # print(f"✅ Found search box")
+                except TimeoutException:
+                    log.warning(f"❌ Could not find search box for entry {search_value}")
+                    outcome = "search_box_missing"
+                    continue
+
+                with stage_timer.span("search_input"):
+                    stage_timer.sleep(0.5)
+
+                    # Click using ActionChains for better reliability
+                    from selenium.webdriver.common.action_chains import ActionChains
+                    ActionChains(driver).move_to_element(search_box).click().perform()
+                    stage_timer.sleep(0.5)
+
+                    # Replace the search text: clipboard paste on a desktop, script insertion headless
+                    put_text(driver, search_box, search_value, session.input_mode, replace=True,
+                             backend=session.backend)
+                    stage_timer.sleep(.5)
+
+                log.info(f"\033[92m[APPROVED]\033[0m Pasted entry into search: {search_value}")
+
+
+                # --- Check for "No chats, contacts or messages found" ---
+                try:
+                    with stage_timer.span("no_result_check"):
+                        no_result = session.wait_until(
+                            EC.presence_of_element_located((By.XPATH, NO_RESULT_XPATH)),
+                            xpath_condition(NO_RESULT_XPATH), timeout=2, poll_frequency=0.2
+                        )
+                    if no_result.is_displayed():
+                        log.warning(f"\033[91m[WARN]\033[0m No chat found for {search_value}")
+                        output_journal.write(NOT_IN_GROUP_FILE, f"{original_entry}\n")
+                        log.info(f"\033[93m[RECORDED]\033[0m Entry \033[93m{search_value}\033[0m saved to not_in_group.txt")
+                        failed_numbers += 1
+                        outcome = "no_chat"
+                        continue  # jump to next number in your loop
+
+                except TimeoutException:
+                    # No such span -> safe to continue normal flow
+                    pass
+
+                # Verify the content was pasted
+                # time.sleep(0.5)
+                with stage_timer.span("verify_paste"):
+                    current_value = search_box.get_attribute('value') or driver.execute_script("return arguments[0].innerText;", search_box)
+                    if search_value not in str(current_value):
+                        log.warning(f"⚠️ Paste may have failed, trying direct input...")
+                        # Fallback: direct character input
+                        search_box.clear()
+                        for char in search_value:
+                            search_box.send_keys(char)
+                            time.sleep(0.05)
+
+                # Different handling based on entry type
+                if entry_type == 'group':
+                    # For group chats (alphabetic entries): Priority order - Groups in common > Chats > Contact
+                    groups_common_success = False
+                    stage_timer.sleep(.5)
+
+                    # Check what sections are available (one page-helper call)
+                    with stage_timer.span("section_detect"):
+                        sections = session.page.search_sections()
+                    groups_in_common_found = bool(sections.get('groupsInCommon'))
+                    chats_found = bool(sections.get('chats'))
+                    contact_found = bool(sections.get('contact'))
+                    log.debug("[INFO] Sections found: %s", ", ".join(name for name, found in sections.items() if found) or "none")
+
+                    # If ONLY 'Contact' section found, skip immediately
+                    if contact_found and not groups_in_common_found and not chats_found:
+                        log.warning(f"[WARN] Only 'Contact' section found for: {search_value} - skipping (individual contact only)")
+                        # Record the entry in not_in_group.txt
+                        output_journal.write(NOT_IN_GROUP_FILE, f"{original_entry}\n")
+                        log.info(f"\033[93m[RECORDED]\033[0m Contact-only entry {search_value} saved to not_in_group.txt")
+                        failed_numbers += 1
+                        outcome = "contact_only"
+                        continue
+
+                    # Priority 1: Try "Groups in common" first
+                    if groups_in_common_found and not groups_common_success:
+                        try:
+                            log.debug("[INFO] Trying 'Groups in common' (Priority 1)")
+                            with stage_timer.span("open_chat", section="groups_in_common"):
+                                # Wait for the next sibling div (the chat after 'Groups in common')
+                                next_chat = session.wait_until(
+                                    EC.element_to_be_clickable((By.XPATH, CHAT_AFTER_GROUPS_XPATH)),
+                                    xpath_condition(CHAT_AFTER_GROUPS_XPATH, clickable=True), timeout=2, poll_frequency=0.2
+                                )
+
+                                # Scroll into view and click
+                                driver.execute_script("arguments[0].scrollIntoView();", next_chat)
+                                next_chat.click()
+                            log.debug("[SUCCESS] Clicked chat after 'Groups in common'")
+                            groups_common_success = True
+
+                        except Exception as e:
+                            log.debug("[INFO] 'Groups in common' click failed: %s", e)
+                    # Priority 2: Try "Chats" if Groups in common failed
+                    if chats_found and not groups_common_success:
+                        try:
+                            log.debug("[INFO] Trying 'Chats' section (Priority 2)")
+                            with stage_timer.span("open_chat", section="chats"):
+                                # Try to find chat under "Chats" section
+                                chat_found = session.wait_until(
+                                    EC.element_to_be_clickable((By.XPATH, CHAT_AFTER_CHATS_XPATH)),
+                                    xpath_condition(CHAT_AFTER_CHATS_XPATH, clickable=True), timeout=2, poll_frequency=0.1
+                                )
+
+                                # Click on the found chat
+                                driver.execute_script("arguments[0].scrollIntoView();", chat_found)
+                                stage_timer.sleep(0.5)
+                                chat_found.click()
+                            log.debug("[INFO] Clicked on chat under 'Chats': %s", search_value)
+                            # Wait for chat to load and verify it's a group chat
+                            stage_timer.sleep(1)
+                            is_group_chat = False
+
+                            with stage_timer.span("verify_group"):
+                                try:
+                                    # Group icon, participant line or group elements, checked in the page
+                                    header = session.page.chat_header()
+                                    is_group_chat = bool(header.get('isGroup'))
+                                    if is_group_chat:
+                                        log.debug("[INFO] Confirmed: This is a group chat (%s)", header.get('title'))
+                                except Exception as e:
+                                    log.warning(f"[WARN] Could not verify if chat is a group: {e}")
+                            
+                            if is_group_chat:
+                                log.info(f"[SUCCESS] Verified group chat under 'Chats' for: {search_value}")
+                                groups_common_success = True
+                            else:
+                                log.warning(f"[WARN] Chat under 'Chats' appears to be individual, not group for: {search_value}")
+                                # Go back to search to avoid sending to wrong chat
+                                session.handles.get('search_box').click()
+                                stage_timer.sleep(0.5)
+                                
+                        except Exception as e:
+                            log.debug("[INFO] 'Chats' section failed: %s", e)
+                    # Final check - if nothing worked, record as failed
+                    if not groups_common_success:
+                        log.warning(f"\033[91m[WARN]\033[0m All sections failed for group: {search_value}")
+                        # Record the entry in not_in_group.txt
+                        output_journal.write(NOT_IN_GROUP_FILE, f"{original_entry}\n")
+                        log.info(f"\033[93m[RECORDED]\033[0m Group {search_value} saved to not_in_group.txt")
+                        failed_numbers += 1
+                        outcome = "no_group"
+                        continue
+                    
+                    # Send message if any method succeeded
+                    if groups_common_success:
+                        if send:
+                            log.info(f"\033[1;32m[{actual_row}/{total_numbers}]\033[0m [INFO] Sending message to group: {search_value}")
+                            with stage_timer.span("send_message"):
+                                sent = send_message(session)
+                            if not sent:
+                                log.warning(f"\033[91m[WARN]\033[0m Message not sent to group: {search_value}")
+                                failed_numbers += 1
+                                outcome = "error"
+                                continue
+                            outcome = "sent"
+                        else:
+                            log.info(f"\033[1;32m[{actual_row}/{total_numbers}]\033[0m [RESOLVED] Group chat opened: {search_value}")
+                            outcome = "resolved"
+                        successful_numbers += 1
+                        stage_timer.sleep(.5)
+                        
+                else:
+                    # For phone numbers: use the original "Groups in common" logic
+                    try:
+                        with stage_timer.span("section_detect"):
+                            # Wait for the "Groups in common" div to appear
+                            groups_in_common = session.wait_until(
+                                EC.presence_of_element_located((By.XPATH, GROUPS_IN_COMMON_XPATH)),
+                                xpath_condition(GROUPS_IN_COMMON_XPATH), timeout=20, poll_frequency=0.2
+                            )
+
+                        with stage_timer.span("open_chat", section="groups_in_common"):
+                            # Wait for the next sibling div (the chat after 'Groups in common')
+                            next_chat = session.wait_until(
+                                EC.element_to_be_clickable((By.XPATH, CHAT_AFTER_GROUPS_XPATH)),
+                                xpath_condition(CHAT_AFTER_GROUPS_XPATH, clickable=True), timeout=20, poll_frequency=0.2
+                            )
+
+                            # Scroll into view and click
+                            driver.execute_script("arguments[0].scrollIntoView();", next_chat)
+                            next_chat.click()
+                        log.debug("[INFO] Clicked chat after 'Groups in common'")
+                        
+                        # Send message from file
+                        if send:
+                            log.info(f"\033[1;32m[{actual_row}/{total_numbers}]\033[0m [INFO] Sending message to chat for phone: {search_value}")
+                            with stage_timer.span("send_message"):
+                                sent = send_message(session)
+                            if not sent:
+                                log.warning(f"\033[91m[WARN]\033[0m Message not sent for phone: {search_value}")
+                                failed_numbers += 1
+                                outcome = "error"
+                                continue
+                            outcome = "sent"
+                        else:
+                            log.info(f"\033[1;32m[{actual_row}/{total_numbers}]\033[0m [RESOLVED] Chat opened for phone: {search_value}")
+                            outcome = "resolved"
+                        successful_numbers += 1
+                        stage_timer.sleep(.5)
+
+                    except Exception:
+                        log.warning(f"\033[91m[WARN]\033[0m 'Groups in common' not found for phone: {search_value}")
+                        # Record the entry in not_in_group.txt
+                        output_journal.write(NOT_IN_GROUP_FILE, f"{original_entry}\n")
+                        log.info(f"\033[93m[RECORDED]\033[0m Phone {search_value} saved to not_in_group.txt")
+                        failed_numbers += 1
+                        outcome = "not_in_group"
+                        continue
+
+                
+
+                # Wait a bit before next number
+                stage_timer.sleep(.7)
+
+            except Exception as e:
+                log.warning(f"⚠️ Could not process entry {search_value}: {repr(e)}")
+                failed_numbers += 1
+                continue
+            finally:
+                entry_spans = stage_timer.end_entry(outcome)
+                command_counter.end_entry()
+                run_recorder.record_attempt(
+                    actual_row, original_entry, entry_type, outcome, attempt_started,
+                    entry_spans[-1]['duration'] if entry_spans else None,
+                    [(span['name'], span['duration']) for span in entry_spans[:-1]],
+                    chat_title=chat_title
+                )
+                send_metrics.entry_finished(outcome)
+                progress.update(ok=outcome in ("sent", "resolved"))
+                entry_done()
+
+        progress.close()
+        run_recorder.finish_run(successful_numbers, failed_numbers)
+        last_run.update(successful=successful_numbers, failed=failed_numbers,
+                        total=len(entries_to_process), stopped_at_row=stopped_at_row)
+        run_recorder.close()
+
+        # Print completion statistics
+        print("\n" + "="*60)
+        print("📊 PROCESSING COMPLETED!")
+        print("="*60)
+        print(f"✅ Successful {'messages sent' if send else 'chats resolved'}: {successful_numbers}")
+        print(f"❌ Entries not found/failed: {failed_numbers}")
+        print(f"📞 Total entries processed: {successful_numbers + failed_numbers}")
+        if stopped_at_row is not None:
+            if entries is None:
+                print(f"⏰ Stopped at the time box - resume from row {stopped_at_row}")
+            else:
+                print(f"⏰ Stopped at the time box - {len(entries_to_process) - stopped_at_row + 1} entries not re-run")
+        
+        # Counted by the journal as they were written - no need to re-read the file
+        print(f"📝 Entries recorded in not_in_group.txt: {output_journal.count(NOT_IN_GROUP_FILE)}")
+        
+        print("="*60)
+        if stopped_at_row is None:
+            print("🎉 All entries processed successfully!")
+
+        # Per-stage latency table and trace export
+        stage_timer.print_summary()
+        try:
+            for path in stage_timer.export():
+                print(f"📈 Stage timings saved to: {path}")
+        except Exception as e:
+            print(f"⚠️ Could not export stage timings: {e}")
+
+        command_counter.print_report()
+        log.info(f"♻️ Element handles: {session.handles.summary()}")
+        try:
+            print(f"🔌 Command report saved to: {command_counter.export()}")
+        except Exception as e:
+            print(f"⚠️ Could not export command report: {e}")
+        
+        # Add completion timestamp to not_in_group.txt
+        # GMT+7 timezone (7 hours ahead of UTC)
+        gmt_plus_7 = datetime.utcnow() + timedelta(hours=7)
+        timestamp = gmt_plus_7.strftime("%Y-%m-%d %H:%M:%S GMT+7")
+        output_journal.write(NOT_IN_GROUP_FILE, f"=== Processing completed: {timestamp} ===\n\n", counted=False)
+        output_journal.flush()
+        print(f"📅 GMT+7 Completion timestamp recorded in not_in_group.txt")
+        
+        return True
+
+    except Exception as e:
+        log.warning(f"❌ Error in loop_through_numbers: {repr(e)}")
+        return False
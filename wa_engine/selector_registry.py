@@ -0,0 +1,188 @@
+"""
+Selector registry
+The fallback selector lists for each page element role in one place, in a
+learned order: the selector that matched last goes first, the rest follow by
+hit count, then in their default order. Hits, misses and lookup time per
+selector are kept in Data/selectors.json across runs, so after a WhatsApp Web
+DOM change the first lookup probes the list once and every later lookup tries
+the new winner first.
+
+The in-page helper library (wa_engine.page) gets these lists when it is
+installed, reorders them itself as selectors win and hands its counts back
+through PageHelpers.flush_stats(); lookups made from Python use
+SelectorRegistry.find().
+
+Show what has been learned:
+
+    python3 -m wa_engine.selector_registry
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_PATH = "Data/selectors.json"
+
+# Role -> fallback selectors in their default order
+ROLES = {
+    'search_box': (
+        '[aria-placeholder="Search or start a new chat"]',
+        'div[contenteditable="true"][data-tab="3"]',
+        'div[title="Search input textbox"]',
+        '[data-testid="chat-list-search"]',
+        'div[role="textbox"]',
+    ),
+    'compose_box': (
+        'div[contenteditable="true"][data-tab="10"]',
+        'footer div[contenteditable="true"]',
+        'p.selectable-text.copyable-text',
+        '[data-testid="conversation-compose-box-input"]',
+    ),
+    'chat_list': (
+        "div[data-testid='chat-list']",
+        '#pane-side',
+        "div[role='grid']",
+        'div._ak72',
+    ),
+    'chat_row': (
+        'div._ak72',
+        "div[role='listitem']",
+        "div[data-testid*='chat']",
+    ),
+    'chat_name': (
+        'span[title]',
+        'span._ak8o',
+        "span[dir='auto']",
+        'div[title]',
+        '.copyable-text span',
+        "[data-testid*='name']",
+    ),
+    'attach_button': (
+        'div[role="button"][title="Attach"]',
+        'button[title="Attach"]',
+        '[aria-label="Attach"]',
+        'span[data-icon="plus-rounded"]',
+        'span[data-icon="plus"]',
+        'span[data-icon="clip"]',
+    ),
+}
+
+
+class SelectorRegistry:
+    """Learned selector order and per-selector statistics for every role"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.roles = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.roles = json.load(f).get('roles', {})
+        except (OSError, ValueError):
+            pass
+
+    def _stats(self, role, selector):
+        return self.roles.setdefault(role, {}).setdefault('stats', {}).setdefault(
+            selector, {'hits': 0, 'misses': 0, 'ms': 0.0})
+
+    def ordered(self, role):
+        """Selectors for role: last winner, then by hits, then default order"""
+        defaults = list(ROLES[role])
+        data = self.roles.get(role, {})
+        stats = data.get('stats', {})
+        order = sorted(defaults, key=lambda s: -stats.get(s, {}).get('hits', 0))
+        winner = data.get('winner')
+        if winner in order:
+            order.remove(winner)
+            order.insert(0, winner)
+        return order
+
+    def all_ordered(self):
+        return {role: self.ordered(role) for role in ROLES}
+
+    def record(self, role, selector, hit, seconds):
+        """Count one lookup attempt; a hit makes selector the role's winner"""
+        with self._lock:
+            stats = self._stats(role, selector)
+            stats['hits' if hit else 'misses'] += 1
+            stats['ms'] += seconds * 1000
+            if hit:
+                self.roles[role]['winner'] = selector
+
+    def merge(self, report):
+        """Add the counts from the page library's takeStats() and adopt its winners"""
+        with self._lock:
+            for role, by_selector in (report.get('stats') or {}).items():
+                if role not in ROLES:
+                    continue
+                for selector, counts in by_selector.items():
+                    stats = self._stats(role, selector)
+                    stats['hits'] += counts.get('hits', 0)
+                    stats['misses'] += counts.get('misses', 0)
+                    stats['ms'] += counts.get('ms', 0.0)
+            for role, winner in (report.get('winners') or {}).items():
+                if role in ROLES and winner in ROLES[role]:
+                    self.roles.setdefault(role, {})['winner'] = winner
+
+    def find(self, driver, role, root=None, test=None):
+        """First element matching role's selectors in learned order (optionally passing test), or None"""
+        from selenium.webdriver.common.by import By
+
+        root = root or driver
+        for selector in self.ordered(role):
+            started = time.perf_counter()
+            element = None
+            try:
+                element = next((el for el in root.find_elements(By.CSS_SELECTOR, selector)
+                                if test is None or test(el)), None)
+            except Exception:
+                pass
+            self.record(role, selector, element is not None, time.perf_counter() - started)
+            if element is not None:
+                return element
+        return None
+
+    def save(self):
+        """Write the registry (atomically) to its JSON file"""
+        with self._lock:
+            payload = {'updated_at': datetime.now().isoformat(timespec='seconds'), 'roles': self.roles}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def print_report(self):
+        print(f"\n{'role':<14}{'selector':<52}{'hits':>7}{'misses':>8}{'hit %':>7}{'mean ms':>9}")
+        print("-" * 97)
+        for role in ROLES:
+            stats = self.roles.get(role, {}).get('stats', {})
+            for rank, selector in enumerate(self.ordered(role)):
+                counts = stats.get(selector, {})
+                hits, misses = counts.get('hits', 0), counts.get('misses', 0)
+                attempts = hits + misses
+                rate = f"{100 * hits / attempts:.0f}" if attempts else "-"
+                mean = f"{counts.get('ms', 0.0) / attempts:.2f}" if attempts else "-"
+                label = role if rank == 0 else ""
+                print(f"{label:<14}{selector[:50]:<52}{hits:>7}{misses:>8}{rate:>7}{mean:>9}")
+
+
+_registry = None
+
+
+def get_registry():
+    """The process-wide registry, loaded from Data/selectors.json on first use"""
+    global _registry
+    if _registry is None:
+        _registry = SelectorRegistry()
+    return _registry
+
+
+def main():
+    get_registry().print_report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Session
+Everything one automation run needs: the WebDriver, the input/output file
+paths, and the instrumentation objects. Constructing a Session is cheap;
+the browser only starts in start().
+"""
+
+import os
+
+from tools.command_counter import CommandCounter, load_budget
+from tools.metrics_server import SendMetrics
+from tools.output_journal import OutputJournal
+from tools.stage_timer import StageTimer
+from wa_engine import platform_input, state
+from wa_engine.backends import get_backend
+from wa_engine.events import EventWaits
+from wa_engine.handles import HandleCache
+from wa_engine.page import PageHelpers
+from wa_engine.reattach import attach, load_record, reattach_enabled
+from wa_engine.reattach import stop as stop_detached
+
+WHATSAPP_URL = "https://web.whatsapp.com/"
+DEFAULT_PROFILE_PATH = os.environ.get(
+    "WA_FIREFOX_PROFILE", "/Users/admin/Library/Application Support/Firefox/Profiles/focg601r.NepalWin")
+
+
+class Session:
+    """
+    One browser plus the state shared by the engine functions
+
+    Args:
+        driver: an existing WebDriver to use instead of start()
+        backend: 'firefox', 'chromium' or a backend object (see wa_engine.backends)
+        checkpoint: called before every entry and mention candidate; the
+                    interactive script uses it for pause/stop handling
+    """
+
+    def __init__(self, driver=None,
+                 phone_number_file="TXT File/phone_number.txt",
+                 message_file="TXT File/description.txt",
+                 image_folder="IMAGE-TO-SEND",
+                 image_file=None,
+                 not_in_group_file="TXT File/not_in_group.txt",
+                 exclude_words_file="TXT File/exclude_words.txt",
+                 stage_timer=None, command_counter=None, output_journal=None, metrics=None,
+                 checkpoint=None, input_mode=None, reattach=None, backend=None):
+        self.driver = driver
+        self.phone_number_file = phone_number_file
+        self.message_file = message_file
+        self.image_folder = image_folder
+        self.image_file = image_file
+        self.not_in_group_file = not_in_group_file
+        self.exclude_words_file = exclude_words_file
+        self.stage_timer = stage_timer or StageTimer()
+        self.command_counter = command_counter or CommandCounter(
+            budget=load_budget(os.environ.get("WA_COMMAND_BUDGET")))
+        self.output_journal = output_journal or OutputJournal()
+        self.metrics = metrics or SendMetrics()
+        if metrics is None and stage_timer is None:
+            self.stage_timer.add_listener(self.metrics.observe_stage)
+        self._checkpoint = checkpoint
+        # How text and images are entered (see wa_engine.platform_input); settled in start()
+        self.headless = False
+        self._input_mode = input_mode
+        self.input_mode = platform_input.input_mode(False, input_mode)
+        # Last WhatsApp Web state seen by detect_state / wait_until_logged_in
+        self.state = None
+        # firefox or chromium (see wa_engine.backends); WA_BACKEND by default
+        self.backend = get_backend(backend) if backend is None or isinstance(backend, str) else backend
+        # Keep the browser across restarts (see wa_engine.reattach)
+        self.reattach = reattach_enabled(reattach)
+        self.reattached = False
+        self._profile_path = None
+        self._waits = None
+        self._page = None
+        self._handles = None
+        # Counts from the most recent run_entries call (updated in place)
+        self.last_run = {}
+
+    def checkpoint(self):
+        if self._checkpoint is not None:
+            self._checkpoint()
+
+    def start(self, profile_path=None, headless=None, profile_mode=None, browser_mode=None):
+        """Start the browser with the WhatsApp profile; raises if it cannot start
+
+        profile_path=None uses the backend's default profile. headless=None
+        runs headless when WA_HEADLESS says so or there is no display.
+        profile_mode is inplace, slim or copy (see wa_engine.profile) and
+        browser_mode is standard or lean (see wa_engine.prefs); None uses
+        WA_PROFILE_MODE / WA_BROWSER_MODE.
+        """
+        self._profile_path = profile_path = profile_path or self.backend.default_profile()
+        if self.reattach and not self.backend.supports_reattach:
+            print(f"⚠️ Reattach is not supported by the {self.backend.name} backend, starting normally")
+            self.reattach = False
+        if self.reattach and self._adopt_running_browser():
+            return self.driver
+
+        # Headless mode: fixed viewport, script input instead of the clipboard
+        self.headless = platform_input.headless_requested(headless)
+        self.input_mode = platform_input.input_mode(self.headless, self._input_mode)
+        if self.headless:
+            width, height = platform_input.viewport_size()
+            print(f"✅ Headless mode ({width}x{height}, {self.input_mode} input)")
+
+        try:
+            self.driver = self.backend.start(self, profile_path, profile_mode, browser_mode)
+            self.command_counter.install(self.driver)
+
+            window = platform_input.size_window(self.driver, self.headless)
+            print(f"✅ Browser window {window}")
+            return self.driver
+
+        except Exception as e:
+            print(f"❌ Failed to start {self.backend.name}: {e}")
+            print("This might be due to:")
+            print("1. Browser not installed")
+            print("2. Profile issues")
+            print("3. Driver compatibility")
+            print("Please install the browser or check your profile settings.")
+            raise
+
+    def _adopt_running_browser(self):
+        """Reattach to the browser saved for this profile; False if there is none to adopt"""
+        record = load_record(self._profile_path)
+        if not record:
+            return False
+        driver = attach(record)
+        if driver is None:
+            print("⚠️ Saved browser session is gone, starting a new one")
+            stop_detached(self._profile_path, record)
+            return False
+        self.driver = driver
+        self.reattached = True
+        self.headless = record.get('headless', False)
+        self.input_mode = platform_input.input_mode(self.headless, self._input_mode)
+        self.command_counter.install(self.driver)
+        print(f"♻️ Reattached to running browser session {record['session_id']} (started {record['started_at']})")
+        return True
+
+    def open_whatsapp(self, login_timeout=None):
+        """Load WhatsApp Web (kept as-is on a reattached browser); with login_timeout, wait for the chat list"""
+        if not (self.reattached and self.driver.current_url.startswith(WHATSAPP_URL)):
+            self.driver.get(WHATSAPP_URL)
+            self.handles.forget()
+        if login_timeout:
+            self.wait_until_logged_in(login_timeout)
+
+    @property
+    def waits(self):
+        """EventWaits for the current driver (see wa_engine.events)"""
+        if self._waits is None or self._waits.driver is not self.driver:
+            self._waits = EventWaits(self.driver)
+        return self._waits
+
+    @property
+    def page(self):
+        """PageHelpers for the current driver (see wa_engine.page)"""
+        if self._page is None or self._page.driver is not self.driver:
+            self._page = PageHelpers(self.driver)
+        return self._page
+
+    @property
+    def handles(self):
+        """HandleCache for the current driver (see wa_engine.handles)"""
+        if self._handles is None or self._handles.driver is not self.driver:
+            self._handles = HandleCache(self)
+        return self._handles
+
+    def wait_until(self, condition, js_condition=None, timeout=10, poll_frequency=0.5):
+        """WebDriverWait(...).until(condition), woken by page events when BiDi is available"""
+        return self.waits.until(condition, js_condition, timeout, poll_frequency)
+
+    def detect_state(self, timeout=30, until=state.DECIDED):
+        """Wait for WhatsApp Web to reach a decided state (login or ready) and return it
+
+        One in-page probe per poll (see wa_engine.state), returning as soon
+        as the state is known; the result is also kept in self.state.
+        """
+        self.state = state.wait_for_state(self.driver, timeout, until=until, backend=self.backend,
+                                          waits=self.waits)
+        return self.state
+
+    def wait_until_logged_in(self, timeout):
+        """Block until the chat list exists; raises TimeoutException naming the last state otherwise
+
+        Checked in the DOM only (no visibility or focus test), so it behaves
+        the same in a headless or minimized window.
+        """
+        from selenium.common.exceptions import TimeoutException
+
+        reported = []
+
+        def report(new_state):
+            if new_state == state.LOGIN and not reported:
+                reported.append(new_state)
+                print("📱 WhatsApp Web is asking for a login - scan the QR code")
+
+        self.state = state.wait_for_state(self.driver, timeout, until=(state.READY,), on_change=report,
+                                          backend=self.backend, waits=self.waits)
+        if self.state != state.READY:
+            raise TimeoutException(f"WhatsApp Web not ready after {timeout}s (state: {self.state})")
+
+    def quit_browser(self, force=False):
+        """Quit the browser, or with reattach on leave it running for the next start"""
+        if self.driver is None:
+            return
+        if self.reattach and not force:
+            print("🔌 Browser left running for the next start (WA_REATTACH)")
+        else:
+            try:
+                if self.reattach:
+                    stop_detached(self._profile_path)
+                else:
+                    self.driver.quit()
+            except Exception:
+                pass
+        self.driver = None
+
+    def close(self):
+        """Quit (or, with reattach, release) the browser and flush the result files"""
+        if self.driver is not None:
+            # Learned selector order and hit rates (see wa_engine.selector_registry)
+            self.page.flush_stats()
+        self.quit_browser()
+        self.output_journal.close()
@@ -0,0 +1,80 @@
+"""
+Session state
+One in-page check that classifies WhatsApp Web during startup, polled until
+the state is decided. Replaces waiting out a fixed timeout on a single
+selector to infer "already logged in".
+
+States:
+    loading  page or app shell still coming up
+    login    QR code / "log in" screen; someone has to scan it
+    syncing  logged in, chats still downloading
+    ready    chat list (#pane-side) present
+"""
+
+import json
+import time
+
+LOADING = "loading"
+LOGIN = "login"
+SYNCING = "syncing"
+READY = "ready"
+STATES = (LOADING, LOGIN, SYNCING, READY)
+
+# Decided states: waiting longer will not change them without user action
+DECIDED = (LOGIN, READY)
+
+STATE_SCRIPT = """
+if (document.readyState !== 'complete' || !document.body) { return 'loading'; }
+if (document.querySelector('#pane-side')) { return 'ready'; }
+if (document.querySelector('canvas[aria-label*="scan" i], canvas[aria-label*="QR" i], div[data-ref] canvas')) {
+    return 'login';
+}
+for (const h of document.querySelectorAll('h1')) {
+    if (/WhatsApp Web|Log in|Steps to log in|Scan to log in/i.test(h.textContent)) { return 'login'; }
+}
+if (document.querySelector('progress')) { return 'syncing'; }
+return 'loading';
+"""
+# The same check as one expression, for backends that evaluate directly (CDP Runtime.evaluate)
+STATE_EXPRESSION = "(() => {" + STATE_SCRIPT + "})()"
+
+
+def probe_state(driver, backend=None):
+    """Current state from a single script call; loading if the page cannot be read yet"""
+    try:
+        if backend is not None:
+            state = backend.evaluate(driver, STATE_EXPRESSION)
+        else:
+            state = driver.execute_script(STATE_SCRIPT)
+    except Exception:
+        return LOADING
+    return state if state in STATES else LOADING
+
+
+def wait_for_state(driver, timeout=30, until=DECIDED, poll=0.25, on_change=None, backend=None, waits=None):
+    """
+    Poll probe_state until it returns one of `until` or the timeout passes
+
+    Args:
+        on_change: called with each new state as it is observed
+        waits: EventWaits; when its BiDi connection is up the page wakes the
+               wait as soon as the state changes instead of every `poll`
+
+    Returns:
+        str: the state that ended the wait, or the last state seen on timeout
+    """
+    deadline = time.monotonic() + timeout
+    last = None
+    while True:
+        state = probe_state(driver, backend)
+        if state != last:
+            last = state
+            if on_change is not None:
+                on_change(state)
+        remaining = deadline - time.monotonic()
+        if state in until or remaining <= 0:
+            return state
+        if waits is not None and waits.available:
+            waits.wait_event(f"return {json.dumps(list(until))}.includes({STATE_EXPRESSION});", min(remaining, 1.0))
+        else:
+            time.sleep(poll)